@@ -0,0 +1,79 @@
+"""micro-benchmark of extracting the `jissue list` columns from issues
+
+Usage:
+    extractors.py [--issues=<count>] [--repeat=<count>]
+
+Compares the per-column issue_mappings, which read issue.fields() once per column, with a compiled extractor that
+reads it once per issue. Every tenth issue of the fixture is unassigned.
+
+Options:
+    --issues=<count>    number of issues in the fixture [default: 10000]
+    --repeat=<count>    runs per extractor, the fastest one is reported [default: 10]
+"""
+from __future__ import print_function
+import sys
+import time
+
+
+COLUMNS = ("Rank", "Type", "Key", "Summary", "Status", "Created", "Updated", "Assignee")
+
+
+class Fields(object):
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+class Issue(object):
+    def __init__(self, key, fields):
+        self.key = key
+        self._fields = fields
+
+    def fields(self):
+        return self._fields
+
+
+def make_issues(count):
+    issues = []
+    for index in range(count):
+        assignee = None if index % 10 == 0 else Fields(displayName="User {}".format(index % 7))
+        fields = Fields(customfield_10700=str(index), issuetype=Fields(name="Bug"), summary="issue {}".format(index),
+                        status=Fields(name="Open"), assignee=assignee,
+                        created="2020-01-{:02}T10:{:02}:00.000+0200".format(index % 28 + 1, index % 60),
+                        updated="2021-03-{:02}T11:{:02}:30.000+0000".format(index % 28 + 1, index % 60))
+        issues.append(Issue("PROJ-{}".format(index), fields))
+    return issues
+
+
+def per_column(issues):
+    from infi.jira_cli.jira_adapter import issue_mappings
+    return [[issue_mappings[column](issue) for column in COLUMNS] for issue in issues]
+
+
+def compiled(issues):
+    from infi.jira_cli.extractors import compile_extractor
+    extract = compile_extractor(COLUMNS)
+    return [extract(issue) for issue in issues]
+
+
+def measure(func, issues, repeat):
+    """:returns: the rows per second of the fastest run"""
+    timings = []
+    for _ in range(repeat):
+        before = time.time()
+        func(issues)
+        timings.append(time.time() - before)
+    return len(issues) / min(timings)
+
+
+def main(argv):
+    from docopt import docopt
+    arguments = docopt(__doc__, argv=argv)
+    issues = make_issues(int(arguments["--issues"]))
+    repeat = int(arguments["--repeat"])
+    compiled(issues[:1])  # import everything before measuring
+    for func in (per_column, compiled):
+        print("{:<12} {:>10.0f} rows/s".format(func.__name__, measure(func, issues, repeat)))
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,61 @@
+"""micro-benchmark of rendering the `jissue list` table
+
+Usage:
+    output.py [--rows=<count>] [--repeat=<count>]
+
+Compares a sorted, left-aligned PrettyTable, which `jissue list` used to print, with output.render_table on rows
+that arrive already sorted.
+
+Options:
+    --rows=<count>      number of rows in the table [default: 10000]
+    --repeat=<count>    runs per renderer, the fastest one is reported [default: 5]
+"""
+from __future__ import print_function
+import sys
+import time
+
+
+COLUMNS = ["Rank", "Type", "Key", "Summary", "Status", "Created", "Updated"]
+
+
+def make_rows(count):
+    return [[str(index), "Bug", "PROJ-{}".format(index), "a summary of issue {}".format(index) * (index % 3 + 1),
+             "Open", "2020-01-{:02} 10:{:02}:00+00:00".format(index % 28 + 1, index % 60),
+             "2021-03-{:02} 11:{:02}:30+00:00".format(index % 28 + 1, index % 60)] for index in range(count)]
+
+
+def prettytable(rows):
+    from prettytable import PrettyTable
+    table = PrettyTable(COLUMNS)
+    table.align = 'l'
+    for row in rows:
+        table.add_row(row)
+    return table.get_string(sortby="Rank", align='l')
+
+
+def render_table(rows):
+    from infi.jira_cli.output import render_table
+    return render_table(COLUMNS, rows)
+
+
+def measure(func, rows, repeat):
+    """:returns: the rows per second of the fastest run"""
+    timings = []
+    for _ in range(repeat):
+        before = time.time()
+        func(rows)
+        timings.append(time.time() - before)
+    return len(rows) / min(timings)
+
+
+def main(argv):
+    from docopt import docopt
+    arguments = docopt(__doc__, argv=argv)
+    rows = make_rows(int(arguments["--rows"]))
+    repeat = int(arguments["--repeat"])
+    for func in (prettytable, render_table):
+        print("{:<12} {:>10.0f} rows/s".format(func.__name__, measure(func, rows, repeat)))
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
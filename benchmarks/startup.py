@@ -0,0 +1,107 @@
+"""cold-start benchmark of the command-line entry points
+
+Usage:
+    startup.py [--repeat=<count>] [--top=<count>] [--check]
+
+Runs each subcommand in SUBCOMMANDS in a fresh interpreter under `python -X importtime`, and prints the wall-clock
+time it adds on top of a bare interpreter together with the heaviest top-level imports.
+With --check, exits with a non-zero code if any subcommand is over its budget or imports one of HEAVY_MODULES.
+The subcommands need no network access; a temporary configuration file is used.
+
+Options:
+    --repeat=<count>    runs per subcommand, the fastest one is reported [default: 5]
+    --top=<count>       number of imports to show per subcommand [default: 5]
+    --check             fail on budget violations
+"""
+from __future__ import print_function
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+
+# modules that only commands that talk to JIRA/Confluence may import
+HEAVY_MODULES = ('jira', 'requests', 'prettytable', 'jinja2', 'infi.execute', 'infi.credentials_store')
+
+# (name, code to run, milliseconds allowed on top of a bare interpreter, heavy modules this subcommand may import)
+SUBCOMMANDS = [
+    ("jish deactivate", "from infi.jira_cli.jish import _jish; _jish(['deactivate'])", 150, ()),
+    ("jissue --help", "from infi.jira_cli.jissue import _jissue; _jissue(['--help'])", 150, ()),
+    ("jissue config show", "from infi.jira_cli.jissue import _jissue; _jissue(['config', 'show'])", 150, ()),
+    ("jissue cache stats", "from infi.jira_cli.jissue import _jissue; _jissue(['cache', 'stats'])", 200, ('prettytable', )),
+    ("jirelease --help", "from infi.jira_cli.jirelease import _jiject; _jiject(['--help'], {})", 150, ()),
+    ("jirelnotes --help", "from infi.jira_cli.jirelnotes import _jiject; _jiject(['--help'], {})", 150, ()),
+    ("jadmin --help", "from infi.jira_cli.jadmin import _jadmin; _jadmin(['--help'])", 150, ()),
+]
+
+MODULES_MARKER = "--- modules ---"
+
+
+def _get_environment(tempdir):
+    config_path = os.path.join(tempdir, "config.json")
+    with open(config_path, "w") as fd:
+        json.dump(dict(jira_fqdn="jira.example.com", confluence_fqdn="confluence.example.com"), fd)
+    return dict(os.environ,
+                INFI_JIRA_CLI_CONFIG_PATH=config_path,
+                INFI_JIRA_CLI_CACHE_PATH=os.path.join(tempdir, "cache"),
+                INFI_JIRA_CLI_DAEMON_SOCKET_PATH=os.path.join(tempdir, "daemon.sock"))
+
+
+def run(code, environ):
+    """:returns: a (seconds, imported modules, -X importtime lines) tuple of a single cold run"""
+    code += "; import sys; print({!r}); print(' '.join(sorted(sys.modules)))".format(MODULES_MARKER)
+    before = time.time()
+    process = subprocess.Popen([sys.executable, "-X", "importtime", "-c", code], env=environ,
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+    stdout, stderr = process.communicate()
+    elapsed = time.time() - before
+    modules = stdout.split(MODULES_MARKER)[-1].split()
+    return elapsed, modules, [line for line in stderr.splitlines() if line.startswith("import time:")]
+
+
+def get_heaviest_imports(importtime_lines, top):
+    """:returns: the (cumulative microseconds, module) of the heaviest top-level imports"""
+    imports = []
+    for line in importtime_lines:
+        _, self_time, cumulative, name = [item.strip() for item in line.replace("import time:", "|").split("|")]
+        if cumulative.isdigit() and not name.startswith(" "):
+            imports.append((int(cumulative), name))
+    return sorted(imports, reverse=True)[:top]
+
+
+def get_violations(name, overhead, modules, budget, allowed_modules):
+    violations = []
+    if overhead * 1000 > budget:
+        violations.append("{}: {:.0f}ms is over the {}ms budget".format(name, overhead * 1000, budget))
+    for module in HEAVY_MODULES:
+        if module in modules and module not in allowed_modules:
+            violations.append("{}: imports {}".format(name, module))
+    return violations
+
+
+def main(argv):
+    from docopt import docopt
+    arguments = docopt(__doc__, argv=argv)
+    repeat, top = int(arguments["--repeat"]), int(arguments["--top"])
+    tempdir = tempfile.mkdtemp()
+    environ = _get_environment(tempdir)
+    baseline = min(run("pass", environ)[0] for _ in range(repeat))
+    print("bare interpreter: {:.0f}ms".format(baseline * 1000))
+    violations = []
+    for name, code, budget, allowed_modules in SUBCOMMANDS:
+        runs = [run(code, environ) for _ in range(repeat)]
+        elapsed, modules, importtime_lines = min(runs, key=lambda item: item[0])
+        overhead = elapsed - baseline
+        print("\n{}: +{:.0f}ms (budget {}ms)".format(name, overhead * 1000, budget))
+        for cumulative, module in get_heaviest_imports(importtime_lines, top):
+            print("    {:>8.1f}ms  {}".format(cumulative / 1000., module))
+        violations.extend(get_violations(name, overhead, modules, budget, allowed_modules))
+    if violations:
+        print("\n" + "\n".join(violations))
+    return 1 if violations and arguments["--check"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
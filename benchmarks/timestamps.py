@@ -0,0 +1,57 @@
+"""micro-benchmark of parsing JIRA timestamps
+
+Usage:
+    timestamps.py [--count=<count>] [--repeat=<count>]
+
+Compares the regular-expression split that from_jira_formatted_datetime used to do with timestamps.parse_timestamp,
+on distinct timestamps (every call misses the memoization) and on timestamps that repeat.
+
+Options:
+    --count=<count>     number of timestamps to parse [default: 100000]
+    --repeat=<count>    runs per parser, the fastest one is reported [default: 5]
+"""
+from __future__ import print_function
+import sys
+import time
+
+
+def legacy_parse(formatted_string):
+    import re
+    import datetime
+    return datetime.datetime(*list(map(int, re.split(r'[^\d]', formatted_string)[:-1])))
+
+
+def make_timestamps(count, distinct):
+    return ["2020-{:02}-{:02}T{:02}:{:02}:{:02}.{:03}+0200".format(index % 12 + 1, index % 28 + 1, index % 24,
+                                                                  index % 60, (index // 60) % 60, index % 1000)
+            for index in (range(count) if distinct else [index % 100 for index in range(count)])]
+
+
+def measure(func, timestamps, repeat, clear=None):
+    """:returns: the timestamps per second of the fastest run"""
+    timings = []
+    for _ in range(repeat):
+        if clear is not None:
+            clear()
+        before = time.time()
+        for item in timestamps:
+            func(item)
+        timings.append(time.time() - before)
+    return len(timestamps) / min(timings)
+
+
+def main(argv):
+    from docopt import docopt
+    from infi.jira_cli.timestamps import parse_timestamp
+    arguments = docopt(__doc__, argv=argv)
+    count, repeat = int(arguments["--count"]), int(arguments["--repeat"])
+    for title, distinct in (("distinct", True), ("repeated", False)):
+        timestamps = make_timestamps(count, distinct)
+        legacy = measure(legacy_parse, timestamps, repeat)
+        current = measure(parse_timestamp, timestamps, repeat, parse_timestamp.cache_clear)
+        print("{:<10} legacy {:>10.0f}/s   parse_timestamp {:>10.0f}/s   x{:.1f}".format(title, legacy, current,
+                                                                                        current / legacy))
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
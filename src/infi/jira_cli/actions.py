@@ -1,5 +1,12 @@
 from __future__ import print_function
 
+LIST_COLUMNS = ["Rank", "Type", "Key", "Summary", "Status", "Created", "Updated"]
+# seconds between the progress reports of `jissue label --jql`
+LABEL_PROGRESS_INTERVAL = 2
+# the JQL fields of the columns, the server sorts the issues so they can be written as they arrive
+SORT_FIELDS = dict(Rank="rank", Type="issuetype", Key="key", Summary="summary", Status="status", Created="created",
+                   Updated="updated")
+
 
 def format(value, slice=None):
     from datetime import datetime
@@ -14,60 +21,117 @@ def format(value, slice=None):
                                                                          item.body)
                                 for item in value])
         if len(value) and isinstance(value[0], IssueLink):
-            from .jira_adapter import issue_mappings
+            from .extractors import compile_extractor
+            extract = compile_extractor(("Key", "Status", "Summary"))
             get_linked_issue = lambda item: getattr(item, "inwardIssue", getattr(item, "outwardIssue", None))
             get_link_text = lambda item: '<%s'%item.type.inward if hasattr(item, "inwardIssue") else '>%s'%item.type.outward
 
-            return "\n\n".join(["{0:<20} {1:<15} {2:<15} {3}".format(get_link_text(item),
-                                                                     issue_mappings['Key'](get_linked_issue(item)),
-                                                                     issue_mappings['Status'](get_linked_issue(item)),
-                                                                     issue_mappings['Summary'](get_linked_issue(item)))
+            return "\n\n".join(["{0:<20} {1:<15} {2:<15} {3}".format(get_link_text(item), *extract(get_linked_issue(item)))
                                 for item in value])
         if len(value) and isinstance(value[0], Issue):
-            from .jira_adapter import issue_mappings
-            return "\n".join(["{0:<20} {1:<15} {2:<15} {3}".format('',
-                                                                   issue_mappings['Key'](item),
-                                                                   issue_mappings['Status'](item),
-                                                                   issue_mappings['Summary'](item))
+            from .extractors import compile_extractor
+            extract = compile_extractor(("Key", "Status", "Summary"))
+            return "\n".join(["{0:<20} {1:<15} {2:<15} {3}".format('', *extract(item))
                               for item in value])
         return ', '.join(value)
     return str(value)[:slice]
 
 
-def _stringify(item):
-    try:
-        return str(item)
-    except:
-        return ''
+def _get_order_by(arguments):
+    """:returns: the JQL ORDER BY clause of --sort-by and --reverse"""
+    from docopt import DocoptExit
+    column = arguments.get("--sort-by").capitalize()
+    if column not in SORT_FIELDS:
+        raise DocoptExit("cannot sort by {}, choose one of {}".format(column, ', '.join(LIST_COLUMNS)))
+    return "{}{}".format(SORT_FIELDS[column], " DESC" if arguments.get("--reverse") else "")
 
 
 def _list_issues(arguments, issues):
-    from prettytable import PrettyTable
-    from .jira_adapter import from_jira_formatted_datetime, issue_mappings
-    table = PrettyTable(["Rank", "Type", "Key", "Summary", "Status", "Created", "Updated"])
-    table.align = 'l'
-    sortby_column = arguments.get("--sort-by").capitalize()
-    reverse = arguments.get("--reverse")
-    for issue in issues:
-        table.add_row([_stringify(issue_mappings[column](issue)) for column in table.field_names])
-    print(table.get_string(reversesort=reverse, sortby=sortby_column, align='l'))
+    """writes the issues as they arrive, in the order they come in (see _get_order_by)"""
+    from docopt import DocoptExit
+    from .extractors import compile_extractor
+    from .output import write_rows, FORMATS
+    output_format = arguments.get("--format") or 'table'
+    if output_format not in FORMATS:
+        raise DocoptExit("unknown format {}, choose one of {}".format(output_format, ', '.join(FORMATS)))
+    extract = compile_extractor(LIST_COLUMNS)
+    write_rows(output_format, LIST_COLUMNS, (extract(issue) for issue in issues))
+
+
+def _get_page_size(arguments):
+    from .issue_search import DEFAULT_PAGE_SIZE
+    return int(arguments.get("--page-size") or DEFAULT_PAGE_SIZE)
+
+
+def _get_workers(arguments):
+    workers = arguments.get("--workers")
+    return int(workers) if workers else None
+
+
+def _print_mirror_age(projects):
+    from .issue_mirror import get_mirror_age
+    from sys import stderr
+    print(get_mirror_age(projects), file=stderr)
+
+
+def _list_mirrored_issues(arguments):
+    from .issue_mirror import iter_assigned_issues, issue_from_raw
+    projects, issues = iter_assigned_issues(arguments.get("--assignee"), arguments.get("<project>"),
+                                            order_by=_get_order_by(arguments))
+    _list_issues(arguments, (issue_from_raw(raw) for raw in issues))
+    _print_mirror_age(projects)
 
 
 def list_issues(arguments):
-    from .jira_adapter import get_issues__assigned_to_me, get_issues__assigned_to_user
+    from .jira_adapter import get_issues__assigned_to_me, get_issues__assigned_to_user, get_fields_for_mappings
+    if arguments.get("--offline"):
+        from .jql import UnsupportedQuery
+        from sys import stderr
+        try:
+            return _list_mirrored_issues(arguments)
+        except UnsupportedQuery as error:
+            print("{}, listing from the server instead".format(error), file=stderr)
     user = arguments.get("--assignee")
     project = arguments.get("<project>")
-    issues = get_issues__assigned_to_user(user, project) if user else get_issues__assigned_to_me(project)
+    kwargs = dict(page_size=_get_page_size(arguments), workers=_get_workers(arguments),
+                  fields=get_fields_for_mappings(LIST_COLUMNS), order_by=_get_order_by(arguments))
+    issues = get_issues__assigned_to_user(user, project, **kwargs) if user else get_issues__assigned_to_me(project, **kwargs)
     _list_issues(arguments, issues)
 
 
+def _search_mirrored_issues(arguments, query):
+    from .issue_mirror import iter_matching_issues, issue_from_raw
+    projects, issues = iter_matching_issues(query)
+    _list_issues(arguments, (issue_from_raw(raw) for raw in issues))
+    _print_mirror_age(projects)
+
+
 def search(arguments):
-    from .jira_adapter import search_issues, get_query_by_filter
+    from .jira_adapter import search_issues, get_query_by_filter, get_fields_for_mappings
+    from .jql import set_order_by
     query = arguments.get("<query>")
     _filter = arguments.get("--filter")
     if _filter:
         query = get_query_by_filter(_filter)
-    return _list_issues(arguments, search_issues(query))
+    query = set_order_by(query, _get_order_by(arguments))
+    if arguments.get("--offline"):
+        from .jql import UnsupportedQuery
+        from sys import stderr
+        try:
+            return _search_mirrored_issues(arguments, query)
+        except UnsupportedQuery as error:
+            print("{}, searching the server instead".format(error), file=stderr)
+    issues = search_issues(query, page_size=_get_page_size(arguments), workers=_get_workers(arguments),
+                           fields=get_fields_for_mappings(LIST_COLUMNS))
+    return _list_issues(arguments, issues)
+
+
+def sync(arguments):
+    from .issue_mirror import sync_project
+    project_key = arguments.get("<project>").upper()
+    count = sync_project(project_key, full=arguments.get("--full"), page_size=_get_page_size(arguments),
+                         workers=_get_workers(arguments))
+    print("{} issues of {} were updated in the mirror".format(count, project_key))
 
 
 def start(arguments):
@@ -80,7 +144,7 @@ def stop(arguments):
     stop_progress(arguments.get("<issue>"))
 
 
-def get_issue_pretty(key):
+def get_issue_pretty(key, issue=None):
     from textwrap import dedent
     from string import printable
     template = """
@@ -110,22 +174,32 @@ def get_issue_pretty(key):
                 "AffectsVersions", "FixVersions", "Components",
                 "Created", "Updated", "Labels",
                 "Description", "Comments", "IssueLinks", "SubTasks"]
-    from .jira_adapter import get_issue, issue_mappings
-    issue = get_issue(key)
-    kwargs = {item: format(issue_mappings[item](issue)) for item in keywords}
+    from .jira_adapter import get_issue, get_fields_for_mappings
+    from .extractors import compile_extractor
+    issue = issue or get_issue(key, fields=get_fields_for_mappings(keywords))
+    kwargs = {item: format(value) for item, value in zip(keywords, compile_extractor(keywords)(issue))}
     data = dedent(template).format(**kwargs)
     data = ''.join([item for item in data if item in printable])
     return data
 
 
 def show(arguments):
-    print(get_issue_pretty(arguments.get("<issue>")))
+    if not arguments.get("--offline"):
+        print(get_issue_pretty(arguments.get("<issue>")))
+        return
+    from .issue_mirror import get_issue_mirror, issue_from_raw, MirrorError
+    key = arguments.get("<issue>").upper()
+    raw = get_issue_mirror().get_issue(key)
+    if raw is None:
+        raise MirrorError("{} is not in the mirror".format(key))
+    print(get_issue_pretty(key, issue_from_raw(raw)))
+    _print_mirror_age([raw['fields']['project']['key']])
 
 
 def get(arguments):
-    from .jira_adapter import get_issue, get_custom_fields
-    customfield = get_custom_fields()[arguments.get("<customfield>")]
-    issue = get_issue(arguments.get("<issue>"))
+    from .jira_adapter import get_issue, get_custom_field_id
+    customfield = get_custom_field_id(arguments.get("<customfield>"))
+    issue = get_issue(arguments.get("<issue>"), fields=customfield)
     print(getattr(issue.fields(), customfield))
 
 
@@ -152,7 +226,7 @@ def link(arguments):
 
 def create(arguments):
     from .config import Configuration
-    from .jira_adapter import create_issue, get_next_release_name_in_project
+    from .jira_adapter import create_issue, get_next_release_name_in_project, get_auth
     from string import capwords
     project_key = arguments.get("<project>").upper()
     details = arguments.get("<details>")
@@ -161,13 +235,38 @@ def create(arguments):
     issue_type_name = capwords(arguments.get("<issue-type>"))
     fix_version_name = arguments.get("--fix-version") or get_next_release_name_in_project(project_key)
     component_name = arguments.get("--component")
-    assignee = Configuration.from_file().username if arguments.get("--assign-to-me") else "-1"
+    assignee = get_auth(Configuration.from_file().jira_fqdn).username if arguments.get("--assign-to-me") else "-1"
     additional_fields = [item.split(':=') for item in arguments.get("--field", list())]
     issue = create_issue(project_key, issue_type_name, component_name, fix_version_name, details, assignee=assignee, additional_fields=additional_fields)
     print(issue.key) if arguments.get("--short") else show({"<issue>": issue.key})
     return issue.key
 
 
+def create_bulk(arguments):
+    from .config import Configuration
+    from .jira_adapter import create_issues, get_next_release_name_in_project, get_auth
+    from .bulk_create import read_rows, encode_rows
+    from sys import stderr
+    project_key = arguments.get("<project>").upper()
+    fix_version_name = arguments.get("--fix-version") or get_next_release_name_in_project(project_key)
+    assignee = get_auth(Configuration.from_file().jira_fqdn).username if arguments.get("--assign-to-me") else "-1"
+    encoded = encode_rows(project_key, read_rows(arguments.get("<file>")), fix_version_name, assignee)
+    created = iter(create_issues([fields for fields, error in encoded if error is None],
+                                 chunk_size=int(arguments.get("--chunk-size"))))
+    failed = 0
+    for row_number, (fields, error) in enumerate(encoded, 1):
+        result = next(created) if error is None else None
+        error = error if result is None else result.error
+        if error is None:
+            print(result.key)
+        else:
+            failed += 1
+            print("row {}: {}".format(row_number, error), file=stderr)
+    if failed:
+        print("{} of {} issues were not created".format(failed, len(encoded)), file=stderr)
+        return 1
+
+
 def assign(arguments):
     from .jira_adapter import assign_issue, get_auth
     from .config import Configuration
@@ -197,6 +296,42 @@ def config_set(arguments):
     config.save()
 
 
+def cache_clear(arguments):
+    from .metadata_cache import get_metadata_cache
+    get_metadata_cache().clear()
+
+
+def cache_stats(arguments):
+    from .metadata_cache import get_metadata_cache
+    from prettytable import PrettyTable
+    cache = get_metadata_cache()
+    table = PrettyTable(["type", "entries", "expired", "time-to-live (seconds)"])
+    table.align = 'l'
+    for row in cache.stats():
+        table.add_row(row)
+    print(cache.filepath)
+    print(table)
+
+
+def daemon_start(arguments):
+    from .daemon import start, is_running
+    if is_running():
+        print("daemon is already running")
+        return
+    start(int(arguments.get("--idle-timeout")))
+
+
+def daemon_stop(arguments):
+    from .daemon import stop
+    if not stop():
+        print("daemon is not running")
+
+
+def daemon_status(arguments):
+    from .daemon import is_running, get_socket_path
+    print("daemon is {} ({})".format("running" if is_running() else "not running", get_socket_path()))
+
+
 def inventory(arguments):
     from .jira_adapter import get_jira
     from string import capwords
@@ -211,25 +346,47 @@ def inventory(arguments):
 
 
 def history(arguments):
-    from .jira_adapter import get_jira, search_issues
-    from string import capwords
-    from pprint import pprint
-    project_key = arguments.get("<project>")
-    jira = get_jira()
-    items = []
-    issues = search_issues('project={}'.format(project_key), expand='changelog')
+    from .changelog_store import get_changelog_store, update_changelog
+    project_key = arguments.get("<project>").upper()
+    update_changelog(project_key, full=arguments.get("--full"), page_size=_get_page_size(arguments),
+                     workers=_get_workers(arguments))
     print(','.join(['key', 'datetime', 'from', 'to']))
-    for issue in issues:
-        for history in issue.changelog().histories:
-            for change in history.items:
-                if change.field == 'status' and change.fromString != change.toString:
-                    print(','.join([issue.key, history.created, change.fromString, change.toString]))
-
+    for key, created, from_string, to_string in get_changelog_store().iter_changes(project_key, 'status'):
+        if from_string != to_string:
+            print(','.join([key, created, from_string or '', to_string or '']))
+
+
+def _label_matching_issues(arguments, add, remove):
+    from .jira_adapter import search_issues, update_labels_of_issues
+    from sys import stderr
+    from time import time
+    # the keys are all collected before the first update, since the updates may change which issues match the query
+    # and the search is paged by offset, so paging while updating would skip issues
+    keys = [issue.key for issue in search_issues(arguments.get("--jql"), page_size=_get_page_size(arguments),
+                                                 fields='key')]
+    verb = "unlabeled" if remove else "labeled"
+    failures, count, started_at, reported_at = [], 0, time(), time()
+    for result in update_labels_of_issues(keys, add, remove, _get_workers(arguments)):
+        count += 1
+        if result.error is not None:
+            failures.append(result)
+        if time() - reported_at >= LABEL_PROGRESS_INTERVAL:
+            reported_at = time()
+            print("{} {}/{} issues, {} failed".format(verb, count, len(keys), len(failures)), file=stderr)
+    for failure in failures:
+        print("{}: {}".format(failure.key, failure.error), file=stderr)
+    print("{} {} issues in {:.1f} seconds, {} failed".format(verb, count - len(failures), time() - started_at,
+                                                            len(failures)))
+    return 1 if failures else 0
 
 
 def label(arguments):
-    from .jira_adapter import add_labels_to_issue
-    add_labels_to_issue(arguments.get("<issue>"), arguments.get("--label"))
+    from .jira_adapter import update_labels
+    labels = arguments.get("--label")
+    add, remove = ([], labels) if arguments.get("--remove") else (labels, [])
+    if arguments.get("--jql"):
+        return _label_matching_issues(arguments, add, remove)
+    update_labels(arguments.get("<issue>"), add, remove)
 
 
 def reopen(arguments):
@@ -303,8 +460,9 @@ def plugins_show_actionable(arguments):
 
 
 def get_mappings():
-    return dict(
+    mappings = dict(
         list=list_issues,
+        sync=sync,
         start=start,
         stop=stop,
         show=show,
@@ -323,7 +481,11 @@ def get_mappings():
         filters=filters,
         plugins=dict(show=dict(all=plugins_show_all, actionable=plugins_show_actionable)),
         config=dict(show=config_show, set=config_set),
+        cache=dict(clear=cache_clear, stats=cache_stats),
+        daemon=dict(start=daemon_start, stop=daemon_stop, status=daemon_status),
     )
+    mappings['create-bulk'] = create_bulk
+    return mappings
 
 
 def choose_action(argv):
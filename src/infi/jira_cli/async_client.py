@@ -0,0 +1,174 @@
+"""an asyncio client for the REST resources that commands fan out over (projects, issues, comments, plugins, custom
+field options), so hundreds of requests can be in flight from one event loop.
+
+requests run in a thread pool over the pooled, authenticated session of the synchronous API (see
+jira_adapter.get_jira_session), so they share its credentials, keep-alive connections and timeouts and need no other
+http library. a semaphore caps the requests in flight, and failed requests are retried with exponential backoff:
+rejected ones (429) always, connection errors and gateway errors only for idempotent methods.
+`run`, `map_concurrently` and `iter_completed` are the synchronous wrappers, they run coroutines in a new event loop"""
+import asyncio
+from functools import partial
+from logging import getLogger
+
+
+logger = getLogger(__name__)
+
+
+DEFAULT_RETRIES = 3
+RETRY_BACKOFF = 0.5
+RETRY_STATUS_CODES = (502, 503, 504)
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'PUT', 'DELETE')
+
+
+def _get_retry_delay(response, attempt):
+    retry_after = None if response is None else response.headers.get('Retry-After')
+    if retry_after is not None and retry_after.isdigit():
+        return int(retry_after)
+    return RETRY_BACKOFF * 2 ** attempt
+
+
+def _should_retry(method, response):
+    if response is not None and response.status_code == 429:
+        return True
+    return method in IDEMPOTENT_METHODS and (response is None or response.status_code in RETRY_STATUS_CODES)
+
+
+class AsyncClient(object):
+    """sends REST requests to a server from coroutines, at most `concurrency` of them at a time"""
+
+    def __init__(self, session, server, concurrency, retries=DEFAULT_RETRIES, rate_limit=None):
+        from concurrent.futures import ThreadPoolExecutor
+        super(AsyncClient, self).__init__()
+        self._session = session
+        self._server = server
+        self._concurrency = concurrency
+        self._retries = retries
+        self._rate_limit = rate_limit
+        self._executor = ThreadPoolExecutor(max_workers=concurrency)
+        self._semaphores = dict()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+    def _get_semaphore(self, loop):
+        # asyncio primitives belong to the loop they are used in
+        if loop not in self._semaphores:
+            self._semaphores[loop] = asyncio.Semaphore(self._concurrency)
+        return self._semaphores[loop]
+
+    def _send(self, method, url, kwargs):
+        if self._rate_limit is not None:
+            with self._rate_limit:
+                pass
+        return self._session.request(method, url, **kwargs)
+
+    async def request(self, method, path, **kwargs):
+        """:returns: the response of a request to a path on the server (or to a complete url), raises JIRAError for
+        error responses and requests' exceptions for connection errors, once the retries are exhausted"""
+        from requests import RequestException
+        from jira import JIRAError
+        from .jira_adapter import get_error_message
+        loop = asyncio.get_running_loop()
+        url = path if '://' in path else self._server + path
+        async with self._get_semaphore(loop):
+            for attempt in range(self._retries + 1):
+                try:
+                    response = await loop.run_in_executor(self._executor, partial(self._send, method, url, kwargs))
+                except RequestException:
+                    if attempt == self._retries or not _should_retry(method, None):
+                        raise
+                    response = None
+                if response is not None and (attempt == self._retries or not _should_retry(method, response)):
+                    break
+                logger.debug("retrying {} {} ({})".format(method, url, "no response" if response is None
+                                                         else response.status_code))
+                await asyncio.sleep(_get_retry_delay(response, attempt))
+        if response.status_code >= 400:
+            raise JIRAError(status_code=response.status_code, text=get_error_message(response), url=url)
+        return response
+
+    async def get_json(self, path, **params):
+        response = await self.request('GET', path, params=params or None)
+        return response.json()
+
+    async def post_json(self, path, data):
+        response = await self.request('POST', path, json=data)
+        return response.json() if response.content else None
+
+    async def put_json(self, path, data):
+        response = await self.request('PUT', path, json=data)
+        return response.json() if response.content else None
+
+    async def delete(self, path):
+        await self.request('DELETE', path)
+
+
+def run(coroutine):
+    """runs a coroutine to completion in a new event loop, so synchronous code can call the asynchronous API"""
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def map_concurrently(func, items, concurrency=None):
+    """calls the coroutine function func(client, item) for all the items at once, with a client of the jira server.
+    :returns: the results in the order of the items, the exceptions of failed calls in place of their results"""
+    async def _map(client):
+        return await asyncio.gather(*[func(client, item) for item in items], return_exceptions=True)
+
+    with get_jira_client(concurrency) as client:
+        return run(_map(client))
+
+
+def iter_completed(func, items, concurrency=None, client=None):
+    """calls the coroutine function func(client, item) for all the items at once, like map_concurrently.
+    :returns: an iterator over (item, result) tuples in the order the calls complete, the exceptions of failed calls in
+    place of their results"""
+    if client is None:
+        with get_jira_client(concurrency) as client:
+            for item, result in iter_completed(func, items, client=client):
+                yield item, result
+        return
+    loop = asyncio.new_event_loop()
+    pending = set()
+    try:
+        tasks = {loop.create_task(func(client, item)): item for item in items}
+        pending = set(tasks)
+        while pending:
+            done, pending = loop.run_until_complete(asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED))
+            for task in done:
+                yield tasks[task], task.exception() or task.result()
+    finally:
+        # the consumer may stop early
+        for task in pending:
+            task.cancel()
+        if pending:
+            loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+        loop.close()
+
+
+def raise_first_error(results):
+    """:returns: the results of map_concurrently, raises the first exception among them"""
+    for result in results:
+        if isinstance(result, Exception):
+            raise result
+    return results
+
+
+def get_jira_client(concurrency=None):
+    """:returns: an AsyncClient of the configured jira server, concurrency defaults to max_concurrent_requests.
+    use it in a with statement, which shuts down its thread pool"""
+    from .config import Configuration
+    from .jira_adapter import get_jira_session
+    from .concurrency import get_jira_rate_limit
+    config = Configuration.from_file()
+    return AsyncClient(get_jira_session(), "https://{}".format(config.jira_fqdn),
+                       concurrency or config.max_concurrent_requests, rate_limit=get_jira_rate_limit())
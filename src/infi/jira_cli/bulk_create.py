@@ -0,0 +1,86 @@
+"""reading and encoding the rows of `jissue create-bulk`.
+
+a row is a CSV line or a JSON object per line (files ending with .jsonl, .ndjson or .json).
+the columns are issue_type and summary, optionally description, component, fix_version, assignee, priority, parent
+and due; any other column is a custom field by name. empty values are ignored."""
+from munch import Munch
+
+
+JSON_LINES_EXTENSIONS = ('.jsonl', '.ndjson', '.json')
+COLUMNS = ('issue_type', 'summary', 'description', 'component', 'fix_version', 'assignee', 'priority', 'parent', 'due')
+REQUIRED_COLUMNS = ('issue_type', 'summary')
+
+
+def _is_empty(value):
+    return value is None or value == '' or value == []
+
+
+def _parse_json_line(line):
+    import json
+    try:
+        row = json.loads(line)
+    except ValueError as error:
+        return None, "invalid JSON: {}".format(error)
+    if not isinstance(row, dict):
+        return None, "not a JSON object"
+    return row, None
+
+
+def read_rows(filepath):
+    """:returns: an iterator over (row, error) tuples, one per row, the row is a dict or None if it is unreadable"""
+    from os import path
+    import csv
+    if path.splitext(filepath)[1].lower() in JSON_LINES_EXTENSIONS:
+        with open(filepath) as fd:
+            for line in fd:
+                if line.strip():
+                    yield _parse_json_line(line)
+        return
+    with open(filepath) as fd:
+        reader = csv.DictReader(fd)
+        while True:
+            try:
+                row = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as error:
+                yield None, str(error)
+                continue
+            yield dict(row), None
+
+
+def parse_row(row):
+    """:returns: a Munch of the known columns, and the other columns in `additional_fields`"""
+    row = {key.strip(): value for key, value in row.items() if key and not _is_empty(value)}
+    missing = [column for column in REQUIRED_COLUMNS if column not in row]
+    if missing:
+        raise ValueError("missing {}".format(', '.join(missing)))
+    result = Munch({column: row.get(column) for column in COLUMNS})
+    result.additional_fields = {key: value for key, value in row.items() if key not in COLUMNS}
+    return result
+
+
+def encode_rows(project_key, rows, default_fix_version=None, default_assignee=None):
+    """resolves the project metadata once and encodes all the rows up front.
+    :param rows: (row, error) tuples, as read_rows returns them
+    :returns: a list of (fields, error) tuples in the order of the rows, one of them is None"""
+    from jira import JIRAError
+    from .jira_adapter import encode_issue_fields
+    results = []
+    for row, error in rows:
+        if error is not None:
+            results.append((None, error))
+            continue
+        try:
+            row = parse_row(row)
+            details = row.summary if row.description is None else "{}\n{}".format(row.summary, row.description)
+            fields = encode_issue_fields(project_key, row.issue_type, row.component,
+                                         row.fix_version or default_fix_version, details,
+                                         priority=row.priority, assignee=row.assignee or default_assignee,
+                                         parent=row.parent, additional_fields=row.additional_fields, due=row.due)
+            results.append((fields, None))
+        except JIRAError as error:
+            results.append((None, error.text or 'status {}'.format(error.status_code)))
+        except (ValueError, KeyError, AttributeError, TypeError) as error:
+            results.append((None, str(error) or repr(error)))
+    return results
@@ -0,0 +1,134 @@
+"""the changelogs of issues, kept in the local store so `jissue history` only fetches the issues updated since its
+last run. the watermark of a project is the latest `updated` timestamp fetched, it only advances after a complete fetch.
+
+searching with expand=changelog truncates the histories of long-lived issues, those are completed through the
+paginated changelog of the issue. when only a few issues changed, it is cheaper to skip the expansion altogether and
+fetch the changelog of each issue concurrently (the two-phase plan)."""
+from infi.pyutils.lazy import cached_function
+from logging import getLogger
+from .issue_search import DEFAULT_PAGE_SIZE
+from .timestamps import parse_timestamp, to_utc_string
+
+
+logger = getLogger(__name__)
+
+
+AUTO_PLAN, SEARCH_PLAN, TWO_PHASE_PLAN = 'auto', 'search', 'two-phase'
+# the auto plan is two-phase if the changelogs can be fetched in this many rounds of concurrent requests
+TWO_PHASE_MAX_ROUNDS = 2
+
+
+class ChangelogStore(object):
+    """the changelog items of issues, and the watermark of every project, in a sqlite database"""
+
+    def __init__(self, connection):
+        super(ChangelogStore, self).__init__()
+        self._connection = connection
+        with connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS changelog_items (project TEXT, issue_key TEXT, history_id TEXT, "
+                               "created TEXT, created_utc TEXT, field TEXT, from_string TEXT, to_string TEXT)")
+            connection.execute("CREATE INDEX IF NOT EXISTS changelog_items_by_issue ON changelog_items (issue_key)")
+            connection.execute("CREATE INDEX IF NOT EXISTS changelog_items_by_field "
+                               "ON changelog_items (project, field, created_utc)")
+            connection.execute("CREATE TABLE IF NOT EXISTS changelog_watermarks (project TEXT PRIMARY KEY, updated TEXT)")
+
+    def get_watermark(self, project):
+        """:returns: the latest `updated` timestamp fetched for the project, or None"""
+        row = self._connection.execute("SELECT updated FROM changelog_watermarks WHERE project = ?",
+                                       (project, )).fetchone()
+        return None if row is None else row[0]
+
+    def set_watermark(self, project, updated):
+        with self._connection:
+            self._connection.execute("INSERT OR REPLACE INTO changelog_watermarks (project, updated) VALUES (?, ?)",
+                                     (project, updated))
+
+    def clear(self, project):
+        with self._connection:
+            self._connection.execute("DELETE FROM changelog_items WHERE project = ?", (project, ))
+            self._connection.execute("DELETE FROM changelog_watermarks WHERE project = ?", (project, ))
+
+    def update_issues(self, project, issues):
+        """replaces the stored changelogs of issues, given as raw JSON with an expanded changelog"""
+        with self._connection:
+            for issue in issues:
+                self._connection.execute("DELETE FROM changelog_items WHERE issue_key = ?", (issue['key'], ))
+                self._connection.executemany("INSERT INTO changelog_items VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                                             [(project, issue['key'], history['id'], history['created'],
+                                               to_utc_string(history['created']), item.get('field'),
+                                               item.get('fromString'), item.get('toString'))
+                                              for history in issue.get('changelog', dict()).get('histories', [])
+                                              for item in history.get('items', [])])
+
+    def iter_changes(self, project, field):
+        """:returns: (issue key, created, from, to) tuples of the changes of a field in a project, oldest first"""
+        return self._connection.execute("SELECT issue_key, created, from_string, to_string FROM changelog_items "
+                                        "WHERE project = ? AND field = ? ORDER BY created_utc, issue_key, history_id",
+                                        (project, field))
+
+
+@cached_function
+def get_changelog_store():
+    from .local_store import get_local_store
+    return ChangelogStore(get_local_store())
+
+
+def is_truncated(issue):
+    changelog = issue.get('changelog', dict())
+    return len(changelog.get('histories', [])) < changelog.get('total', 0)
+
+
+def _fetch_histories(issues, workers):
+    """replaces the changelogs of the issues (raw JSON) with their complete changelogs, fetched concurrently"""
+    from .concurrency import iter_concurrently, get_jira_request_limit
+    from .jira_adapter import get_issue_histories
+    keys = [issue['key'] for issue in issues]
+    for issue, histories in zip(issues, iter_concurrently(get_issue_histories, keys, workers, get_jira_request_limit())):
+        issue['changelog'] = dict(startAt=0, maxResults=len(histories), total=len(histories), histories=histories)
+
+
+def iter_pages_with_changelogs(query, page_size=DEFAULT_PAGE_SIZE, workers=1, plan=AUTO_PLAN):
+    """:returns: an iterator over pages of the matching issues as raw JSON, each with its complete changelog"""
+    from .jira_adapter import search_issues
+    if plan != SEARCH_PLAN:
+        search = search_issues(query, page_size=page_size, workers=workers, fields='updated')
+        if plan == TWO_PHASE_PLAN or search.total <= max(workers, 1) * TWO_PHASE_MAX_ROUNDS:
+            logger.debug("fetching the changelogs of {} issues one by one".format(search.total))
+            for page in search.iter_pages():
+                issues = [issue.raw for issue in page]
+                _fetch_histories(issues, workers)
+                yield issues
+            return
+    for page in search_issues(query, page_size=page_size, workers=workers, expand='changelog',
+                              fields='updated').iter_pages():
+        issues = [issue.raw for issue in page]
+        truncated = [issue for issue in issues if is_truncated(issue)]
+        if truncated:
+            logger.debug("completing the truncated changelogs of {} issues".format(len(truncated)))
+            _fetch_histories(truncated, workers)
+        yield issues
+
+
+def update_changelog(project, full=False, page_size=DEFAULT_PAGE_SIZE, workers=None, store=None, plan=AUTO_PLAN):
+    """fetches the changelogs of the issues updated since the last update of the project, or of all its issues.
+    :returns: the number of issues fetched"""
+    from .config import Configuration
+    from .local_store import get_updated_since_query
+    store = store or get_changelog_store()
+    workers = Configuration.from_file().search_workers if workers is None else workers
+    if full:
+        store.clear(project)
+    watermark = store.get_watermark(project)
+    latest, count = watermark, 0
+    latest_timestamp = None if watermark is None else parse_timestamp(watermark)
+    for issues in iter_pages_with_changelogs(get_updated_since_query(project, watermark), page_size, workers, plan):
+        store.update_issues(project, issues)
+        count += len(issues)
+        for issue in issues:
+            updated = issue['fields'].get('updated')
+            if updated and (latest is None or parse_timestamp(updated) > latest_timestamp):
+                latest, latest_timestamp = updated, parse_timestamp(updated)
+    if latest is not None:
+        store.set_watermark(project, latest)
+    logger.debug("fetched the changelogs of {} issues of {}".format(count, project))
+    return count
@@ -0,0 +1,81 @@
+from infi.pyutils.lazy import cached_function
+from threading import BoundedSemaphore, Lock
+from .config import Configuration
+
+
+@cached_function
+def get_request_limit(fqdn):
+    """:returns: a semaphore that caps the number of concurrent requests to a server, shared by all worker pools"""
+    return BoundedSemaphore(Configuration.from_file().max_concurrent_requests)
+
+
+def get_jira_request_limit():
+    return get_request_limit(Configuration.from_file().jira_fqdn)
+
+
+class RateLimit(object):
+    """spaces the requests of all the threads sharing it to at most `rate` per second.
+    used like the request limit semaphore, entering it waits for the next free slot"""
+
+    def __init__(self, rate):
+        super(RateLimit, self).__init__()
+        self._interval = 1.0 / rate
+        self._lock = Lock()
+        self._next_slot = 0.0
+
+    def __enter__(self):
+        from time import monotonic, sleep
+        with self._lock:
+            now = monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self._interval
+        if slot > now:
+            sleep(slot - now)
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+@cached_function
+def get_rate_limit(fqdn):
+    """:returns: the RateLimit of a server shared by all worker pools, None if max_requests_per_second is 0"""
+    rate = Configuration.from_file().max_requests_per_second
+    return RateLimit(rate) if rate else None
+
+
+def get_jira_rate_limit():
+    return get_rate_limit(Configuration.from_file().jira_fqdn)
+
+
+def iter_concurrently(func, items, workers, request_limit=None, rate_limit=None):
+    """calls func on every item in a pool of worker threads, yields the results in the order of the items.
+    at most `workers` calls are in flight at once, so results are not accumulated ahead of the consumer.
+    request_limit caps the concurrent calls across pools, rate_limit (a RateLimit) the calls per second"""
+    from concurrent.futures import ThreadPoolExecutor
+    from collections import deque
+    from itertools import islice
+
+    def _call(item):
+        if rate_limit is not None:
+            with rate_limit:
+                pass
+        if request_limit is None:
+            return func(item)
+        with request_limit:
+            return func(item)
+
+    items = iter(items)
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+        try:
+            for item in islice(items, max(workers, 1)):
+                pending.append(executor.submit(_call, item))
+            while pending:
+                result = pending.popleft().result()
+                for item in islice(items, 1):
+                    pending.append(executor.submit(_call, item))
+                yield result
+        finally:
+            for future in pending:
+                future.cancel()
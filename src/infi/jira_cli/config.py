@@ -1,6 +1,8 @@
 from os import path, getenv
 
 CONFIGFILE_PATH_DEFAULT = path.expanduser(path.join("~", ".jissue"))
+CACHE_DIRPATH_DEFAULT = path.expanduser(path.join("~", ".infi.jira_cli", "cache"))
+DAEMON_SOCKET_PATH_DEFAULT = path.expanduser(path.join("~", ".infi.jira_cli", "daemon.sock"))
 
 
 class ConfigurationError(Exception):
@@ -11,11 +13,24 @@ class Configuration(object):
     def __init__(self):
         self.jira_fqdn = ''
         self.confluence_fqdn = ''
+        self.search_workers = 4
+        self.max_concurrent_requests = 8
+        self.max_requests_per_second = 50
+        self.http_pool_size = 10
+        self.http_timeout = 60
 
     @classmethod
     def get_filepath(cls):
         return getenv("INFI_JIRA_CLI_CONFIG_PATH", CONFIGFILE_PATH_DEFAULT)
 
+    @classmethod
+    def get_cache_dirpath(cls):
+        return getenv("INFI_JIRA_CLI_CACHE_PATH", CACHE_DIRPATH_DEFAULT)
+
+    @classmethod
+    def get_daemon_socket_path(cls):
+        return getenv("INFI_JIRA_CLI_DAEMON_SOCKET_PATH", DAEMON_SOCKET_PATH_DEFAULT)
+
     @classmethod
     def from_file(cls):
         from json import load
@@ -31,7 +46,10 @@ class Configuration(object):
         return self
 
     def serialize(self):
-        return dict(jira_fqdn=self.jira_fqdn, confluence_fqdn=self.confluence_fqdn)
+        return dict(jira_fqdn=self.jira_fqdn, confluence_fqdn=self.confluence_fqdn,
+                    search_workers=self.search_workers, max_concurrent_requests=self.max_concurrent_requests,
+                    max_requests_per_second=self.max_requests_per_second,
+                    http_pool_size=self.http_pool_size, http_timeout=self.http_timeout)
 
     def save(self):
         from json import dump
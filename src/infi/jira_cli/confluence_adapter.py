@@ -1,7 +1,6 @@
 from infi.pyutils.lazy import cached_function
 from .config import Configuration
 import json
-import requests
 try:
     from urlparse import urljoin
 except:
@@ -24,6 +23,15 @@ def get_headers():
     return {'Accept': 'application/json', 'X-Atlassian-Token': 'no-check'}
 
 
+@cached_function
+def get_session():
+    """:returns: the pooled, authenticated session of the confluence server"""
+    from .http_session import get_session as get_server_session
+    session = get_server_session(Configuration.from_file().confluence_fqdn)
+    session.auth = get_auth()
+    return session
+
+
 @cached_function
 def _get_confluence_uri(path):
     config = Configuration.from_file()
@@ -36,10 +44,9 @@ def _get_confluence_uri(path):
 def _get_confluence_global_response(global_label):
     # Consider only pages under TWDRAFTS space with suffix of vPUBLISHED
     project_params = dict(type='page', label='global:{}'.format(global_label), query='"*vPUBLISHED$"', spaceKey='TWDRAFTS')
-    return requests.get(_get_confluence_uri('prototype/1/search/site'),
-                        params=project_params,
-                        headers=get_headers(),
-                        auth=get_auth()).json()
+    return get_session().get(_get_confluence_uri('prototype/1/search/site'),
+                             params=project_params,
+                             headers=get_headers()).json()
 
 
 def _extract_id_set(response):
@@ -62,18 +69,16 @@ def _intersect_and_extract_single_id_or_none(response1, response2):
 
 def add_label_to_page(page_id, label_name):
     data = dict(prefix='global', name=label_name)
-    return requests.post(_get_confluence_uri('api/content/{}/label'.format(page_id)),
-                        data=json.dumps(data),
-                        headers=get_headers(),
-                        auth=get_auth()).json()
+    return get_session().post(_get_confluence_uri('api/content/{}/label'.format(page_id)),
+                              data=json.dumps(data),
+                              headers=get_headers()).json()
 
 
 def remove_label_from_page(page_id, label_name):
     params = dict(name=label_name)
-    return requests.delete(_get_confluence_uri('api/content/{}/label'.format(page_id)),
-                        params=params,
-                        headers=get_headers(),
-                        auth=get_auth())
+    return get_session().delete(_get_confluence_uri('api/content/{}/label'.format(page_id)),
+                                params=params,
+                                headers=get_headers())
 
 
 def get_project_response(project_name):
@@ -99,22 +104,19 @@ def get_release_notes_footer_page_id(project_name):
 
 
 def get_page_contents(page_id):
-    page = requests.get(_get_confluence_uri('api/content/{}?expand=body.export_view,version.number'.format(page_id)),
-                        auth=get_auth(),
-                        headers=get_headers()).json()
+    page = get_session().get(_get_confluence_uri('api/content/{}?expand=body.export_view,version.number'.format(page_id)),
+                             headers=get_headers()).json()
     return page['body']['export_view']['value'].replace(u'\xc3\x82', '').replace(u'\xc2\xa0', '')
 
 
 def get_page_storage(page_id):
-    page = requests.get(_get_confluence_uri('api/content/{}?expand=body.storage,version.number'.format(page_id)),
-                        auth=get_auth(),
-                        headers=get_headers()).json()
+    page = get_session().get(_get_confluence_uri('api/content/{}?expand=body.storage,version.number'.format(page_id)),
+                             headers=get_headers()).json()
     return page['body']['storage']['value'].replace(u'\xc3\x82', '').replace(u'\xc2\xa0', '')
 
 
 def update_page_contents(page_id, body):
-    page = requests.get(_get_confluence_uri('api/content/{}?expand=body.view,version.number,ancestors'.format(page_id)),
-                        auth=get_auth()).json()
+    page = get_session().get(_get_confluence_uri('api/content/{}?expand=body.view,version.number,ancestors'.format(page_id))).json()
     data = dict(version=dict(number=page['version']['number']+1),
                 id=page['id'], title=page['title'], type='page',
                 body=dict(storage=dict(representation='storage', value=body)))
@@ -122,14 +124,13 @@ def update_page_contents(page_id, body):
         data['ancestors'] = [dict(id=page['ancestors'][-1]['id'])]
     remove_label_from_page(page_id, "zendesk-publish")
     add_label_to_page(page_id, "zendesk-skip-sync")
-    requests.put(_get_confluence_uri('api/content/{}'.format(page_id)), json=data, auth=get_auth()).raise_for_status()
+    get_session().put(_get_confluence_uri('api/content/{}'.format(page_id)), json=data).raise_for_status()
 
 
 def iter_attachments(page_id, start=0, limit=50):
-    data = requests.get(_get_confluence_uri('api/content/{page_id}/child/attachment'.format(page_id=page_id)),
-                        headers=get_headers(),
-                        auth=get_auth(),
-                        params={'expand': 'id', 'start':start, 'limit':limit}).json()
+    data = get_session().get(_get_confluence_uri('api/content/{page_id}/child/attachment'.format(page_id=page_id)),
+                             headers=get_headers(),
+                             params={'expand': 'id', 'start':start, 'limit':limit}).json()
     for item in data['results']:
         yield dict(title=item['title'], link=item['_links']['download'].split('?')[0] + '?api=v2')
     if len(data['results']) == limit:
@@ -1,6 +1,5 @@
 from infi.credentials_store import CLICredentialsStore
 from logging import getLogger
-import requests
 from requests.auth import HTTPBasicAuth
 import json
 
@@ -20,8 +19,10 @@ class BasicAuthCredentialsStore(CLICredentialsStore):
     def authenticate(self, key, credentials):
         if credentials is None:
             return False
+        from .http_session import get_session
         auth = HTTPBasicAuth(credentials.get_username(), credentials.get_password())
-        response = requests.get(self._auth_test_uri_template.format(fqdn=self._fqdn), auth=auth)
+        # the connection opened here is kept in the pool for the requests that follow
+        response = get_session(self._fqdn).get(self._auth_test_uri_template.format(fqdn=self._fqdn), auth=auth)
         return response.status_code == 200
 
 
@@ -1,7 +1,6 @@
 from infi.pyutils.lazy import cached_function
 from .config import Configuration
-from infi.jira_cli.jira_adapter import get_auth
-import requests
+from infi.jira_cli.jira_adapter import get_jira_session
 try:
     from urlparse import urljoin
 except:
@@ -9,7 +8,6 @@ except:
 
 
 BASE_REST_URI = "https://{fqdn}/rest/"
-FIELD_URI = "/api/2/field"
 ADD_URI = "jiracustomfieldeditorplugin/1/user/customfields/{customfield_id}/contexts/default/options"
 GET_URI = "jiracustomfieldeditorplugin/1/user/customfields/{customfield_id}/contexts/default/options"
 REORDER_URI = "jiracustomfieldeditorplugin/1/user/customfields/{customfield_id}//contexts/default/options/{option_id}/move"
@@ -28,57 +26,58 @@ def get_jira_url(endpoint, *args, **kwargs):
 
 
 def get_fields():
-    config = Configuration.from_file()
-    return requests.get(get_jira_url(FIELD_URI),
-                        auth=get_auth(config.jira_fqdn),
-                        headers=get_headers()).json()
+    from .jira_adapter import get_field_registry
+    return get_field_registry().fields
 
 
 def get_custom_field_id_by_name(name):
-    [custom_field] = [custom_field for custom_field in get_fields() if
-                      custom_field["name"] == name]
-    return custom_field['id']
+    from .jira_adapter import lookup_field
+    return lookup_field(lambda registry: registry.get_field_id(name))
 
 
 def get_options_for_custom_field(field_id):
-    config = Configuration.from_file()
-    response = requests.get(get_jira_url(GET_URI.format(customfield_id=field_id.split('_')[1])),
-                        auth=get_auth(config.jira_fqdn),
-                        headers=get_headers())
+    response = get_jira_session().get(get_jira_url(GET_URI.format(customfield_id=field_id.split('_')[1])),
+                                      headers=get_headers())
     response.raise_for_status()
     return response.json()
 
 
 def update_custom_dropdown_field(field_id, values, sort_options_alphabetically=True):
+    from .async_client import map_concurrently, raise_first_error
     options = get_options_for_custom_field(field_id)
 
     field_options = {item['optionvalue']: item for item in options}
     # we shouldn't delete old values, as existing issues can use them
-    new_values = set(value for value in values if value not in list(field_options.keys()))
-    config = Configuration.from_file()
+    new_values = sorted(set(value for value in values if value not in list(field_options.keys())))
+
+    async def _add_option(client, value):
+        response = await client.request('POST', get_jira_url(ADD_URI.format(customfield_id=field_id)),
+                                        data=dict(disabled=False, optionvalue=value))
+        return response.json()
 
-    for value in new_values:
-        data = dict(disabled=False, optionvalue=value)
-        new_option = requests.post(get_jira_url(ADD_URI.format(customfield_id=field_id)),
-                                   auth=get_auth(config.jira_fqdn),
-                                   data=data).json()
-        field_options[value] = new_option
+    # the new options are added concurrently, at the end of the list in the order the requests land
+    raise_first_error(map_concurrently(_add_option, new_values))
 
     if sort_options_alphabetically:
-        sort_custom_dropdown_field(field_id, list(field_options.values()))
+        sort_custom_dropdown_field(field_id, get_options_for_custom_field(field_id) if new_values else options)
 
 
 def sort_custom_dropdown_field(field_id, values):
+    """:param values: the options, in their current order"""
+    if [item['optionvalue'] for item in values] == sorted(item['optionvalue'] for item in values):
+        return
+    # every option is moved to the top, so the moves depend on each other and are sent one by one
     sorted_options = sorted(values, key=lambda item: item['optionvalue'], reverse=True)
-    config = Configuration.from_file()
     for option in sorted_options:
         uri = get_jira_url(REORDER_URI.format(customfield_id=field_id, option_id=option['id']))
-        requests.post(uri, auth=get_auth(config.jira_fqdn), data=dict(position="First"))
+        get_jira_session().post(uri, data=dict(position="First"))
 
 
 def wipe_all_options_in_custom_dropdown_field(field_id):
+    from .async_client import map_concurrently, raise_first_error
     options = get_options_for_custom_field(field_id)
-    config = Configuration.from_file()
-    for option in options:
-        uri = get_jira_url(DELETE_URI.format(customfield_id=field_id, option_id=option['id']))
-        requests.delete(uri, auth=get_auth(config.jira_fqdn))
+
+    async def _delete_option(client, option):
+        await client.delete(get_jira_url(DELETE_URI.format(customfield_id=field_id, option_id=option['id'])))
+
+    raise_first_error(map_concurrently(_delete_option, options))
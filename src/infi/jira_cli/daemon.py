@@ -0,0 +1,252 @@
+"""an opt-in resident process that keeps the authenticated JIRA client and its in-memory caches warm.
+
+the entry points forward their argv and environment to it over a unix domain socket, together with their
+stdin/stdout/stderr file descriptors, so commands run in the daemon behave as if they ran in the calling shell.
+if the daemon is not running, or was started with a different configuration than the caller's, the entry points run
+the command in-process as usual."""
+from __future__ import print_function
+from logging import getLogger
+from os import path
+import socket
+import json
+import os
+
+
+logger = getLogger(__name__)
+
+
+DEFAULT_IDLE_TIMEOUT = 30 * 60
+MAX_MESSAGE_SIZE = 1024 * 1024
+STANDARD_FILE_DESCRIPTORS = (0, 1, 2)
+
+
+def get_socket_path():
+    from .config import Configuration
+    return Configuration.get_daemon_socket_path()
+
+
+def get_config_key():
+    """:returns: what the client and the caches of a process depend on: the configuration file and its contents.
+    the daemon serves only clients with the configuration it started with"""
+    from .config import Configuration, ConfigurationError
+    try:
+        config = Configuration.from_file().serialize()
+    except (ConfigurationError, IOError, OSError, ValueError):
+        config = None
+    return [path.realpath(Configuration.get_filepath()), config]
+
+
+def _get_entry_points():
+    from .jissue import _jissue
+    from .jish import _jish
+    from .jirelease import _jiject as _jirelease
+    from .jirelnotes import _jiject as _jirelnotes
+    return dict(jissue=_jissue,
+                jish=lambda argv, environ: _jish(argv),
+                jirelease=_jirelease,
+                jirelnotes=_jirelnotes)
+
+
+def _send_message(connection, message, fds=()):
+    from array import array
+    data = json.dumps(message).encode('utf-8')
+    ancillary = [(socket.SOL_SOCKET, socket.SCM_RIGHTS, array('i', fds).tobytes())] if fds else []
+    connection.sendmsg([data], ancillary)
+    connection.shutdown(socket.SHUT_WR)
+
+
+def _receive_message(connection):
+    """:returns: a (message, file descriptors) tuple"""
+    from array import array
+    fds = array('i')
+    data, ancillary, flags, address = connection.recvmsg(MAX_MESSAGE_SIZE, socket.CMSG_SPACE(len(STANDARD_FILE_DESCRIPTORS) * fds.itemsize))
+    for level, kind, fd_data in ancillary:
+        if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+            fds.frombytes(fd_data[:len(fd_data) - (len(fd_data) % fds.itemsize)])
+    while True:
+        chunk = connection.recv(MAX_MESSAGE_SIZE)
+        if not chunk:
+            break
+        data += chunk
+    return json.loads(data.decode('utf-8')), list(fds)
+
+
+def _connect():
+    socket_path = get_socket_path()
+    if not path.exists(socket_path):
+        return None
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        connection.connect(socket_path)
+    except socket.error:
+        connection.close()
+        return None
+    return connection
+
+
+def _request(message, fds=()):
+    """:returns: the response of the daemon, or None if it isn't running"""
+    connection = _connect()
+    if connection is None:
+        return None
+    try:
+        _send_message(connection, message, fds)
+        response, _ = _receive_message(connection)
+        return response
+    except (socket.error, ValueError) as error:
+        logger.debug("daemon request failed: {}".format(error))
+        return None
+    finally:
+        connection.close()
+
+
+def forward(entry_point, argv, environ):
+    """runs the command in the daemon.
+    :returns: the exit code of the command, or None if the daemon is not running and the command should run in-process"""
+    if argv and argv[0] == 'daemon':
+        return None
+    response = _request(dict(command='run', entry_point=entry_point, argv=list(argv),
+                             environ=dict(environ), cwd=os.getcwd(), config=get_config_key()),
+                        fds=STANDARD_FILE_DESCRIPTORS)
+    return None if response is None else response['returncode']
+
+
+def is_running():
+    return _request(dict(command='ping')) is not None
+
+
+def stop():
+    return _request(dict(command='stop')) is not None
+
+
+def start(idle_timeout=DEFAULT_IDLE_TIMEOUT):
+    from subprocess import Popen
+    from sys import executable
+    with open(os.devnull, 'r+') as devnull:
+        Popen([executable, '-m', 'infi.jira_cli.daemon', str(idle_timeout)],
+              stdin=devnull, stdout=devnull, stderr=devnull, close_fds=True, start_new_session=True)
+
+
+class _ClientContext(object):
+    """temporarily runs the daemon with the file descriptors, environment and working directory of a client"""
+
+    def __init__(self, fds, environ, cwd):
+        super(_ClientContext, self).__init__()
+        self._fds = fds
+        self._environ = environ
+        self._cwd = cwd
+
+    def _flush(self):
+        import sys
+        for stream in (sys.stdout, sys.stderr):
+            try:
+                stream.flush()
+            except (IOError, OSError, ValueError):
+                pass
+
+    def _set_line_buffering(self, line_buffering):
+        import sys
+        if hasattr(sys.stdout, 'reconfigure'):
+            sys.stdout.reconfigure(line_buffering=line_buffering)
+
+    def __enter__(self):
+        self._saved_fds = [os.dup(fd) for fd in STANDARD_FILE_DESCRIPTORS]
+        self._saved_environ = dict(os.environ)
+        self._saved_cwd = os.getcwd()
+        for client_fd, fd in zip(self._fds, STANDARD_FILE_DESCRIPTORS):
+            os.dup2(client_fd, fd)
+        self._set_line_buffering(os.isatty(1))
+        os.environ.clear()
+        os.environ.update(self._environ)
+        os.chdir(self._cwd)
+        return self
+
+    def __exit__(self, *args, **kwargs):
+        self._flush()
+        self._set_line_buffering(False)
+        for saved_fd, fd in zip(self._saved_fds, STANDARD_FILE_DESCRIPTORS):
+            os.dup2(saved_fd, fd)
+            os.close(saved_fd)
+        for client_fd in self._fds:
+            os.close(client_fd)
+        os.environ.clear()
+        os.environ.update(self._saved_environ)
+        os.chdir(self._saved_cwd)
+
+
+def _close(fds):
+    for fd in fds:
+        os.close(fd)
+
+
+def _run(message, fds):
+    from .jira_adapter import clear_request_caches
+    entry_point = _get_entry_points().get(message['entry_point'])
+    if entry_point is None:
+        _close(fds)
+        return 1
+    clear_request_caches()
+    with _ClientContext(fds, message['environ'], message['cwd']):
+        try:
+            returncode = entry_point(message['argv'], dict(os.environ))
+        except SystemExit as error:
+            returncode = error.code
+        except Exception:
+            logger.exception("command failed in the daemon")
+            returncode = 1
+    return returncode or 0
+
+
+def serve(idle_timeout=DEFAULT_IDLE_TIMEOUT):
+    """serves commands one at a time until stopped or until no command arrives for idle_timeout seconds"""
+    socket_path = get_socket_path()
+    if not path.exists(path.dirname(socket_path)):
+        os.makedirs(path.dirname(socket_path))
+    if path.exists(socket_path):
+        os.remove(socket_path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    os.chmod(socket_path, 0o600)
+    server.listen(16)
+    server.settimeout(idle_timeout)
+    _get_entry_points()  # import everything up-front, this is what the daemon is here for
+    from .jira_adapter import clear_expired_metadata
+    from time import time
+    config_key = get_config_key()
+    checked_at = time()
+    try:
+        while True:
+            try:
+                connection, _ = server.accept()
+            except socket.timeout:
+                logger.info("daemon was idle for {} seconds, exiting".format(idle_timeout))
+                break
+            connection.settimeout(None)
+            try:
+                message, fds = _receive_message(connection)
+                if message['command'] == 'run' and message.get('config') != config_key:
+                    logger.debug("the client has a different configuration, letting it run the command in-process")
+                    _close(fds)
+                    _send_message(connection, dict(returncode=None))
+                    continue
+                if message['command'] == 'run':
+                    checked_at = clear_expired_metadata(checked_at)
+                    _send_message(connection, dict(returncode=_run(message, fds)))
+                    continue
+                _close(fds)
+                _send_message(connection, dict(returncode=0))
+                if message['command'] == 'stop':
+                    break
+            except (socket.error, ValueError, KeyError) as error:
+                logger.debug("bad daemon request: {}".format(error))
+            finally:
+                connection.close()
+    finally:
+        server.close()
+        if path.exists(socket_path):
+            os.remove(socket_path)
+
+
+if __name__ == '__main__':
+    from sys import argv
+    serve(int(argv[1]) if len(argv) > 1 else DEFAULT_IDLE_TIMEOUT)
@@ -0,0 +1,50 @@
+from __future__ import print_function
+from functools import wraps
+
+
+def print_known_error(error):
+    """prints the errors we expect to stderr.
+    the exception classes are imported only after something went wrong, to keep them out of the startup time.
+    :returns: True if the error was printed, False if it was unexpected"""
+    from sys import stderr
+    from .config import ConfigurationError
+    if isinstance(error, ConfigurationError):
+        print(error, file=stderr)
+        return True
+    from jira import JIRAError
+    if isinstance(error, JIRAError):
+        print(error, file=stderr)
+        return True
+    from .issue_mirror import MirrorError
+    if isinstance(error, MirrorError):
+        print(error, file=stderr)
+        return True
+    from .version_index import VersionNotFound
+    if isinstance(error, VersionNotFound):
+        print(error, file=stderr)
+        return True
+    from infi.execute import ExecutionError
+    if isinstance(error, ExecutionError):
+        print(error.result.get_stderr() + error.result.get_stdout(), file=stderr)
+        return True
+    return False
+
+
+def exception_handler(func):
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        from sys import stderr
+        from docopt import DocoptExit
+        try:
+            return func(*args, **kwargs) or 0
+        except DocoptExit as e:
+            print(e, file=stderr)
+            return 1
+        except SystemExit as e:
+            print(e, file=stderr)
+            return 0
+        except Exception as e:
+            if not print_known_error(e):
+                raise
+        return 1
+    return wrapper
@@ -0,0 +1,76 @@
+"""compiled extractors of the issue columns that the commands render.
+
+every column is a (fields, getter) pair: the issue fields it reads and a function of (issue, issue.fields()).
+getters return None, or an empty list, for values that are missing instead of raising, e.g. for unassigned issues"""
+from .timestamps import from_jira_formatted_datetime
+
+RANK_FIELD = 'customfield_10700'
+
+
+def _get(fields, name, default=None):
+    value = getattr(fields, name, None)
+    return default if value is None else value
+
+
+def _get_attribute(fields, name, attribute='name', default=None):
+    value = getattr(fields, name, None)
+    return default if value is None else getattr(value, attribute, default)
+
+
+def _get_names(fields, name):
+    return [item.name for item in getattr(fields, name, None) or ()]
+
+
+def _get_int(fields, name):
+    value = getattr(fields, name, None)
+    return None if value is None else int(value)
+
+
+def _get_datetime(fields, name):
+    value = getattr(fields, name, None)
+    return None if value is None else from_jira_formatted_datetime(value)
+
+
+COLUMNS = dict(Rank=((RANK_FIELD, ), lambda issue, fields: _get_int(fields, RANK_FIELD)),
+               Type=(('issuetype', ), lambda issue, fields: _get_attribute(fields, 'issuetype')),
+               Key=((), lambda issue, fields: issue.key),
+               Summary=(('summary', ), lambda issue, fields: _get(fields, 'summary')),
+               Description=(('description', ), lambda issue, fields: _get(fields, 'description')),
+               Priority=(('priority', ), lambda issue, fields: _get_attribute(fields, 'priority')),
+               Project=(('project', ), lambda issue, fields: _get_attribute(fields, 'project')),
+               Status=(('status', ), lambda issue, fields: _get_attribute(fields, 'status')),
+               Resolution=(('resolution', ), lambda issue, fields: _get_attribute(fields, 'resolution', default="Unresolved")),
+               Created=(('created', ), lambda issue, fields: _get_datetime(fields, 'created')),
+               Updated=(('updated', ), lambda issue, fields: _get_datetime(fields, 'updated')),
+               Assignee=(('assignee', ), lambda issue, fields: _get_attribute(fields, 'assignee', 'displayName', "Unassigned")),
+               Reporter=(('reporter', ), lambda issue, fields: _get_attribute(fields, 'reporter', 'displayName')),
+               Labels=(('labels', ), lambda issue, fields: _get(fields, 'labels', [])),
+               Comments=(('comment', ), lambda issue, fields: _get_attribute(fields, 'comment', 'comments', [])),
+               AffectsVersions=(('versions', ), lambda issue, fields: _get_names(fields, 'versions')),
+               FixVersions=(('fixVersions', ), lambda issue, fields: _get_names(fields, 'fixVersions')),
+               Components=(('components', ), lambda issue, fields: _get_names(fields, 'components')),
+               IssueLinks=(('issuelinks', ), lambda issue, fields: _get(fields, 'issuelinks', [])),
+               SubTasks=(('subtasks', ), lambda issue, fields: _get(fields, 'subtasks', [])),
+               Attachments=(('attachment', ), lambda issue, fields: _get(fields, 'attachment', [])),
+               )
+
+
+def get_column_fields(columns):
+    """:returns: the issue fields that the columns read"""
+    return tuple(field for column in columns for field in COLUMNS[column][0])
+
+
+def compile_extractor(columns):
+    """:returns: a function that reads the fields of an issue once and returns the tuple of the values of the columns"""
+    getters = tuple(COLUMNS[column][1] for column in columns)
+
+    def extract(issue):
+        fields = issue.fields()
+        return tuple([getter(issue, fields) for getter in getters])
+    return extract
+
+
+def compile_column(column):
+    """:returns: a function that returns the value of a single column of an issue"""
+    getter = COLUMNS[column][1]
+    return lambda issue: getter(issue, issue.fields())
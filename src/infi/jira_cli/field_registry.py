@@ -0,0 +1,65 @@
+from types import MappingProxyType
+
+
+class FieldRegistry(object):
+    """indexes the /rest/api/2/field list by name, id and schema, so lookups don't scan the list"""
+
+    def __init__(self, fields):
+        super(FieldRegistry, self).__init__()
+        self._fields = fields
+        self._names_by_id = dict()
+        self._schemas_by_id = dict()
+        self._ids_by_name = dict()
+        self._ids_by_lowercase_name = dict()
+        self._custom_ids_by_name = dict()
+        self._custom_ids_by_lowercase_name = dict()
+        self._custom_types_by_name = dict()
+        for item in fields:
+            field_id, name = item['id'], item['name']
+            self._names_by_id[field_id] = name
+            self._schemas_by_id[field_id] = item.get('schema') or dict()
+            self._ids_by_name.setdefault(name, list()).append(field_id)
+            self._ids_by_lowercase_name.setdefault(name.lower(), list()).append(field_id)
+            if item.get('custom'):
+                self._custom_ids_by_name[name] = field_id
+                self._custom_types_by_name[name] = self._schemas_by_id[field_id].get('custom', '')
+                self._custom_ids_by_lowercase_name.setdefault(name.lower(), list()).append(field_id)
+
+    @property
+    def fields(self):
+        return self._fields
+
+    @property
+    def custom_fields(self):
+        """:returns: a read-only dict of custom field name to custom field id"""
+        return MappingProxyType(self._custom_ids_by_name)
+
+    @property
+    def custom_types(self):
+        """:returns: a read-only dict of custom field name to its custom type, see get_custom_type"""
+        return MappingProxyType(self._custom_types_by_name)
+
+    def _get_single_id(self, name, ids_by_name, ids_by_lowercase_name):
+        ids = ids_by_name.get(name)
+        if ids is None:
+            ids = ids_by_lowercase_name.get(name.lower(), list())
+        if isinstance(ids, list) and len(ids) != 1:
+            raise KeyError(name)
+        return ids[0] if isinstance(ids, list) else ids
+
+    def get_field_id(self, name):
+        """:returns: the id of the only field with this name, matched case-insensitively if there's no exact match"""
+        return self._get_single_id(name, self._ids_by_name, self._ids_by_lowercase_name)
+
+    def get_custom_field_id(self, name):
+        return self._get_single_id(name, self._custom_ids_by_name, self._custom_ids_by_lowercase_name)
+
+    def get_name(self, field_id):
+        return self._names_by_id[field_id]
+
+    def get_schema(self, field_id):
+        return self._schemas_by_id[field_id]
+
+    def get_custom_type(self, name):
+        """:returns: the custom type of a custom field, e.g. com.atlassian.jira.plugin.system.customfieldtypes:select"""
+        return self.get_schema(self.get_custom_field_id(name)).get('custom', '')
@@ -0,0 +1,44 @@
+from infi.pyutils.lazy import cached_function
+from logging import getLogger
+from requests import Session
+from requests.adapters import HTTPAdapter
+from .config import Configuration, ConfigurationError
+
+
+logger = getLogger(__name__)
+
+
+class PooledSession(Session):
+    """a requests session with a default timeout, whose keep-alive connections are reused by all callers"""
+
+    def __init__(self, timeout=None):
+        super(PooledSession, self).__init__()
+        self.timeout = timeout
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        return super(PooledSession, self).request(method, url, **kwargs)
+
+
+def _get_configuration():
+    try:
+        return Configuration.from_file()
+    except ConfigurationError:
+        return Configuration()
+
+
+def create_session(pool_size, timeout):
+    session = PooledSession(timeout=timeout)
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({'Accept-Encoding': 'gzip, deflate'})
+    return session
+
+
+@cached_function
+def get_session(fqdn):
+    """:returns: the pooled session of a server, callers that need authentication set it on the session or per request"""
+    config = _get_configuration()
+    logger.debug("creating a session for {} with {} connections".format(fqdn, config.http_pool_size))
+    return create_session(config.http_pool_size, config.http_timeout)
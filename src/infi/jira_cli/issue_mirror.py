@@ -0,0 +1,252 @@
+"""a mirror of the issues of projects in the local store, so list/search/show can answer without a round trip.
+`jissue sync` updates it incrementally through the issues updated since the previous sync, and removes the issues
+that were deleted or moved to another project since by listing the keys of the project.
+the columns that queries filter on are kept in indexed columns (compared case-insensitively, like JQL does), the rest
+of the issue is kept as raw JSON. queries are compiled to SQL by the jql module"""
+from infi.pyutils.lazy import cached_function
+from logging import getLogger
+from .issue_search import DEFAULT_PAGE_SIZE
+
+
+logger = getLogger(__name__)
+
+
+# the columns `jissue show` renders, except for the comments that are not mirrored
+MIRROR_COLUMNS = ["Project", "Key", "Summary", "Type", "Status", "Priority", "Resolution", "Assignee", "Reporter",
+                  "AffectsVersions", "FixVersions", "Components", "Created", "Updated", "Labels", "Description",
+                  "IssueLinks", "SubTasks", "Rank"]
+# multi-valued fields, kept in the issue_values table as (key, field, value) rows
+VALUE_FIELDS = ('versions', 'fixVersions', 'components', 'labels')
+ISSUE_COLUMNS = ('key', 'project', 'id', 'type', 'status', 'priority', 'priority_id', 'resolution', 'assignee_name',
+                 'assignee', 'reporter_name', 'reporter', 'summary', 'description', 'rank', 'created_utc',
+                 'updated_utc', 'raw')
+
+
+class MirrorError(Exception):
+    pass
+
+
+def _get_attribute(fields, name, attribute='name'):
+    value = fields.get(name)
+    return None if value is None else value.get(attribute)
+
+
+def _get_int(value):
+    return None if value is None else int(value)
+
+
+def _get_issue_row(issue):
+    import json
+    from .timestamps import to_utc_string
+    from .extractors import RANK_FIELD
+    fields = issue['fields']
+    project = _get_attribute(fields, 'project', 'key') or issue['key'].rsplit('-', 1)[0]
+    return (issue['key'], project, _get_int(issue.get('id')), _get_attribute(fields, 'issuetype'),
+            _get_attribute(fields, 'status'), _get_attribute(fields, 'priority'),
+            _get_int(_get_attribute(fields, 'priority', 'id')), _get_attribute(fields, 'resolution'),
+            _get_attribute(fields, 'assignee'), _get_attribute(fields, 'assignee', 'displayName'),
+            _get_attribute(fields, 'reporter'), _get_attribute(fields, 'reporter', 'displayName'),
+            fields.get('summary'), fields.get('description'), fields.get(RANK_FIELD),
+            to_utc_string(fields['created']) if fields.get('created') else None,
+            to_utc_string(fields['updated']) if fields.get('updated') else None,
+            json.dumps(issue))
+
+
+def _iter_value_rows(issue):
+    fields = issue['fields']
+    for field in VALUE_FIELDS:
+        for value in fields.get(field) or ():
+            yield issue['key'], field, value if isinstance(value, str) else value.get('name')
+
+
+class IssueMirror(object):
+    """the mirrored issues, and when each project was last synced, in a sqlite database"""
+
+    def __init__(self, connection):
+        super(IssueMirror, self).__init__()
+        self._connection = connection
+        with connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS issues (key TEXT COLLATE NOCASE PRIMARY KEY, "
+                               "project TEXT COLLATE NOCASE, id INTEGER, type TEXT COLLATE NOCASE, "
+                               "status TEXT COLLATE NOCASE, priority TEXT COLLATE NOCASE, priority_id INTEGER, "
+                               "resolution TEXT COLLATE NOCASE, assignee_name TEXT COLLATE NOCASE, assignee TEXT, "
+                               "reporter_name TEXT COLLATE NOCASE, reporter TEXT, summary TEXT, description TEXT, "
+                               "rank, created_utc TEXT, updated_utc TEXT, raw TEXT)")
+            for column in ('project', 'type', 'status', 'assignee_name', 'created_utc', 'updated_utc'):
+                connection.execute("CREATE INDEX IF NOT EXISTS issues_by_{0} ON issues ({0})".format(column))
+            connection.execute("CREATE TABLE IF NOT EXISTS issue_values (key TEXT, field TEXT, value TEXT COLLATE NOCASE)")
+            connection.execute("CREATE INDEX IF NOT EXISTS issue_values_by_key ON issue_values (key)")
+            connection.execute("CREATE INDEX IF NOT EXISTS issue_values_by_value ON issue_values (field, value)")
+            connection.execute("CREATE TABLE IF NOT EXISTS mirrored_projects "
+                               "(project TEXT PRIMARY KEY, watermark TEXT, synced_at REAL)")
+            connection.execute("CREATE TABLE IF NOT EXISTS mirror_settings (name TEXT PRIMARY KEY, value TEXT)")
+
+    def get_setting(self, name):
+        row = self._connection.execute("SELECT value FROM mirror_settings WHERE name = ?", (name, )).fetchone()
+        return None if row is None else row[0]
+
+    def set_setting(self, name, value):
+        with self._connection:
+            self._connection.execute("INSERT OR REPLACE INTO mirror_settings VALUES (?, ?)", (name, value))
+
+    def get_watermark(self, project):
+        """:returns: the latest `updated` timestamp mirrored for the project, or None"""
+        row = self._connection.execute("SELECT watermark FROM mirrored_projects WHERE project = ?",
+                                       (project, )).fetchone()
+        return None if row is None else row[0]
+
+    def get_synced_at(self, project):
+        """:returns: the time of the last complete sync of the project, or None if it was never synced"""
+        row = self._connection.execute("SELECT synced_at FROM mirrored_projects WHERE project = ?",
+                                       (project, )).fetchone()
+        return None if row is None else row[0]
+
+    def get_projects(self):
+        return [row[0] for row in self._connection.execute("SELECT project FROM mirrored_projects ORDER BY project")]
+
+    def set_synced(self, project, watermark, synced_at):
+        with self._connection:
+            self._connection.execute("INSERT OR REPLACE INTO mirrored_projects VALUES (?, ?, ?)",
+                                     (project, watermark, synced_at))
+
+    def clear(self, project):
+        with self._connection:
+            self._connection.execute("DELETE FROM issue_values WHERE key IN (SELECT key FROM issues WHERE project = ?)",
+                                     (project, ))
+            self._connection.execute("DELETE FROM issues WHERE project = ?", (project, ))
+            self._connection.execute("DELETE FROM mirrored_projects WHERE project = ?", (project, ))
+
+    def get_keys(self, project):
+        return set(row[0] for row in self._connection.execute("SELECT key FROM issues WHERE project = ?", (project, )))
+
+    def remove_issues(self, keys):
+        with self._connection:
+            self._connection.executemany("DELETE FROM issue_values WHERE key = ?", [(key, ) for key in keys])
+            self._connection.executemany("DELETE FROM issues WHERE key = ?", [(key, ) for key in keys])
+
+    def update_issues(self, issues):
+        """inserts or replaces issues, given as raw JSON"""
+        with self._connection:
+            self._connection.executemany("DELETE FROM issue_values WHERE key = ?", [(issue['key'], ) for issue in issues])
+            placeholders = ', '.join('?' * len(ISSUE_COLUMNS))
+            self._connection.executemany("INSERT OR REPLACE INTO issues VALUES ({})".format(placeholders),
+                                         [_get_issue_row(issue) for issue in issues])
+            self._connection.executemany("INSERT INTO issue_values VALUES (?, ?, ?)",
+                                         [row for issue in issues for row in _iter_value_rows(issue)])
+
+    def get_issue(self, key):
+        """:returns: the raw JSON of a mirrored issue, or None"""
+        import json
+        row = self._connection.execute("SELECT raw FROM issues WHERE key = ?", (key, )).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def iter_issues(self, where, parameters=(), order_by=None):
+        """:returns: an iterator over the raw JSON of the issues matching an SQL condition on the issues table"""
+        import json
+        cursor = self._connection.execute("SELECT raw FROM issues WHERE {} ORDER BY {}".format(where,
+                                                                                               order_by or "id DESC"),
+                                          parameters)
+        return (json.loads(row[0]) for row in cursor)
+
+
+@cached_function
+def get_issue_mirror():
+    from .local_store import get_local_store
+    return IssueMirror(get_local_store())
+
+
+def issue_from_raw(raw):
+    """:returns: an issue resource of a mirrored issue, it renders like a fetched one but is not bound to a server"""
+    from jira.resources import Issue
+    return Issue(dict(), None, raw=raw)
+
+
+def _prune_project(project, page_size, workers, mirror):
+    """removes the mirrored issues that are no longer in the project, deleted or moved to another one.
+    :returns: the number of issues removed"""
+    from .jira_adapter import search_issues
+    search = search_issues('project = {}'.format(project), page_size=page_size, workers=workers, fields='key')
+    keys = set(issue.raw['key'].upper() for page in search.iter_pages() for issue in page)
+    stale = [key for key in mirror.get_keys(project) if key.upper() not in keys]
+    mirror.remove_issues(stale)
+    return len(stale)
+
+
+def sync_project(project, full=False, page_size=DEFAULT_PAGE_SIZE, workers=None, mirror=None):
+    """mirrors the issues of the project updated since its previous sync, or all of them.
+    :returns: the number of issues fetched"""
+    from time import time
+    from .jira_adapter import search_issues, get_fields_for_mappings, get_auth
+    from .local_store import get_updated_since_query
+    from .timestamps import parse_timestamp
+    from .config import Configuration
+    mirror = mirror or get_issue_mirror()
+    if full:
+        mirror.clear(project)
+    mirror.set_setting('username', get_auth(Configuration.from_file().jira_fqdn).username)
+    started_at = time()
+    watermark = mirror.get_watermark(project)
+    latest, count = watermark, 0
+    latest_timestamp = None if watermark is None else parse_timestamp(watermark)
+    search = search_issues(get_updated_since_query(project, watermark), page_size=page_size, workers=workers,
+                           fields=get_fields_for_mappings(MIRROR_COLUMNS))
+    for page in search.iter_pages():
+        issues = [issue.raw for issue in page]
+        mirror.update_issues(issues)
+        count += len(issues)
+        for issue in issues:
+            updated = issue['fields'].get('updated')
+            if updated and (latest is None or parse_timestamp(updated) > latest_timestamp):
+                latest, latest_timestamp = updated, parse_timestamp(updated)
+    if watermark is not None:
+        logger.debug("removed {} issues that are no longer in {}".format(
+            _prune_project(project, page_size, workers, mirror), project))
+    mirror.set_synced(project, latest, started_at)
+    logger.debug("mirrored {} issues of {}".format(count, project))
+    return count
+
+
+def iter_matching_issues(query, mirror=None):
+    """:returns: a (projects, issues) tuple of the projects the query reads from and an iterator over the raw JSON of
+    the mirrored issues matching it. raises UnsupportedQuery if the query cannot be answered from the mirror, which is
+    also the case when a project it reads from was never synced"""
+    from .jql import compile_query, UnsupportedQuery
+    mirror = mirror or get_issue_mirror()
+    compiled = compile_query(query, mirror.get_setting('username'))
+    projects = mirror.get_projects() if compiled.projects is None else compiled.projects
+    try:
+        get_mirror_age(projects, mirror)
+    except MirrorError as error:
+        raise UnsupportedQuery(str(error))
+    return projects, mirror.iter_issues(compiled.where, compiled.parameters, compiled.order_by)
+
+
+def iter_assigned_issues(user, project=None, mirror=None, order_by=None):
+    """:returns: a (projects, issues) tuple like iter_matching_issues, of the query of get_issues__assigned_to_user
+    for a user (or the user who synced)"""
+    from .jira_adapter import get_assigned_issues_query, CURRENT_USER
+    return iter_matching_issues(get_assigned_issues_query(user or CURRENT_USER, project, order_by), mirror)
+
+
+def get_mirror_age(projects, mirror=None):
+    """:returns: a message saying how old the mirror of the projects is, raises MirrorError if one was never synced"""
+    from time import time
+    mirror = mirror or get_issue_mirror()
+    ages = []
+    for project in projects:
+        synced_at = mirror.get_synced_at(project)
+        if synced_at is None:
+            raise MirrorError("{} is not mirrored, run `jissue sync {}` first".format(project, project))
+        ages.append((time() - synced_at, project))
+    if not ages:
+        raise MirrorError("no project is mirrored, run `jissue sync <project>` first")
+    age, _ = max(ages)
+    return "offline: {} was synced {} ago".format(', '.join(sorted(item for _, item in ages)), format_duration(age))
+
+
+def format_duration(seconds):
+    for unit, size in (("day", 24 * 60 * 60), ("hour", 60 * 60), ("minute", 60)):
+        if seconds >= size:
+            count = int(seconds // size)
+            return "{} {}{}".format(count, unit, "s" if count > 1 else "")
+    return "{} seconds".format(int(seconds))
@@ -0,0 +1,83 @@
+from logging import getLogger
+
+
+logger = getLogger(__name__)
+
+
+DEFAULT_PAGE_SIZE = 100
+
+
+class IssueSearch(object):
+    """iterates over the issues matching a JQL query one page at a time, so callers can handle the first page
+    (or stop early) without waiting for the entire result set to download.
+    with workers > 1, the pages following the first one are prefetched concurrently and yielded in order"""
+
+    def __init__(self, jira, query, page_size=DEFAULT_PAGE_SIZE, expand=None, fields=None, workers=1, request_limit=None):
+        super(IssueSearch, self).__init__()
+        self._jira = jira
+        self._query = query
+        self._page_size = page_size
+        self._expand = expand
+        self._fields = fields
+        self._workers = workers
+        self._request_limit = request_limit
+        self._first_page = None
+        self._total = None
+
+    @property
+    def query(self):
+        return self._query
+
+    def _fetch_page(self, start_at):
+        logger.debug("searching {!r} from {}".format(self._query, start_at))
+        if self._request_limit is None:
+            page = self._search(start_at)
+        else:
+            with self._request_limit:
+                page = self._search(start_at)
+        self._total = page.total
+        return page
+
+    def _search(self, start_at):
+        kwargs = dict(startAt=start_at, maxResults=self._page_size, expand=self._expand)
+        if self._fields:
+            kwargs.update(fields=self._fields)
+        return self._jira.search_issues(self._query, **kwargs)
+
+    @property
+    def total(self):
+        """:returns: the number of matching issues, as reported by the server"""
+        if self._total is None:
+            self._first_page = self._fetch_page(0)
+        return self._total
+
+    def iter_pages(self):
+        page = self._first_page if self._first_page is not None else self._fetch_page(0)
+        self._first_page = None
+        yield page
+        if self._workers > 1:
+            pages = self._iter_remaining_pages_concurrently(len(page))
+        else:
+            pages = self._iter_remaining_pages(len(page))
+        for page in pages:
+            yield page
+
+    def _iter_remaining_pages(self, start_at):
+        while start_at and start_at < self._total:
+            page = self._fetch_page(start_at)
+            if not len(page):
+                break
+            yield page
+            start_at += len(page)
+
+    def _iter_remaining_pages_concurrently(self, first_page_size):
+        from .concurrency import iter_concurrently
+        # the server may return less than the page size we asked for, so we step by what it actually returned
+        start_ats = range(first_page_size, self._total, first_page_size) if first_page_size else []
+        for page in iter_concurrently(self._fetch_page, start_ats, self._workers):
+            yield page
+
+    def __iter__(self):
+        for page in self.iter_pages():
+            for issue in page:
+                yield issue
@@ -8,7 +8,7 @@ Options:
     --help                       show this screen
 """
 
-from .jissue import exception_handler
+from .errors import exception_handler
 
 
 def _get_arguments(argv, environ):
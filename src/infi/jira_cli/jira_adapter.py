@@ -8,12 +8,17 @@ import requests
 from infi.pyutils.lazy import cached_function
 from .config import Configuration
 from .credential_store import JIRACredentialsStore
+from .issue_search import DEFAULT_PAGE_SIZE
+from .extractors import COLUMNS, compile_column, get_column_fields
+from .timestamps import from_jira_formatted_datetime, from_jira_formatted_date, to_jira_formatted_date
 from requests.auth import HTTPBasicAuth
 
 
 logger = getLogger(__name__)
 
 
+BULK_CREATE_CHUNK_SIZE = 50
+CHANGELOG_PAGE_SIZE = 100
 CURRENT_USER = "currentUser()"
 ASSIGNED_ISSUES = "{}assignee = {} AND resolution = unresolved ORDER BY priority DESC, created ASC"
 
@@ -44,83 +49,251 @@ def get_jira():
     config = Configuration.from_file()
     options = dict(server="https://{0}".format(config.jira_fqdn))
     basic_auth = get_auth(config.jira_fqdn)
-    return JIRA(options, basic_auth=(basic_auth.username, basic_auth.password))
+    jira = JIRA(options, basic_auth=(basic_auth.username, basic_auth.password), timeout=config.http_timeout)
+    # share the connection pool with the other modules that talk to this server
+    adapter = get_jira_session().get_adapter(options['server'])
+    jira._session.mount('https://', adapter)
+    return jira
 
 
 @cached_function
-def get_custom_fields():
-    return {item['name']: item['id'] for item in get_jira().fields() if item['custom']}
+def get_jira_session():
+    """:returns: the pooled, authenticated session used for the REST calls python-jira doesn't cover"""
+    from .http_session import get_session
+    config = Configuration.from_file()
+    session = get_session(config.jira_fqdn)
+    session.auth = get_auth(config.jira_fqdn)
+    session.headers.update(get_headers())
+    return session
+
+
+def _get_cached_metadata(kind, key, loader):
+    from .metadata_cache import get_metadata_cache
+    return get_metadata_cache().get(kind, key, loader)
+
+
+def _to_resource(resource_class, raw):
+    jira = get_jira()
+    return resource_class(jira._options, jira._session, raw=raw)
+
+
+def _clear_in_memory_metadata(kind):
+    in_memory = dict(fields=(get_field_registry, get_field_encoder),
+                     createmeta=(_get_option_ids, ),
+                     project=(get_project, _get_version_index, get_next_release_name_in_project),
+                     resolutions=(get_resolutions, ),
+                     issue_link_types=(get_issue_link_types, ))
+    for func in in_memory.get(kind, ()):
+        clear_cache(func)
+
+
+def invalidate_metadata(kind, key=None):
+    from .metadata_cache import get_metadata_cache
+    get_metadata_cache().invalidate(kind, key)
+    _clear_in_memory_metadata(kind)
+
+
+def clear_expired_metadata(since):
+    """clears the in-memory caches of the metadata that expired in the metadata cache after since.
+    :returns: the time of the check, to pass as since next time"""
+    from .metadata_cache import get_metadata_cache
+    from time import time
+    now = time()
+    for kind in get_metadata_cache().get_expired_kinds(since):
+        _clear_in_memory_metadata(kind)
+    return now
+
+
+def clear_request_caches():
+    """clears the in-memory caches of data that may change between commands, keeping the client and the metadata"""
+    for func in (get_issue, get_issue_state, get_query_by_filter, get_next_release_name_for_issue, get_project,
+                 _get_version_index, get_next_release_name_in_project, _get_options, is_user_exists, get_user_by_name):
+        clear_cache(func)
+
+
+def _lookup_metadata(kind, getter, predicate, key=None):
+    """:returns: the items of getter() that match predicate, refreshing the cached metadata once if none match"""
+    items = [item for item in getter() if predicate(item)]
+    if not items:
+        invalidate_metadata(kind, key)
+        items = [item for item in getter() if predicate(item)]
+    return items
 
 
 @cached_function
+def get_field_registry():
+    from .field_registry import FieldRegistry
+    return FieldRegistry(_get_cached_metadata('fields', '', lambda: get_jira().fields()))
+
+
+def lookup_field(lookup):
+    """:returns: lookup(field registry), refreshing the cached fields once if the lookup misses"""
+    try:
+        return lookup(get_field_registry())
+    except KeyError:
+        invalidate_metadata('fields')
+    return lookup(get_field_registry())
+
+
+def get_custom_fields():
+    return get_field_registry().custom_fields
+
+
 def get_custom_fields_schema():
-    return {item['name']: item['schema']['custom'] for item in get_jira().fields() if item['custom']}
+    return get_field_registry().custom_types
+
+
+def get_custom_field_id(name):
+    return lookup_field(lambda registry: registry.get_custom_field_id(name))
+
+
+def get_custom_field_type(name):
+    return lookup_field(lambda registry: registry.get_custom_type(name))
 
 
 @cached_function
-def get_issues__assigned_to_user(user, project=None):
-    return get_jira().search_issues(ASSIGNED_ISSUES.format("project={} AND ".format(project) if project else '', user))
+def get_resolutions():
+    from jira.resources import Resolution
+    raw = _get_cached_metadata('resolutions', '', lambda: [item.raw for item in get_jira().resolutions()])
+    return [_to_resource(Resolution, item) for item in raw]
 
 
 @cached_function
-def get_issues__assigned_to_me(project=None):
-    return get_issues__assigned_to_user(CURRENT_USER, project)
+def get_issue_link_types():
+    from jira.resources import IssueLinkType
+    raw = _get_cached_metadata('issue_link_types', '', lambda: [item.raw for item in get_jira().issue_link_types()])
+    return [_to_resource(IssueLinkType, item) for item in raw]
 
 
-def add_labels_to_issue(key, labels):
-    issue = get_issue(key)
-    labels = set.union(set([str(label) for label in labels]), set(issue.fields().labels))
-    issue.update(labels=[dict(add=label) for label in labels])
+def get_assigned_issues_query(user, project=None, order_by=None):
+    """:returns: the JQL of the unresolved issues of a user, ordered by priority unless order_by is given"""
+    from .jql import set_order_by
+    query = ASSIGNED_ISSUES.format("project={} AND ".format(project) if project else '', user)
+    return query if order_by is None else set_order_by(query, order_by)
 
 
-def assign_issue(key, assignee):
-    get_jira().assign_issue(key, assignee)
+def get_issues__assigned_to_user(user, project=None, page_size=DEFAULT_PAGE_SIZE, workers=None, fields=None,
+                                 order_by=None):
+    return search_issues(get_assigned_issues_query(user, project, order_by),
+                         page_size=page_size, workers=workers, fields=fields)
+
+
+def get_issues__assigned_to_me(project=None, page_size=DEFAULT_PAGE_SIZE, workers=None, fields=None, order_by=None):
+    return get_issues__assigned_to_user(CURRENT_USER, project, page_size=page_size, workers=workers, fields=fields,
+                                        order_by=order_by)
+
+
+def get_error_message(response):
+    try:
+        body = response.json()
+    except ValueError:
+        return 'status {}'.format(response.status_code)
+    messages = body.get('errorMessages', []) + \
+        ["{}: {}".format(name, message) for name, message in sorted(body.get('errors', dict()).items())]
+    return '; '.join(messages) or 'status {}'.format(response.status_code)
+
+
+def update_labels(key, add=(), remove=()):
+    """adds and removes labels in a single PUT of update operations. the server ignores adding a label that is
+    already there, or removing one that is not, so the issue is not fetched first"""
+    from jira import JIRAError
+    url = "{}/rest/api/2/issue/{}".format(get_jira()._options['server'], key)
+    operations = [dict(add=str(label)) for label in add] + [dict(remove=str(label)) for label in remove]
+    response = get_jira_session().put(url, json=dict(update=dict(labels=operations)))
+    if response.status_code >= 400:
+        raise JIRAError(status_code=response.status_code, text=get_error_message(response), url=url)
+
+
+def add_labels_to_issue(key, labels):
+    update_labels(key, add=labels)
 
 
-def from_jira_formatted_datetime(formatted_string):
-    # http://stackoverflow.com/questions/127803/how-to-parse-iso-formatted-date-in-python
-    import re
-    import datetime
-    return datetime.datetime(*list(map(int, re.split('[^\d]', formatted_string)[:-1])))
+def update_labels_of_issues(keys, add=(), remove=(), workers=None):
+    """updates the labels of many issues in a pool of workers, within the request and rate limits of the server.
+    :returns: an iterator of Munch(key=..., error=...) in the order of keys, error is None for updated issues"""
+    from requests import RequestException
+    from jira import JIRAError
+    from .concurrency import iter_concurrently, get_jira_request_limit, get_jira_rate_limit
+    workers = Configuration.from_file().max_concurrent_requests if workers is None else workers
 
+    def _update(key):
+        try:
+            update_labels(key, add, remove)
+        except JIRAError as error:
+            return Munch(key=key, error=error.text or 'status {}'.format(error.status_code))
+        except RequestException as error:
+            return Munch(key=key, error=str(error))
+        return Munch(key=key, error=None)
 
-def from_jira_formatted_date(formatted_string):
-    return from_jira_formatted_datetime(formatted_string+'T00:00:00.000+0000')
+    return iter_concurrently(_update, keys, workers, get_jira_request_limit(), get_jira_rate_limit())
 
 
-def to_jira_formatted_date(datetime_object):
-    return datetime_object.strftime("%Y-%m-%d")
+def assign_issue(key, assignee):
+    get_jira().assign_issue(key, assignee)
 
 
 def matches(str_a, str_b):
     return str_a is not None and str_b is not None and str_a.lower() == str_b.lower()
 
 
-def transition_issue(key, transition_string, additional_fields, id_lookup_method=None, **kwargs):
-    jira = get_jira()
-    issue = jira.issue(key)
-    issue_type_name = issue_mappings.Type(issue)
-    project_key = issue.fields().project.key
-    [transition] = [item['id'] for item in jira.transitions(issue) if matches(item['name'], transition_string)]
-    fields = dict()
-    if additional_fields:
-        for key, value in list(additional_fields.items()):
-            if key in ('issuelinks', ):
-                fields[key] = value
-            else:
-                fields[get_custom_fields()[key]] = _compute_value(key, value, id_lookup_method)
-    logger.debug("calling transition_issue(issue={issue!r}, transition={transition!r}, fields={fields!r})".format(issue=issue, transition=transition, fields=fields))
-    jira.transition_issue(issue=issue.key, transition=transition, fields=fields, **kwargs)
+@cached_function
+def get_issue_state(key):
+    """:returns: a (project key, issue type name, status name) tuple, the available transitions depend on it"""
+    issue = get_jira().issue(key, fields='project,issuetype,status')
+    fields = issue.fields()
+    return fields.project.key, fields.issuetype.name, fields.status.name
 
 
-def resolve_issue(key, resolution_string, fix_versions_strings):
-    jira = get_jira()
-    issue = jira.issue(key)
-    [resolution] = [item.id for item in jira.resolutions() if matches(item.name, resolution_string)]
-    project_versions = jira.project_versions(issue.fields().project)
-    fix_versions = [dict(id=item.id) for item in project_versions if item.name in fix_versions_strings]
+def get_transitions(key, state):
+    """:returns: the transitions available from a state, fetching them through the issue if they aren't cached"""
+    def _get_transitions():
+        return [dict(id=item['id'], name=item['name']) for item in get_jira().transitions(key)]
+    return _get_cached_metadata('transitions', '/'.join(state), _get_transitions)
+
+
+def _post_transition(key, state, transition_string, fields):
+    [transition] = [item['id'] for item in _lookup_metadata('transitions', lambda: get_transitions(key, state),
+                                                            lambda item: matches(item['name'], transition_string),
+                                                            '/'.join(state))]
+    logger.debug("calling transition_issue(issue={issue!r}, transition={transition!r}, fields={fields!r})".format(issue=key, transition=transition, fields=fields))
+    get_jira().transition_issue(issue=key, transition=transition, fields=fields)
+
+
+def transition_issue(key, transition_string, additional_fields, id_lookup_method=None, state=None, **kwargs):
+    """posts the transition without fetching the issue first if its state is given, or if the state was already fetched.
+    kwargs are additional fields to set as part of the transition"""
+    state = state or get_issue_state(key)
+    fields = dict(kwargs)
+    if additional_fields:
+        project_key, issue_type_name, _ = state
+        fields.update(encode_additional_fields(additional_fields, project_key, issue_type_name, id_lookup_method))
+    try:
+        _post_transition(key, state, transition_string, fields)
+    except JIRAError as error:
+        if error.status_code != 400:
+            raise
+        # the workflow, or the state the caller knew about, may have changed since they were cached
+        logger.debug("transition of {} failed, refreshing its state and transitions: {}".format(key, error))
+        invalidate_metadata('transitions', '/'.join(state))
+        clear_cache(get_issue_state)
+        _post_transition(key, get_issue_state(key), transition_string, fields)
+    finally:
+        clear_cache(get_issue_state)
+
+
+def resolve_issue(key, resolution_string, fix_versions_strings, state=None):
+    state = state or get_issue_state(key)
+    [resolution] = [item.id for item in _lookup_metadata('resolutions', get_resolutions,
+                                                         lambda item: matches(item.name, resolution_string))]
+    project_key = state[0]
+    # an empty name means there is no version to set (when the project has no next release), it is not worth a refresh
+    fix_versions_strings = [name for name in fix_versions_strings if name]
+    fix_versions = [] if not fix_versions_strings else \
+        [dict(id=item.id) for item in _lookup_metadata('project', lambda: get_project(project_key).versions,
+                                                       lambda item: item.name in fix_versions_strings,
+                                                       project_key.upper())]
     fields = dict(resolution=dict(id=resolution), fixVersions=fix_versions)
-    transition_issue(key, "Resolve Issue", dict(), **fields)
+    transition_issue(key, "Resolve Issue", dict(), state=state, **fields)
 
 
 def start_progress(key):
@@ -135,28 +308,93 @@ def reopen(key):
     transition_issue(key, "Reopen Issue", dict())
 
 
-def iter_projects():
-    for item in get_jira().projects():
-      yield get_project(item.key)
+def iter_project_versions(projects):
+    """:returns: an iterator over (project, versions) tuples of project resources, in the order their versions arrive.
+    the versions are fetched concurrently from the versions endpoint, which is much lighter than the project"""
+    from jira.resources import Version
+    from .async_client import iter_completed
+
+    async def _get_versions(client, project):
+        return await client.get_json("/rest/api/2/project/{}/versions".format(project.key))
+
+    for project, versions in iter_completed(_get_versions, projects):
+        if isinstance(versions, Exception):
+            raise versions
+        yield project, [_to_resource(Version, raw) for raw in versions]
+
+
+def get_project_versions(keys):
+    """:returns: the versions of the projects of the keys, fetched concurrently from the versions endpoint and never
+    from the metadata cache, for decisions that depend on their current state"""
+    from jira.resources import Version
+    from .async_client import map_concurrently, raise_first_error
+
+    async def _get_versions(client, key):
+        return await client.get_json("/rest/api/2/project/{}/versions".format(key))
+
+    return [[_to_resource(Version, raw) for raw in versions]
+            for versions in raise_first_error(map_concurrently(_get_versions, keys))]
+
+
+def describe_error(exception):
+    """:returns: the message of a failed request, as one line"""
+    return exception.text if isinstance(exception, JIRAError) and exception.text else str(exception).splitlines()[0]
+
+
+def get_unresolved_issue_counts(versions):
+    """:returns: the numbers of unresolved issues of the versions, fetched concurrently, the exceptions of failed
+    requests in place of their counts"""
+    from .async_client import map_concurrently
+
+    async def _get_count(client, version):
+        response = await client.get_json("/rest/api/2/version/{}/unresolvedIssueCount".format(version.id))
+        return response['issuesUnresolvedCount']
+
+    return map_concurrently(_get_count, versions)
+
+
+def update_versions(updates):
+    """applies (version, fields) updates concurrently, with a single PUT each.
+    :returns: a list of Munch(version=..., error=...) in the order of updates, error is None for updated versions"""
+    from .async_client import map_concurrently
+
+    async def _update(client, update):
+        await client.put_json("/rest/api/2/version/{}".format(update[0].id), update[1])
+
+    results = map_concurrently(_update, updates)
+    return [Munch(version=version, error=describe_error(result) if isinstance(result, Exception) else None)
+            for (version, fields), result in zip(updates, results)]
 
 
 @cached_function
 def get_project(key):
-    return get_jira().project(key.upper())
+    from jira.resources import Project
+    raw = _get_cached_metadata('project', key.upper(), lambda: get_jira().project(key.upper()).raw)
+    return _to_resource(Project, raw)
+
+
+def get_version_index(key):
+    """:returns: the VersionIndex of the project, jirelease keeps it up to date as it modifies versions"""
+    return _get_version_index(key.upper())
 
 
 @cached_function
+def _get_version_index(key):
+    from .version_index import VersionIndex
+    return VersionIndex(get_project(key).versions)
+
+
 def get_version(key, name):
-    [version] = [version for version in get_project(key).versions if version.name == name]
-    return version
+    """:returns: the version of the project, refreshing the cached project once if it has no such version"""
+    if name not in get_version_index(key):
+        invalidate_metadata('project', key.upper())
+    return get_version_index(key).get(name)
 
 
 @cached_function
 def get_next_release_name_for_issue(key):
-    jira = get_jira()
-    issue = jira.issue(key)
-    project = issue.fields().project.key
-    return get_next_release_name_in_project(project)
+    project_key, _, _ = get_issue_state(key)
+    return get_next_release_name_in_project(project_key)
 
 
 @cached_function
@@ -173,7 +411,7 @@ def get_next_release_name_in_project(key):
 def _get_options(customfield_name):
     from .custom_field_editor import get_options_for_custom_field
     config = Configuration.from_file()
-    customfield_id = get_custom_fields()[customfield_name]
+    customfield_id = get_custom_field_id(customfield_name)
     return get_options_for_custom_field(customfield_id)
 
 
@@ -187,38 +425,83 @@ def get_enabled_custom_field_values(customfield_name):
     return [item['optionvalue'] for item in options if not item['disabled']]
 
 
+def get_createmeta(project_key, issue_type_name):
+    """:returns: a dict of the field ids on the create screen of an issue type to their allowed values (id and value)"""
+    def _get_createmeta():
+        result = get_jira().createmeta(issuetypeNames=[issue_type_name], projectKeys=[project_key], expand=['projects.issuetypes.fields'])
+        [issue_type] = result['projects'][0]['issuetypes']
+        return {field_id: [dict(id=item.get('id'), value=item.get('value')) for item in field.get('allowedValues', [])]
+                for field_id, field in issue_type['fields'].items()}
+    return _get_cached_metadata('createmeta', _get_createmeta_key(project_key, issue_type_name), _get_createmeta)
+
+
+def _get_createmeta_key(project_key, issue_type_name):
+    return '{}/{}'.format(project_key.upper(), issue_type_name.lower())
+
+
+@cached_function
+def _get_option_ids(project_key, issue_type_name, field_id):
+    allowed_values = get_createmeta(project_key, issue_type_name).get(field_id, [])
+    return {item['value']: item['id'] for item in allowed_values}
+
+
 def get_custom_field_value_id_from_createmeta(key, value, project_key, issue_type_name):
-    result = get_jira().createmeta(issuetypeNames=[issue_type_name], projectKeys=[project_key], expand=['projects.issuetypes.fields'])
-    values = result['projects'][0]['issuetypes'][0]['fields'][get_custom_fields()[key]]['allowedValues']
-    [value_id] = [item['id'] for item in values if item['value'] == value]
-    return value_id
-
-
-def _compute_value(key, value, id_lookup_method):
-    def _translate(value):
-        if key in ('issuelinks', ):
-          return value
-        if 'select' in get_custom_fields_schema()[key]:
-          return {'value': value}
-        if 'radiobuttons' in get_custom_fields_schema()[key]:
-          return {'id': id_lookup_method(key, value)}
-        if 'multicheckboxes' in get_custom_fields_schema()[key]:
-          return {'id': id_lookup_method(key, value)}
-        if 'userpicker' in get_custom_fields_schema()[key]:
-          return {'name': value}
-        return value
-
-    if isinstance(value, (list, tuple)):
-      return [_translate(item) for item in value]
-    result = _translate(value)
-    return result if isinstance(result, dict) else result
+    field_id = get_custom_field_id(key)
+    option_ids = _get_option_ids(project_key, issue_type_name, field_id)
+    if value not in option_ids:
+        # the options may have been edited since createmeta was cached
+        invalidate_metadata('createmeta', _get_createmeta_key(project_key, issue_type_name))
+        option_ids = _get_option_ids(project_key, issue_type_name, field_id)
+    if value not in option_ids:
+        raise ValueError("{!r} is not an option of {!r}".format(value, key))
+    return option_ids[value]
+
+
+def compile_encoder(key, id_lookup_method=None):
+    """:returns: a function that encodes a value, or a list of values, of a field as JIRA expects it.
+    the type of the field is looked up once, id_lookup_method(key, value) translates options to their ids"""
+    custom_type = get_custom_field_type(key) if key not in ('issuelinks', ) else None
+
+    if custom_type is None:
+        translate = lambda value: value
+    elif 'select' in custom_type:
+        translate = lambda value: {'value': value}
+    elif 'radiobuttons' in custom_type or 'multicheckboxes' in custom_type:
+        translate = lambda value: {'id': id_lookup_method(key, value)}
+    elif 'userpicker' in custom_type:
+        translate = lambda value: {'name': value}
+    else:
+        translate = lambda value: value
+
+    def encode(value):
+        if isinstance(value, (list, tuple)):
+            return [translate(item) for item in value]
+        return translate(value)
+    return encode
 
 
-def create_issue(project_key, issue_type_name, component_name, fix_version_name, details, priority=None, assignee=None, parent=None, additional_fields=None, id_lookup_method=None, due=None):
-    jira = get_jira()
-    project = jira.project(project_key)
-    [issue_type] = [issue_type for issue_type in project.issueTypes
-                                    if matches(issue_type.name, issue_type_name)]
+@cached_function
+def get_field_encoder(key, project_key, issue_type_name):
+    """:returns: the encoder of a field for issues of a project and issue type, options are looked up in createmeta"""
+    return compile_encoder(key, partial(get_custom_field_value_id_from_createmeta, project_key=project_key,
+                                        issue_type_name=issue_type_name))
+
+
+def encode_additional_fields(additional_fields, project_key, issue_type_name, id_lookup_method=None):
+    """:returns: a dict of field ids to encoded values, additional_fields is a dict or a list of (name, value) pairs"""
+    fields = dict()
+    for key, value in dict(additional_fields).items():
+        encoder = compile_encoder(key, id_lookup_method) if id_lookup_method else \
+            get_field_encoder(key, project_key, issue_type_name)
+        fields[key if key in ('issuelinks', ) else get_custom_field_id(key)] = encoder(value)
+    return fields
+
+
+def encode_issue_fields(project_key, issue_type_name, component_name, fix_version_name, details, priority=None, assignee=None, parent=None, additional_fields=None, id_lookup_method=None, due=None):
+    """:returns: the fields of a new issue as they are sent to JIRA, the project metadata is looked up in the caches"""
+    [issue_type] = _lookup_metadata('project', lambda: get_project(project_key).issueTypes,
+                                    lambda issue_type: matches(issue_type.name, issue_type_name), project_key.upper())
+    project = get_project(project_key)
     components = [component for component in project.components
                                 if matches(component.name, component_name)]
     versions = [version for version in project.versions
@@ -245,34 +528,140 @@ def create_issue(project_key, issue_type_name, component_name, fix_version_name,
     if due:
         fields['duedate'] = due
     if additional_fields:
-        for key, value in list(additional_fields.items()):
-            _id_lookup_method = id_lookup_method or partial(get_custom_field_value_id_from_createmeta, project_key=project_key, issue_type_name=issue_type_name)
-            fields[get_custom_fields()[key]] = _compute_value(key, value, _id_lookup_method)
-    issue = jira.create_issue(fields=fields)
+        fields.update(encode_additional_fields(additional_fields, project_key, issue_type.name, id_lookup_method))
+    return fields
+
+
+def create_issue(project_key, issue_type_name, component_name, fix_version_name, details, priority=None, assignee=None, parent=None, additional_fields=None, id_lookup_method=None, due=None):
+    fields = encode_issue_fields(project_key, issue_type_name, component_name, fix_version_name, details,
+                                 priority=priority, assignee=assignee, parent=parent,
+                                 additional_fields=additional_fields, id_lookup_method=id_lookup_method, due=due)
+    issue = get_jira().create_issue(fields=fields)
     return issue
 
 
+def _get_bulk_create_errors(response):
+    """:returns: a dict of the indexes of the failed issues in the request to their error messages"""
+    errors = dict()
+    for item in response.get('errors', []):
+        element_errors = item.get('elementErrors', dict())
+        messages = element_errors.get('errorMessages', []) + \
+            ["{}: {}".format(name, message) for name, message in sorted(element_errors.get('errors', dict()).items())]
+        errors[item['failedElementNumber']] = '; '.join(messages) or 'status {}'.format(item.get('status'))
+    return errors
+
+
+def create_issues(fields_list, chunk_size=BULK_CREATE_CHUNK_SIZE):
+    """creates issues through the bulk-create endpoint, chunk_size issues per request. a chunk that fails as a whole
+    (a server error, a connection error) fails its rows, and the following chunks are still sent.
+    :returns: a list of Munch(key=..., error=...) in the order of fields_list, one of key/error is None"""
+    session = get_jira_session()
+    url = "{}/rest/api/2/issue/bulk".format(get_jira()._options['server'])
+    results = []
+    for start in range(0, len(fields_list), chunk_size):
+        chunk = fields_list[start:start + chunk_size]
+        try:
+            response = session.post(url, json=dict(issueUpdates=[dict(fields=fields) for fields in chunk]))
+        except requests.RequestException as error:
+            results.extend(Munch(key=None, error=str(error)) for fields in chunk)
+            continue
+        try:
+            body = response.json()
+        except ValueError:
+            body = dict()
+        errors = _get_bulk_create_errors(body)
+        created = iter(body.get('issues', []))
+        for index in range(len(chunk)):
+            issue = None if index in errors else next(created, None)
+            if issue is not None:
+                results.append(Munch(key=issue['key'], error=None))
+            else:
+                error = errors.get(index) or '; '.join(body.get('errorMessages', [])) or \
+                    'status {}'.format(response.status_code)
+                results.append(Munch(key=None, error=error))
+    return results
+
+
 def create_link(link_type_name, from_key, to_key):
     jira = get_jira()
-    [link_type] = [link_type for link_type in jira.issue_link_types()
-                                 if matches(link_type.name, link_type_name)]
+    [link_type] = _lookup_metadata('issue_link_types', get_issue_link_types,
+                                   lambda link_type: matches(link_type.name, link_type_name))
 
     kwargs = dict(type=link_type.name, inwardIssue=from_key, outwardIssue=to_key)
     jira.create_issue_link(**kwargs)
 
 
-def search_issues(query, maxResults=2000, expand=None):
+def _prime_client_fields_cache(jira):
+    # newer python-jira clients download /field before searching to translate field names, so we hand it ours
+    if hasattr(jira, '_fields_cache_value') and not jira._fields_cache_value:
+        jira._fields_cache_value = {name: item['id'] for item in get_field_registry().fields
+                                    for name in item.get('clauseNames', ())}
+
+
+def search_issues(query, page_size=DEFAULT_PAGE_SIZE, expand=None, workers=None, fields=None):
+    """:returns: an iterable IssueSearch that fetches the matching issues page by page, its total is the number of issues.
+    workers is the number of pages to fetch concurrently, defaults to the search_workers configuration.
+    fields is a comma-separated list of the fields to fetch, see get_fields_for_mappings"""
+    from .issue_search import IssueSearch
+    from .concurrency import get_jira_request_limit
     jira = get_jira()
-    return jira.search_issues(query, maxResults=maxResults, expand=expand)
+    _prime_client_fields_cache(jira)
+    workers = Configuration.from_file().search_workers if workers is None else workers
+    return IssueSearch(jira, query, page_size=page_size, expand=expand, fields=fields,
+                       workers=workers, request_limit=get_jira_request_limit())
+
+
+def get_issue_histories(key):
+    """:returns: all the raw changelog histories of an issue, page by page from /issue/{key}/changelog.
+    servers without that resource return the complete changelog when getting the issue with expand=changelog"""
+    session = get_jira_session()
+    url = "{}/rest/api/2/issue/{}/changelog".format(get_jira()._options['server'], key)
+    histories = []
+    while True:
+        response = session.get(url, params=dict(startAt=len(histories), maxResults=CHANGELOG_PAGE_SIZE))
+        if response.status_code == 404 and not histories:
+            logger.debug("no changelog resource for {}, getting the issue with its changelog".format(key))
+            return get_jira().issue(key, fields='updated', expand='changelog').raw['changelog']['histories']
+        response.raise_for_status()
+        page = response.json()
+        histories.extend(page.get('values', []))
+        if page.get('isLast') or not page.get('values') or len(histories) >= page.get('total', len(histories)):
+            return histories
 
 
 def comment_on_issue(key, message):
     get_jira().add_comment(issue=key, body=message)
 
 
+def comment_on_issues(comments):
+    """posts (key, message) comments concurrently.
+    :returns: a list of Munch(key=..., error=...) in the order of comments, error is None for posted comments"""
+    from .async_client import map_concurrently
+
+    async def _comment(client, comment):
+        await client.post_json("/rest/api/2/issue/{}/comment".format(comment[0]), dict(body=comment[1]))
+
+    results = map_concurrently(_comment, comments)
+    return [Munch(key=key, error=describe_error(result) if isinstance(result, Exception) else None)
+            for (key, message), result in zip(comments, results)]
+
+
+def get_issues(keys, fields=None):
+    """:returns: the issues of the keys, fetched concurrently.
+    :param fields: a comma-separated list of the fields to fetch, see get_fields_for_mappings"""
+    from jira.resources import Issue
+    from .async_client import map_concurrently, raise_first_error
+
+    async def _get_issue(client, key):
+        return await client.get_json("/rest/api/2/issue/{}".format(key), **(dict(fields=fields) if fields else {}))
+
+    return [_to_resource(Issue, raw) for raw in raise_first_error(map_concurrently(_get_issue, keys))]
+
+
 @cached_function
-def get_issue(key):
-    return get_jira().issue(key.upper())
+def get_issue(key, fields=None):
+    """:param fields: a comma-separated list of the fields to fetch, see get_fields_for_mappings"""
+    return get_jira().issue(key.upper(), fields=fields)
 
 
 @cached_function
@@ -284,28 +673,14 @@ def get_query_by_filter(name):
     raise JIRAError(404, "no such filter")
 
 
-issue_mappings = Munch(Rank=lambda issue: int(issue.fields().customfield_10700),
-                       Type=lambda issue: issue.fields().issuetype.name,
-                       Key=lambda issue: issue.key,
-                       Summary=lambda issue: issue.fields().summary,
-                       Description=lambda issue: issue.fields().description,
-                       Priority=lambda issue: issue.fields().priority.name,
-                       Project=lambda issue: issue.fields().project.name,
-                       Status=lambda issue: issue.fields().status.name,
-                       Resolution=lambda issue: (issue.fields().resolution or Munch(name="Unresolved")).name,
-                       Created=lambda issue: from_jira_formatted_datetime(issue.fields().created),
-                       Updated=lambda issue: from_jira_formatted_datetime(issue.fields().updated),
-                       Assignee=lambda issue: issue.fields().assignee.displayName,
-                       Reporter=lambda issue: issue.fields().reporter.displayName,
-                       Labels=lambda issue: issue.fields().labels,
-                       Comments=lambda issue: issue.fields().comment.comments,
-                       AffectsVersions=lambda issue: [item.name for item in getattr(issue.fields(), 'versions', list())],
-                       FixVersions=lambda issue: [item.name for item in getattr(issue.fields(), 'fixVersions', list())],
-                       Components=lambda issue: [item.name for item in issue.fields().components],
-                       IssueLinks=lambda issue: issue.fields().issuelinks,
-                       SubTasks=lambda issue: issue.fields().subtasks,
-                       Attachments=lambda issue: issue.fields().attachment,
-                       )
+# single-column extractors, for rendering many columns of an issue use extractors.compile_extractor
+issue_mappings = Munch({column: compile_column(column) for column in COLUMNS})
+
+
+def get_fields_for_mappings(names, extra_fields=()):
+    """:returns: the smallest fields= argument that is enough for rendering these issue_mappings"""
+    fields = set(extra_fields).union(get_column_fields(names))
+    return ','.join(sorted(fields)) or 'issuekey'
 
 
 @cached_function
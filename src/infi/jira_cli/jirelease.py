@@ -2,28 +2,34 @@
 infinidat jira project command-line tool
 
 Usage:
-    jirelease summary [--since-date=SINCE]
+    jirelease summary [--since-date=SINCE] [--projects=KEYS] [--category=CATEGORY]
     jirelease list {project}
     jirelease release {project} {version}
+    jirelease release-train <version-name> --projects=KEYS
     jirelease merge {project} {version} <target-version>
     jirelease delay {project} {version} <delta>
     jirelease reschedule {project} {version} <date>
     jirelease create {project} <target-version> [<delta>] [<description>]
     jirelease move {project} {version} (before | after) <target-version>
-    jirelease archive {project} <version-regex>
-    jirelease unarchive {project} <version-regex>
+    jirelease reorder {project} --by=ORDER [--file=PATH] [--dry-run]
+    jirelease archive {project} <version-regex> [--dry-run]
+    jirelease unarchive {project} <version-regex> [--dry-run]
     jirelease rename {project} {version} <name>
+    jirelease rename {project} --matching=REGEX <name> [--dry-run]
     jirelease describe {project} {version} <description>
+    jirelease describe {project} --matching=REGEX <description> [--dry-run]
 
 Options:
     summary                              list a summary of today's releases
     list                                 list unarchives releases
     release                              mark version as released
+    release-train                        release a version of the same name in several projects, only if none is blocked
     merge                                move issues to target version and delete the merged one
     delay                                move the release date
     reschedule                           set a new release date
     create                               create a new release
     move                                 move a release up or down
+    reorder                              sort the releases, moving as few of them as possible
     archive                              mark version as archived
     unarchive                            mark version as unarchived
     rename                               change name
@@ -31,6 +37,12 @@ Options:
     --project=PROJECT                    project key {project_default}
     --release=RELEASE                    version string {version_default}
     --since-date=SINCE                   since when [default: today]
+    --projects=KEYS                      only these projects (the projects to release in), comma-separated
+    --category=CATEGORY                  only projects in this category
+    --matching=REGEX                     all the versions whose names match, rename replaces the matching part
+    --dry-run                            print the changes without making them
+    --by=ORDER                           semver, date (release date) or file (the order of the names in --file)
+    --file=PATH                          a file with a version name on every line
 """
 from __future__ import print_function
 
@@ -52,8 +64,12 @@ def _get_arguments(argv, environ):
     return arguments
 
 
+def _get_version_label(version):
+    return version.name if version.released else version.name + ' **' if getattr(version, 'overdue', False) else version.name + ' *'
+
+
 def pretty_print_project_versions_in_order(project_name):
-    from .jira_adapter import get_project, from_jira_formatted_datetime
+    from .jira_adapter import get_project
     from prettytable import PrettyTable
     project = get_project(project_name)
     table = PrettyTable(["Name", "Description", "Release Date"])
@@ -62,31 +78,86 @@ def pretty_print_project_versions_in_order(project_name):
     for version in reversed(project.versions):
         if version.archived:
             continue
-        table.add_row([version.name if version.released else version.name + ' **' if getattr(version, 'overdue', False) else version.name + ' *',
+        table.add_row([_get_version_label(version),
                        getattr(version, 'description', ''), getattr(version, 'releaseDate', '')])
     print((table.get_string()))
 
 
 def release_version(project_name, project_version):
-    from .jira_adapter import get_version, to_jira_formatted_date
+    from .jira_adapter import get_version
     from json import loads
-    from datetime import datetime
     version = get_version(project_name, project_version)
     if version.released:
         raise AssertionError("version already released")
     unresolved_issue_count = list(loads(version._session.get(version.self + '/unresolvedIssueCount').text).values())[-1]
     if unresolved_issue_count:
         raise AssertionError("version has {} unresovled issues".format(unresolved_issue_count))
-    if not version.releaseDate:
-        version.update(releaseDate=to_jira_formatted_date(datetime.today()))
-    version.update(released=True)
+    version.update(**_get_release_fields(version))
+
+
+def _get_release_fields(version):
+    """:returns: the fields that release a version, with today's release date if it has none"""
+    from .jira_adapter import to_jira_formatted_date
+    from datetime import datetime
+    if getattr(version, 'releaseDate', None):
+        return dict(released=True)
+    return dict(released=True, releaseDate=to_jira_formatted_date(datetime.today()))
+
+
+def _split_project_keys(keys):
+    return [key.strip().upper() for key in keys.split(',') if key.strip()]
+
+
+def _print_release_train_report(targets):
+    from prettytable import PrettyTable
+    table = PrettyTable(["Project", "Version", "Result"])
+    table.align = 'l'
+    for target in targets:
+        table.add_row([target.project, target.name, target.result])
+    print((table.get_string()))
+
+
+def release_train(version_name, project_keys):
+    """releases the version of the same name in all the projects. the unresolved issues of all of them are counted
+    first, and if any is blocked (or has no such version) none is released. the versions are fetched from the server
+    rather than the metadata cache, so versions created or released moments ago are seen as they are.
+    :returns: the exit code, 1 if any release failed"""
+    from .jira_adapter import get_project_versions, get_unresolved_issue_counts, update_versions
+    from munch import Munch
+    keys = _split_project_keys(project_keys)
+    targets = []
+    for key, project_versions in zip(keys, get_project_versions(keys)):
+        versions = [version for version in project_versions if version.name == version_name]
+        targets.append(Munch(project=key, name=version_name, version=versions[0] if versions else None,
+                             result=None if versions else "blocked: no such version"))
+    already_released = [target for target in targets if target.version is not None and target.version.released]
+    for target in already_released:
+        target.result = "already released"
+    pending = [target for target in targets if target.result is None]
+    for target, count in zip(pending, get_unresolved_issue_counts([target.version for target in pending])):
+        if isinstance(count, Exception):
+            target.result = "blocked: failed to count unresolved issues"
+        elif count:
+            target.result = "blocked: {} unresolved issues".format(count)
+    blocked = [target for target in targets if target.result and target.result.startswith("blocked")]
+    if blocked:
+        for target in pending:
+            target.result = target.result or "not released"
+        _print_release_train_report(targets)
+        raise AssertionError("release train refused, {} of {} projects are blocked".format(len(blocked), len(targets)))
+    results = update_versions([(target.version, _get_release_fields(target.version)) for target in pending])
+    for target, result in zip(pending, results):
+        target.result = "released" if result.error is None else "failed: {}".format(result.error)
+    _print_release_train_report(targets)
+    return 1 if any(result.error is not None for result in results) else 0
 
 
 def merge_releases(project_name, project_version, target_version):
-    from .jira_adapter import get_version
+    from .jira_adapter import get_version, get_version_index
     version = get_version(project_name, project_version)
     target_version = get_version(project_name, target_version)
     version.delete(target_version.id, target_version.id)
+    get_version_index(project_name).remove(version.name)
 
 
 def parse_deltastring(string):
@@ -102,9 +173,10 @@ def parse_deltastring(string):
 
 
 def delay_release(project_name, project_version, delta):
-    from .jira_adapter import get_version, to_jira_formatted_date, from_jira_formatted_date
+    from .jira_adapter import get_version
+    from .timestamps import parse_date, to_jira_formatted_date
     version = get_version(project_name, project_version)
-    new_release_date = from_jira_formatted_date(version.releaseDate) + parse_deltastring(delta)
+    new_release_date = parse_date(version.releaseDate) + parse_deltastring(delta)
     version.update(releaseDate=to_jira_formatted_date(new_release_date))
 
 
@@ -115,52 +187,171 @@ def reschedule_release(project_name, project_version, release_date):
 
 
 def create_new_release(project_name, target_version, delta, description):
-    from .jira_adapter import clear_cache, get_jira, get_project, from_jira_formatted_date, to_jira_formatted_date
-    from pkg_resources import parse_version
+    from .jira_adapter import get_jira, get_project, get_version_index
+    from .timestamps import parse_date, to_jira_formatted_date
     project = get_project(project_name)
-    sorted_versions = sorted(project.versions, key=lambda version: parse_version(version.name))
-    previous_version = sorted_versions[0]
-    for item in sorted_versions:
-        if parse_version(item.name) > parse_version(target_version):
-            break
-        previous_version = item
+    index = get_version_index(project_name)
+    previous_version = index.get_preceding_version(target_version)
+    if delta and previous_version is None:
+        raise AssertionError("project {} has no versions to count the delta from".format(project_name))
     if delta and not hasattr(previous_version, 'releaseDate'):
         raise AssertionError("previous version {} has no release date".format(previous_version.name))
     if delta:
-        release_date = to_jira_formatted_date(from_jira_formatted_date(previous_version.releaseDate) + parse_deltastring(delta))
+        release_date = to_jira_formatted_date(parse_date(previous_version.releaseDate) + parse_deltastring(delta))
     else:
         release_date = None
-    get_jira().create_version(target_version, project, releaseDate=release_date, description=description)
-    clear_cache(get_project)
-    move_release(project_name, target_version, after=True, target_version=previous_version.name)
+    index.add(get_jira().create_version(target_version, project, releaseDate=release_date, description=description))
+    if previous_version is not None:
+        move_release(project_name, target_version, after=True, target_version=previous_version.name)
 
 
 def move_release(project_name, project_version, after, target_version):
-    from .jira_adapter import get_version, get_project, JIRAError
-    from json import dumps
-    project = get_project(project_name)
+    from .jira_adapter import get_version, get_version_index
+    index = get_version_index(project_name)
     version = get_version(project_name, project_version)
     target_version = get_version(project_name, target_version)
     if not after: # before
-        target_version = project.versions[project.versions.index(target_version)-1]
+        target_version = index.get_previous(target_version.name)
+    _move_version(index, version, target_version)
+
+
+def _move_version(index, version, target_version):
+    """moves the version after the target version, or to the first position if it is None"""
+    from .jira_adapter import JIRAError
+    from json import dumps
     url = version.self + '/move'
-    response = version._session.post(url, headers={'content-type': 'application/json'}, data=dumps(dict(after=target_version.self)))
+    data = dict(position='First') if target_version is None else dict(after=target_version.self)
+    response = version._session.post(url, headers={'content-type': 'application/json'}, data=dumps(data))
     if response.status_code != 200:
         raise JIRAError(url=url, status_code=response.status_code, text=response.reason)
+    index.move(version.name, after=None if target_version is None else target_version.name)
+
+
+REORDER_KEYS = ('semver', 'date', 'file')
+
+
+def get_target_order(versions, by, names=None):
+    """:returns: the versions sorted by their names as versions (semver), by release date (versions without one last)
+    or in the order of the names (versions not listed last, in their current order)"""
+    from .version_index import version_key
+    if by == 'semver':
+        return sorted(versions, key=lambda version: version_key(version.name))
+    if by == 'date':
+        return sorted(versions, key=lambda version: (not getattr(version, 'releaseDate', None),
+                                                     getattr(version, 'releaseDate', None) or '',
+                                                     version_key(version.name)))
+    positions = {name: position for position, name in reversed(list(enumerate(names)))}
+    missing_names = sorted(set(names) - set(version.name for version in versions))
+    if missing_names:
+        raise AssertionError("no such versions: {}".format(', '.join(missing_names)))
+    listed_versions = sorted([version for version in versions if version.name in positions],
+                             key=lambda version: positions[version.name])
+    return listed_versions + [version for version in versions if version.name not in positions]
+
+
+def reorder_releases(project_name, by, file_path=None, dry_run=False):
+    """moves the fewest versions that put the project in the order of get_target_order"""
+    from .jira_adapter import get_version_index
+    from .version_index import get_minimal_moves
+    from prettytable import PrettyTable
+    from docopt import DocoptExit
+    if by not in REORDER_KEYS:
+        raise DocoptExit("unknown order {}, choose one of {}".format(by, ', '.join(REORDER_KEYS)))
+    if (by == 'file') != bool(file_path):
+        raise DocoptExit("--file is required with --by=file, and only with it")
+    names = None
+    if file_path:
+        with open(file_path) as fd:
+            names = [line.strip() for line in fd if line.strip()]
+    index = get_version_index(project_name)
+    versions = list(index)
+    moves = get_minimal_moves([version.name for version in versions],
+                              [version.name for version in get_target_order(versions, by, names)])
+    table = PrettyTable(["Version", "Move"])
+    table.align = 'l'
+    for name, after in moves:
+        table.add_row([name, "first" if after is None else "after {}".format(after)])
+    if moves:
+        print((table.get_string()))
+    print("{} of {} versions to move".format(len(moves), len(versions)))
+    if dry_run:
+        return
+    for name, after in moves:
+        _move_version(index, index.get(name), None if after is None else index.get(after))
+
+
+def plan_version_updates(versions, regex, get_fields):
+    """:returns: (version, fields) updates of the versions whose names match the regex, where get_fields(version)
+    returns the fields to set. fields that already have their values are left out, and so are versions with nothing
+    left to update"""
+    from re import match
+    updates = []
+    for version in versions:
+        if not match(regex, version.name):
+            continue
+        fields = {name: value for name, value in get_fields(version).items() if getattr(version, name, None) != value}
+        if fields:
+            updates.append((version, fields))
+    return updates
 
 
-def set_archive(project_name, project_version_regex, archived):
-    from .jira_adapter import get_project
-    from re import match
-    for version in get_project(project_name).versions:
-        if match(project_version_regex, version.name):
-            version.update(archived=archived)
+def _print_version_updates(updates, results=None):
+    from prettytable import PrettyTable
+    table = PrettyTable(["Version", "Change"] + ([] if results is None else ["Result"]))
+    table.align = 'l'
+    for index, (version, fields) in enumerate(updates):
+        change = ", ".join("{}: {!r} -> {!r}".format(name, getattr(version, name, None), value)
+                           for name, value in sorted(fields.items()))
+        if results is None:
+            table.add_row([version.name, change])
+        else:
+            error = results[index].error
+            table.add_row([version.name, change, "updated" if error is None else "failed: {}".format(error)])
+    print((table.get_string()))
+
+
+def update_matching_versions(project_name, regex, get_fields, dry_run=False):
+    """updates the versions whose names match the regex concurrently, see plan_version_updates.
+    :returns: the exit code, 1 if any update failed"""
+    from .jira_adapter import get_version_index, update_versions
+    index = get_version_index(project_name)
+    updates = plan_version_updates(index, regex, get_fields)
+    if not updates:
+        print("nothing to update")
+        return 0
+    if dry_run:
+        _print_version_updates(updates)
+        return 0
+    results = update_versions(updates)
+    _print_version_updates(updates, results)
+    for (version, fields), result in zip(updates, results):
+        if result.error is None:
+            index.update(version, fields)
+    return 1 if any(result.error is not None for result in results) else 0
+
+
+def set_archive(project_name, project_version_regex, archived, dry_run=False):
+    return update_matching_versions(project_name, project_version_regex, lambda version: dict(archived=archived),
+                                    dry_run)
+
+
+def set_matching_names(project_name, project_version_regex, name, dry_run=False):
+    from re import compile
+    pattern = compile(project_version_regex)
+    return update_matching_versions(project_name, pattern,
+                                    lambda version: dict(name=pattern.sub(name, version.name, count=1)), dry_run)
+
+
+def set_matching_descriptions(project_name, project_version_regex, description, dry_run=False):
+    return update_matching_versions(project_name, project_version_regex,
+                                    lambda version: dict(description=description), dry_run)
 
 
 def set_name(project_name, project_version, name):
-    from .jira_adapter import get_version
+    from .jira_adapter import get_version, get_version_index
     version = get_version(project_name, project_version)
     version.update(name=name)
+    get_version_index(project_name).rename(project_version, name)
 
 
 def set_description(project_name, project_version, description):
@@ -169,49 +360,80 @@ def set_description(project_name, project_version, description):
     version.update(description=description)
 
 
-def datetime_to_date(item):
-    from datetime import date
-    return date(item.year, item.month, item.day)
-
-
-def summary(since):
-    from .jira_adapter import iter_projects, from_jira_formatted_date, to_jira_formatted_date
+def select_projects(projects, keys=None, category=None):
+    """:returns: the projects of the comma-separated keys (all of them by default) that are in the category (any
+    category by default)"""
+    if keys:
+        projects_by_key = {project.key.upper(): project for project in projects}
+        keys = _split_project_keys(keys)
+        missing_keys = [key for key in keys if key not in projects_by_key]
+        if missing_keys:
+            raise AssertionError("no such project: {}".format(', '.join(missing_keys)))
+        projects = [projects_by_key[key] for key in keys]
+    if category:
+        projects = [project for project in projects
+                    if (project.raw.get('projectCategory') or dict()).get('name', '').lower() == category.lower()]
+    return projects
+
+
+def is_released_between(version, since_date, today):
+    """:returns: True if an unarchived version has a release date between since_date and today"""
+    from .timestamps import parse_date
+    release_date_string = getattr(version, 'releaseDate', '')
+    if version.archived or not release_date_string:
+        return False
+    release_date = parse_date(release_date_string)
+    return since_date <= release_date <= today
+
+
+def summary(since, project_keys=None, category=None):
+    from .jira_adapter import get_jira, iter_project_versions
+    from .timestamps import parse_date
     from datetime import date
     from prettytable import PrettyTable
 
     table = PrettyTable(["Project", "Version", "Description", "Release Date"])
     table.align = 'l'
     today = date.today()
-    since_date = today if since == 'today' else datetime_to_date(from_jira_formatted_date(since))
-
-    for project in iter_projects():
-        for version in reversed(project.versions):
-            if version.archived:
-                continue
-            release_date_string = getattr(version, 'releaseDate', '')
-            if not release_date_string:
-                continue
-            release_date = datetime_to_date(from_jira_formatted_date(release_date_string))
-            if (release_date-since_date).days<0:
-                continue
-            if (release_date-today).days>0:
-                continue
-
-            table.add_row([project.name,
-                           version.name if version.released else version.name + ' **' if getattr(version, 'overdue', False) else version.name + ' *',
-                           getattr(version, 'description', ''), getattr(version, 'releaseDate', '')])
+    since_date = today if since == 'today' else parse_date(since)
+
+    projects = select_projects(get_jira().projects(), project_keys, category)
+    # the versions arrive in no particular order, only the ones in range are kept until they are printed
+    rows = dict()
+    for project, versions in iter_project_versions(projects):
+        rows[project.key] = [[project.name, _get_version_label(version), getattr(version, 'description', ''),
+                              getattr(version, 'releaseDate', '')]
+                             for version in reversed(versions) if is_released_between(version, since_date, today)]
+    for project in projects:
+        for row in rows[project.key]:
+            table.add_row(row)
 
     print((table.get_string()))
 
 
 def do_work(arguments):
+    from .jira_adapter import invalidate_metadata
     project_name = arguments['--project']
     project_version = arguments.get('--release')
     if arguments['summary']:
-        summary(arguments.get("--since-date"))
+        return summary(arguments.get("--since-date"), arguments.get("--projects"), arguments.get("--category"))
+    elif arguments['release-train']:
+        try:
+            return release_train(arguments['<version-name>'], arguments['--projects'])
+        finally:
+            for key in _split_project_keys(arguments['--projects']):
+                invalidate_metadata('project', key)
     elif arguments['list']:
-        pretty_print_project_versions_in_order(project_name)
-    elif arguments['release']:
+        return pretty_print_project_versions_in_order(project_name)
+    try:
+        return _modify_versions(arguments, project_name, project_version)
+    finally:
+        # the project versions are kept in the metadata cache, and they have just been modified
+        invalidate_metadata('project', project_name.upper())
+
+
+def _modify_versions(arguments, project_name, project_version):
+    if arguments['release']:
         release_version(project_name, project_version)
     elif arguments['merge']:
         merge_releases(project_name, project_version, arguments['<target-version>'])
@@ -223,12 +445,19 @@ def do_work(arguments):
         create_new_release(project_name, arguments['<target-version>'], arguments['<delta>'], arguments['<description>'])
     elif arguments['move']:
         move_release(project_name, project_version, arguments.get('after'), arguments['<target-version>'])
+    elif arguments['reorder']:
+        reorder_releases(project_name, arguments['--by'], arguments['--file'], arguments['--dry-run'])
     elif arguments['archive']:
-        set_archive(project_name, arguments['<version-regex>'], True)
+        return set_archive(project_name, arguments['<version-regex>'], True, arguments['--dry-run'])
     elif arguments['unarchive']:
-        set_archive(project_name, arguments['<version-regex>'], False)
+        return set_archive(project_name, arguments['<version-regex>'], False, arguments['--dry-run'])
+    elif arguments['rename'] and arguments['--matching']:
+        return set_matching_names(project_name, arguments['--matching'], arguments['<name>'], arguments['--dry-run'])
     elif arguments['rename']:
         set_name(project_name, project_version, arguments['<name>'])
+    elif arguments['describe'] and arguments['--matching']:
+        return set_matching_descriptions(project_name, arguments['--matching'], arguments['<description>'],
+                                         arguments['--dry-run'])
     elif arguments['describe']:
         set_description(project_name, project_version, arguments['<description>'])
 
@@ -236,10 +465,8 @@ def do_work(arguments):
 def _jiject(argv, environ):
     from sys import stderr
     from copy import deepcopy
-    from jira import JIRAError
-    from infi.execute import ExecutionError
-    from .actions import choose_action
     from docopt import DocoptExit
+    from .errors import print_known_error
     try:
         arguments = _get_arguments(argv, dict(deepcopy(environ)))
         return do_work(arguments)
@@ -252,14 +479,17 @@ def _jiject(argv, environ):
     except SystemExit as e:
         print(e, file=stderr)
         return 0
-    except JIRAError as e:
-        print(e, file=stderr)
-    except ExecutionError as e:
-        print(e.result.get_stderr(), file=stderr)
+    except Exception as e:
+        if not print_known_error(e):
+            raise
     return 1
 
 
 def main():
     from os import environ
     from sys import argv
+    from .daemon import forward
+    returncode = forward("jirelease", argv[1:], environ)
+    if returncode is not None:
+        return returncode
     return _jiject(argv[1:], environ)
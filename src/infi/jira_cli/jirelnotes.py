@@ -63,8 +63,8 @@ def _get_arguments(argv, environ):
 
 
 def get_field(issue, key):
-    from .jira_adapter import get_custom_fields
-    result = getattr(issue.fields(), get_custom_fields()[key])
+    from .jira_adapter import get_custom_field_id
+    result = getattr(issue.fields(), get_custom_field_id(key))
     return result.replace('\r', '') if result else None
 
 
@@ -89,8 +89,14 @@ def is_new_feature(issue):
     return issue_mappings['Type'](issue) == "New Feature"
 
 
+def get_release_notes_fields():
+    from .jira_adapter import get_custom_field_id, get_fields_for_mappings
+    return get_fields_for_mappings(['Type'], [get_custom_field_id(RELEASE_NOTES_TITLE_KEY),
+                                              get_custom_field_id(RELEASE_NOTES_DESCRIPTION_KEY)])
+
+
 def get_release_notes_contents_for_specfic_version(project, version):
-    from .jira_adapter import get_custom_fields, get_jira
+    from .jira_adapter import search_issues
     release_date = getattr(version, 'releaseDate', '')
     base_query = "project={} AND fixVersion={!r} AND {!r} IS NOT EMPTY".format(project.key, str(version.name), RELEASE_NOTES_TITLE_KEY)
     known_issues_query = "project={0} AND {1!r} IS NOT EMPTY AND (" \
@@ -99,8 +105,8 @@ def get_release_notes_contents_for_specfic_version(project, version):
                          "(labels=known-issue AND status WAS IN (Resolved) ON {3} AND fixVersion > {2!r}))"
     known_issues_query = known_issues_query.format(project.key, RELEASE_NOTES_TITLE_KEY,
                                                    str(version.name), release_date or 'now()')
-    resolved_issues = list(get_jira().search_issues(base_query))
-    known_issues = list(get_jira().search_issues(known_issues_query))
+    resolved_issues = list(search_issues(base_query, fields=get_release_notes_fields()))
+    known_issues = list(search_issues(known_issues_query, fields=get_release_notes_fields()))
     if resolved_issues or known_issues_query:
         topics = [dict(name="What's new in this release", issues=[get_issue_details(issue) for issue in resolved_issues if is_new_feature(issue)]),
                   dict(name='Improvements', issues=[get_issue_details(issue) for issue in resolved_issues if is_improvement(issue)]),
@@ -169,9 +175,9 @@ def fetch_release_notes(project_key):
 
 def notify_related_tickets(project_key, project_version, other_versions, dry_run):
     def _build_jira_query_string():
-        from pkg_resources import parse_version
+        from .version_index import version_key
         if other_versions:
-            versions.extend(sorted(set(other_versions + [project_version]), key=lambda version: parse_version(version)))
+            versions.extend(sorted(set(other_versions + [project_version]), key=version_key))
             fix_version_string = 'fixVersion in ({})'.format(', '.join([repr(version) for version in versions]))
         else:
             fix_version_string = 'fixVersion={!r}'.format(project_version)
@@ -190,7 +196,7 @@ def notify_related_tickets(project_key, project_version, other_versions, dry_run
 
     def find_issues_in_other_projects_that_are_pending_on_this_release():
         related_tickets = {}
-        for issue in search_issues(_build_jira_query_string()):
+        for issue in search_issues(_build_jira_query_string(), fields=get_fields_for_mappings(['IssueLinks'])):
             for related_ticket in _iter_related_tickets(issue):
                 related_tickets.setdefault(related_ticket.key, list()).append(issue.key)
         return related_tickets  # {ticket_key -> [related_key, related_key, ...]}
@@ -214,25 +220,29 @@ def notify_related_tickets(project_key, project_version, other_versions, dry_run
                                             unresolved_issues=sort_issues(unresolved_issues),
                                             issue_mappings=issue_mappings)
 
-    from .jira_adapter import search_issues, issue_mappings, comment_on_issue, get_project, get_issue
-    from jira import JIRAError
+    from .jira_adapter import search_issues, issue_mappings, comment_on_issues, get_project, get_issues, get_fields_for_mappings
     project = get_project(project_key)
     versions = []
     related_tickets = find_issues_in_other_projects_that_are_pending_on_this_release()
-    for related_ticket, resolved_issues in sorted(list(related_tickets.items()), key=lambda item: item[0]):
-        resolved_issues = list(set(resolved_issues))
-        unresolved_issues = list(set(_iter_related_remaining_open_issues(get_issue(related_ticket))))
-        comment = _build_comment((get_issue(resolved_issue) for resolved_issue in resolved_issues),
-                                 (get_issue(unresolved_issue) for unresolved_issue in unresolved_issues))
-        comment = "".join(i for i in comment if ord(i)<128)
-        if dry_run:
+    # the related tickets, and then the summaries of all the issues the comments mention, are fetched concurrently
+    keys = sorted(related_tickets)
+    related_issues = get_issues(keys, fields=get_fields_for_mappings(['IssueLinks']))
+    unresolved_keys = {key: set(_iter_related_remaining_open_issues(issue)) for key, issue in zip(keys, related_issues)}
+    mentioned_keys = sorted(set.union(set(), *[set(related_tickets[key]) | unresolved_keys[key] for key in keys]))
+    mentioned_issues = dict(zip(mentioned_keys, get_issues(mentioned_keys, fields=get_fields_for_mappings(['Summary']))))
+    comments = []
+    for related_ticket in keys:
+        comment = _build_comment([mentioned_issues[key] for key in set(related_tickets[related_ticket])],
+                                 [mentioned_issues[key] for key in unresolved_keys[related_ticket]])
+        comments.append((related_ticket, "".join(i for i in comment if ord(i)<128)))
+    if dry_run:
+        for related_ticket, comment in comments:
             print("<--- COMMENT ON {0} STARTS HERE --->\n{1}\n<--- COMMENT ON {0} ENDS HERE ----->".format(related_ticket, comment))
-        else:
-            print('commenting on %s' % related_ticket)
-            try:
-                comment_on_issue(related_ticket, comment)
-            except JIRAError:
-                print('Failed to comment on %s' % related_ticket)
+        return
+    for result in comment_on_issues(comments):
+        print('commenting on %s' % result.key)
+        if result.error is not None:
+            print('Failed to comment on %s' % result.key)
 
 
 def config_set(confluence_fqdn):
@@ -261,10 +271,8 @@ def do_work(arguments):
 def _jiject(argv, environ):
     from sys import stderr
     from copy import deepcopy
-    from jira import JIRAError
-    from infi.execute import ExecutionError
-    from .actions import choose_action
     from docopt import DocoptExit
+    from .errors import print_known_error
     try:
         arguments = _get_arguments(argv, dict(deepcopy(environ)))
         return do_work(arguments)
@@ -277,14 +285,17 @@ def _jiject(argv, environ):
     except SystemExit as e:
         print(e, file=stderr)
         return 0
-    except JIRAError as e:
-        print(e, file=stderr)
-    except ExecutionError as e:
-        print(e.result.get_stderr(), file=stderr)
+    except Exception as e:
+        if not print_known_error(e):
+            raise
     return 1
 
 
 def main():
     from os import environ
     from sys import argv
+    from .daemon import forward
+    returncode = forward("jirelnotes", argv[1:], environ)
+    if returncode is not None:
+        return returncode
     return _jiject(argv[1:], environ)
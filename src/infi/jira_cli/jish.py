@@ -13,7 +13,6 @@ Usage:
 from __future__ import print_function
 
 from sys import stderr, stdout
-from . import jira_adapter
 from os import environ
 
 
@@ -33,9 +32,10 @@ def clear_environment_variables(environment_variables):
 
 
 def set_environment_variables_for_issue(arguments, environment_variables):
+    from . import jira_adapter
     issue_key = arguments.get("<issue>") or environ.get("JISSUE_ISSUE")
     try:
-        jira_adapter.get_issue(issue_key or "_")
+        jira_adapter.get_issue(issue_key or "_", fields='summary')
     except jira_adapter.JIRAError:
         print("no such issue", issue_key, file=stderr)
         raise SystemExit(1)
@@ -43,6 +43,7 @@ def set_environment_variables_for_issue(arguments, environment_variables):
 
 
 def set_environment_variables_for_project(arguments, environment_variables):
+    from . import jira_adapter
     project_key = arguments.get("<project>") or environ.get("JISSUE_PROJECT")
     try:
         project = jira_adapter.get_project(project_key or "_")
@@ -86,6 +87,7 @@ def _jish(argv):
     elif arguments.project or arguments.component or arguments.version or arguments.workon:
         set_environment_variables(arguments, environment_variables)
     elif arguments.create:
+        from . import jira_adapter
         args = (environ['JISSUE_PROJECT'],
                 arguments.get("<issue-type>"),
                 environ.get('JISSUE_COMPONENT') or None,
@@ -102,4 +104,8 @@ def _jish(argv):
 
 def main():
     from sys import argv
+    from .daemon import forward
+    returncode = forward("jish", argv[1:], environ)
+    if returncode is not None:
+        return returncode
     return _jish(argv[1:])
@@ -2,27 +2,35 @@
 infinidat jira issue command-line tool
 
 Usage:
-    jissue list {project} [--sort-by=<column-name>] [--reverse] [--assignee=<assignee>]
-    jissue search [--sort-by=<column-name>] [--reverse] (--filter=<filter> | <query>)
+    jissue list {project} [--sort-by=<column-name>] [--reverse] [--assignee=<assignee>] [--page-size=<count>] [--workers=<count>] [--offline] [--format=<format>]
+    jissue search [--sort-by=<column-name>] [--reverse] [--page-size=<count>] [--workers=<count>] [--offline] [--format=<format>] (--filter=<filter> | <query>)
     jissue get <customfield> {issue}
     jissue start {issue}
     jissue stop {issue}
-    jissue show {issue}
+    jissue show {issue} [--offline]
     jissue reopen {issue}
     jissue create <issue-type> <details> {project} [--component=<component>] [--fix-version=<version>] [--short] [--assign-to-me] [--field=<field-name-and-value...>]
+    jissue create-bulk <file> {project} [--fix-version=<version>] [--assign-to-me] [--chunk-size=<count>]
     jissue comment <message> {issue}
     jissue commit [<message>] {issue} [--file=<file>...]
     jissue resolve {issue} [--resolve-as=<resolution>] [--fix-version=<version>]
     jissue link <link-type> <target-issue> {issue}
-    jissue label {issue} --label=<label>...
+    jissue label {issue} --label=<label>... [--remove]
+    jissue label --jql=<query> --label=<label>... [--remove] [--page-size=<count>] [--workers=<count>]
     jissue assign {issue} (--assignee=<assignee> | --automatic | --to-no-one | --to-me)
     jissue inventory {project}
-    jissue history {project}
+    jissue history {project} [--full] [--page-size=<count>] [--workers=<count>]
+    jissue sync {project} [--full] [--page-size=<count>] [--workers=<count>]
     jissue filters
     jissue plugins show all
     jissue plugins show actionable
     jissue config show
     jissue config set <jira_fqdn> [<confluence_fqdn>]
+    jissue cache clear
+    jissue cache stats
+    jissue daemon start [--idle-timeout=<seconds>]
+    jissue daemon stop
+    jissue daemon status
 
 
 Options:
@@ -34,35 +42,54 @@ Options:
     show                                pretty-print issue details
     reopen                              re-open issue
     create                              create new issue
+    create-bulk                         create an issue per row of a CSV or JSON-lines file, prints the keys in row order
     comment                             add comment to issue
     commit                              do a Git commit with the issue details in the commit message
     resolve                             mark issue as resolved
     link                                create link between issues
-    label                               add labels to issue
+    label                               add labels to issue, or to all the issues matching a query
     assign                              assign issue to user
     inventory                           list components, versions, transisions in project
-    history                             show issue transion history
+    history                             show issue transion history, from a local copy of the changelogs that is updated
+                                        with the issues that changed since the last run
+    sync                                update the local mirror of the issues in project, for --offline
     filters                             list issue search filters
     plugins                             list plugins
     config                              get/set jira configuration
+    cache                               clear/show the local cache of jira metadata (fields, projects, etc.)
+    daemon                              start/stop a resident process that runs jissue, jish, jirelease and jirelnotes commands
     <project>                           project key {project_default}
     <issue>                             issue key {issue_default}
     <details>                           multiline-string, first line is summary, other is description
     <link-type>                         link type string [default: Duplicate]
     <target-issue>                      target issue
     <issue-type>                        issue type string
+    <file>                              columns: issue_type, summary, and optionally description, component, fix_version,
+                                        assignee, priority, parent, due and custom field names
     --component=<component>             component name {component_default}
     --fix-version=<version>             version string {version_default}
     --file=<file>...                    files/directories to commit
     --resolve-as=<resolution>           resolution string [default: Fixed]
-    --sort-by=<column-name>             column to sort by [default: Rank]
+    --sort-by=<column-name>             column to sort by, jira sorts the issues so they are printed as they arrive [default: Rank]
+    --format=<format>                   table, or one issue per line as they arrive: tsv, csv or jsonl [default: table]
     --assignee=<assignee>               jira user name
     --filter=<filter>                   name of a favorite filter
     --field=<field-name-and-value...>   in format name:=value
     --short                             print just the issue key, useful for scripting
+    --full                              fetch all the issues in the project again, instead of the ones updated since the last run
+    --offline                           answer from the local mirror of the project (see sync), without contacting jira.
+                                        search falls back to jira for queries the mirror cannot answer
+    --chunk-size=<count>                number of issues to create per request [default: 50]
+    --idle-timeout=<seconds>            stop the daemon after this many seconds without commands [default: 1800]
+    --page-size=<count>                 number of issues to fetch per request [default: 100]
+    --workers=<count>                   number of result pages to fetch concurrently, defaults to search_workers in the configuration.
+                                        for label --jql, number of issues to update concurrently, defaults to max_concurrent_requests
+    --jql=<query>                       label the issues matching this query
+    --remove                            remove the labels instead of adding them
     --help                              show this screen
 """
 from __future__ import print_function
+from .errors import exception_handler
 
 
 def _get_arguments(argv, environ):
@@ -89,34 +116,6 @@ def _get_arguments(argv, environ):
     return arguments
 
 
-def exception_handler(func):
-    from sys import stderr
-    from jira import JIRAError
-    from infi.execute import ExecutionError
-    from infi.pyutils.decorators import wraps
-    from .config import ConfigurationError
-    from docopt import DocoptExit
-
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        try:
-            return func(*args, **kwargs) or 0
-        except DocoptExit as e:
-            print(e, file=stderr)
-            return 1
-        except SystemExit as e:
-            print(e, file=stderr)
-            return 0
-        except JIRAError as e:
-            print(e, file=stderr)
-        except ExecutionError as e:
-            print(e.result.get_stderr() + e.result.get_stdout(), file=stderr)
-        except ConfigurationError as e:
-            print(e.message, file=stderr)
-        return 1
-    return wrapper
-
-
 @exception_handler
 def _jissue(argv, environ=dict()):
     from copy import deepcopy
@@ -130,4 +129,8 @@ def _jissue(argv, environ=dict()):
 def main():
     from os import environ
     from sys import argv
+    from .daemon import forward
+    returncode = forward("jissue", argv[1:], environ)
+    if returncode is not None:
+        return returncode
     return _jissue(argv[1:], environ)
@@ -0,0 +1,406 @@
+"""compiles the subset of JQL that our queries and saved filters use to SQL over the issue mirror, so `--offline`
+searches run locally.
+
+the supported fields are project, status, issuetype, priority, resolution, assignee, reporter, key, id, summary,
+description, text, labels, fixVersion, affectedVersion, component, created and updated, combined with AND, OR, NOT
+and parentheses, and followed by an optional ORDER BY. anything else raises UnsupportedQuery, and the caller falls back
+to searching the server.
+
+text searches (~) match every term of the value as a substring of the summary or description. the server also
+searches comments (which are not mirrored) and stems words, so the results can differ on a few issues.
+dates without an offset are in the timezone of this machine, the server uses the timezone of the user"""
+from datetime import datetime, timedelta, timezone
+from munch import Munch
+import re
+from .issue_mirror import MirrorError, VALUE_FIELDS
+
+
+TOKEN_PATTERN = re.compile(r'\s*(?:(?P<string>"(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\')|'
+                           r'(?P<operator>!=|!~|>=|<=|&&|\|\||[=~<>(),!])|'
+                           r'(?P<word>[^\s=!~<>(),"\'&|]+))')
+DATE_PATTERN = re.compile(r'^(\d{4})[-/](\d{1,2})[-/](\d{1,2})(?:\s+(\d{1,2}):(\d{2}))?$')
+RELATIVE_DATE_PATTERN = re.compile(r'^([+-]?)\s*((?:\d+\s*[wdhm]\s*)+)$')
+RELATIVE_DATE_UNITS = dict(w=timedelta(weeks=1), d=timedelta(days=1), h=timedelta(hours=1), m=timedelta(minutes=1))
+
+FIELD_ALIASES = dict(project='project', status='status', issuetype='type', type='type', priority='priority',
+                     resolution='resolution', assignee='assignee', reporter='reporter', key='key', issuekey='key',
+                     issue='key', id='id', summary='summary', description='description', text='text', labels='labels',
+                     fixversion='fixVersions', affectedversion='versions', component='components', created='created',
+                     createddate='created', updated='updated', updateddate='updated', rank='rank')
+# single-valued fields and their columns in the issues table
+COLUMN_FIELDS = dict(project='project', status='status', type='type', priority='priority', resolution='resolution',
+                     assignee='assignee_name', reporter='reporter_name', key='key', id='id')
+USER_FIELDS = ('assignee', 'reporter')
+TEXT_FIELDS = dict(summary=('summary', ), description=('description', ), text=('summary', 'description'))
+DATE_FIELDS = dict(created='created_utc', updated='updated_utc')
+# the expressions every field is ordered by. the server orders statuses, issue types and resolutions by their
+# position in the scheme, which is not mirrored
+ORDER_COLUMNS = dict(key=("project", "CAST(substr(key, length(project) + 2) AS INTEGER)"), id=("id", ),
+                     project=("project", ), created=("created_utc", ), updated=("updated_utc", ),
+                     summary=("summary", ), assignee=("assignee", ), reporter=("reporter", ), priority=("priority_id", ),
+                     rank=("rank", ))
+# a higher priority has a lower id
+REVERSED_ORDER_FIELDS = ('priority', )
+# fields with empty values, the server orders them last
+NULLABLE_ORDER_FIELDS = ('assignee', 'reporter', 'rank')
+UNRESOLVED = 'unresolved'
+
+
+class UnsupportedQuery(MirrorError):
+    pass
+
+
+def tokenize(query):
+    """:returns: a list of (kind, text) tuples, kind is one of string, operator, word"""
+    tokens, position = [], 0
+    query = query.rstrip()
+    while position < len(query):
+        match = TOKEN_PATTERN.match(query, position)
+        if match is None:
+            raise UnsupportedQuery("cannot parse the query at {!r}".format(query[position:]))
+        kind = match.lastgroup
+        text = match.group(kind)
+        if kind == 'string':
+            text = re.sub(r'\\(.)', r'\1', text[1:-1])
+        tokens.append((kind, text))
+        position = match.end()
+    return tokens
+
+
+def _get_placeholders(values):
+    return ', '.join('?' * len(values))
+
+
+def _escape_like(term):
+    term = term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return '%' + term.replace('*', '%').replace('?', '_') + '%'
+
+
+def get_text_terms(text):
+    """:returns: the terms of a text search, every one of them has to match"""
+    terms = [phrase or word for phrase, word in re.findall(r'"([^"]*)"|(\S+)', text)]
+    for term in terms:
+        if term[:1] in '+-!' or term in ('AND', 'OR', 'NOT') or any(char in term for char in '~^\\:[]{}'):
+            raise UnsupportedQuery("the text search {!r} is not supported offline".format(text))
+    return [term.rstrip('*') for term in terms if term.rstrip('*')]
+
+
+class QueryCompiler(object):
+    """a recursive descent parser of a JQL query, producing a condition and an order on the issues table"""
+
+    def __init__(self, query, username=None, now=None, tzinfo=None):
+        super(QueryCompiler, self).__init__()
+        self._query = query
+        self._tokens = tokenize(query)
+        self._position = 0
+        self._username = username
+        self._now = now or datetime.now(timezone.utc).replace(microsecond=0)
+        self._tzinfo = tzinfo
+
+    def compile(self):
+        """:returns: a Munch of where, parameters, order_by (None for the default order) and projects, the projects
+        the query reads from (None when it is not limited to specific projects)"""
+        where, parameters, projects = "1", [], None
+        if self._peek() is not None and not self._is_keyword('ORDER'):
+            where, parameters, projects = self._parse_or()
+        order_by = self._parse_order_by() if self._accept_keyword('ORDER') else None
+        if self._peek() is not None:
+            raise UnsupportedQuery("cannot parse the query at {!r}".format(self._peek()[1]))
+        return Munch(where=where, parameters=tuple(parameters), order_by=order_by,
+                     projects=None if projects is None else sorted(projects))
+
+    # tokens
+
+    def _peek(self):
+        return self._tokens[self._position] if self._position < len(self._tokens) else None
+
+    def _next(self):
+        token = self._peek()
+        if token is None:
+            raise UnsupportedQuery("the query {!r} ends unexpectedly".format(self._query))
+        self._position += 1
+        return token
+
+    def _is_keyword(self, keyword):
+        token = self._peek()
+        return token is not None and token[0] == 'word' and token[1].upper() == keyword
+
+    def _is_operator(self, *operators):
+        token = self._peek()
+        return token is not None and token[0] == 'operator' and token[1] in operators
+
+    def _accept_keyword(self, keyword):
+        if self._is_keyword(keyword):
+            self._position += 1
+            return True
+        return False
+
+    def _accept_operator(self, operator):
+        if self._is_operator(operator):
+            self._position += 1
+            return True
+        return False
+
+    def _expect_keyword(self, keyword):
+        if not self._accept_keyword(keyword):
+            raise UnsupportedQuery("expected {} in {!r}".format(keyword, self._query))
+
+    def _expect_operator(self, operator):
+        if not self._accept_operator(operator):
+            raise UnsupportedQuery("expected {!r} in {!r}".format(operator, self._query))
+
+    # conditions
+
+    def _parse_or(self):
+        where, parameters, projects = self._parse_and()
+        while self._accept_keyword('OR') or self._accept_operator('||'):
+            right_where, right_parameters, right_projects = self._parse_and()
+            where, parameters = "({} OR {})".format(where, right_where), parameters + right_parameters
+            projects = None if projects is None or right_projects is None else projects | right_projects
+        return where, parameters, projects
+
+    def _parse_and(self):
+        where, parameters, projects = self._parse_not()
+        while self._accept_keyword('AND') or self._accept_operator('&&'):
+            right_where, right_parameters, right_projects = self._parse_not()
+            where, parameters = "({} AND {})".format(where, right_where), parameters + right_parameters
+            if projects is None or right_projects is None:
+                projects = right_projects if projects is None else projects
+            else:
+                projects = projects & right_projects
+        return where, parameters, projects
+
+    def _parse_not(self):
+        if self._accept_keyword('NOT') or self._accept_operator('!'):
+            where, parameters, _ = self._parse_not()
+            return "NOT {}".format(where), parameters, None
+        if self._accept_operator('('):
+            result = self._parse_or()
+            self._expect_operator(')')
+            return result
+        return self._parse_clause()
+
+    def _parse_operator(self):
+        if self._accept_keyword('IS'):
+            operator = 'is not empty' if self._accept_keyword('NOT') else 'is empty'
+            if not (self._accept_keyword('EMPTY') or self._accept_keyword('NULL')):
+                raise UnsupportedQuery("expected EMPTY in {!r}".format(self._query))
+            return operator
+        if self._accept_keyword('NOT'):
+            self._expect_keyword('IN')
+            return 'not in'
+        if self._accept_keyword('IN'):
+            return 'in'
+        kind, text = self._next()
+        if kind != 'operator' or text not in ('=', '!=', '~', '!~', '<', '<=', '>', '>='):
+            raise UnsupportedQuery("the operator {!r} is not supported offline".format(text))
+        return text
+
+    def _parse_value(self):
+        """:returns: a (kind, text) tuple, kind is one of literal, function, empty"""
+        kind, text = self._next()
+        if kind == 'string':
+            return 'literal', text
+        if kind != 'word':
+            raise UnsupportedQuery("expected a value instead of {!r} in {!r}".format(text, self._query))
+        if text.upper() in ('EMPTY', 'NULL'):
+            return 'empty', None
+        if self._accept_operator('('):
+            self._expect_operator(')')
+            return 'function', text.lower()
+        return 'literal', text
+
+    def _parse_values(self, operator):
+        if operator in ('is empty', 'is not empty'):
+            return []
+        if operator not in ('in', 'not in'):
+            return [self._parse_value()]
+        if not self._accept_operator('('):
+            raise UnsupportedQuery("the functions in {!r} are not supported offline".format(self._query))
+        values = [self._parse_value()]
+        while self._accept_operator(','):
+            values.append(self._parse_value())
+        self._expect_operator(')')
+        return values
+
+    def _parse_clause(self):
+        kind, text = self._next()
+        field = FIELD_ALIASES.get(text.lower()) if kind == 'word' else None
+        if field is None:
+            raise UnsupportedQuery("the {} field is not supported offline".format(text))
+        operator = self._parse_operator()
+        values = self._parse_values(operator)
+        if operator in ('=', '!=') and values[0][0] == 'empty':
+            operator, values = 'is empty' if operator == '=' else 'is not empty', []
+        if field in COLUMN_FIELDS:
+            where, parameters = self._compile_column(field, operator, values)
+            projects = None
+            if field == 'project' and operator in ('=', 'in'):
+                projects = set(value.upper() for value in parameters)
+            return where, parameters, projects
+        if field in VALUE_FIELDS:
+            return self._compile_values(field, operator, values) + (None, )
+        if field in TEXT_FIELDS:
+            return self._compile_text(field, operator, values) + (None, )
+        if field in DATE_FIELDS:
+            return self._compile_date(field, operator, values) + (None, )
+        raise UnsupportedQuery("searching by {} is not supported offline".format(text))
+
+    def _get_literal(self, field, value):
+        kind, text = value
+        if kind == 'function' and text == 'currentuser' and field in USER_FIELDS:
+            if self._username is None:
+                raise UnsupportedQuery("the current user is unknown until a project is synced")
+            return self._username
+        if kind == 'function':
+            raise UnsupportedQuery("{}() is not supported offline".format(text))
+        if field == 'id':
+            try:
+                return int(text)
+            except ValueError:
+                raise UnsupportedQuery("{!r} is not an issue id".format(text))
+        return text
+
+    def _split_values(self, field, values):
+        """:returns: the literal values, and whether an empty value matches too"""
+        literals, empty = [], False
+        for value in values:
+            if value[0] == 'empty' or (field == 'resolution' and value[0] == 'literal' and
+                                       value[1].lower() == UNRESOLVED):
+                empty = True
+            else:
+                literals.append(self._get_literal(field, value))
+        return literals, empty
+
+    def _compile_column(self, field, operator, values):
+        column = COLUMN_FIELDS[field]
+        if operator in ('is empty', 'is not empty'):
+            return "{} IS {}NULL".format(column, 'NOT ' if operator == 'is not empty' else ''), []
+        if operator not in ('=', '!=', 'in', 'not in'):
+            raise UnsupportedQuery("the {} operator is not supported offline for {}".format(operator, field))
+        literals, empty = self._split_values(field, values)
+        if operator in ('=', 'in'):
+            conditions = ["{} IN ({})".format(column, _get_placeholders(literals))] if literals else []
+            conditions += ["{} IS NULL".format(column)] if empty else []
+            return "({})".format(" OR ".join(conditions)), literals
+        if not literals:
+            return "{} IS NOT NULL".format(column), []
+        # like the server, != does not match empty values
+        return "{} NOT IN ({})".format(column, _get_placeholders(literals)), literals
+
+    def _compile_values(self, field, operator, values):
+        # the keys of the matching issues come from the (field, value) index of issue_values
+        has_values = "key IN (SELECT key FROM issue_values WHERE field = ?)"
+        if operator in ('is empty', 'is not empty'):
+            return "{}{}".format('NOT ' if operator == 'is empty' else '', has_values), [field]
+        if operator not in ('=', '!=', 'in', 'not in'):
+            raise UnsupportedQuery("the {} operator is not supported offline for {}".format(operator, field))
+        literals, empty = self._split_values(field, values)
+        matches = "key IN (SELECT key FROM issue_values WHERE field = ? AND value IN ({}))".format(
+            _get_placeholders(literals))
+        if operator in ('=', 'in'):
+            conditions, parameters = ([matches], [field] + literals) if literals else ([], [])
+            if empty:
+                conditions, parameters = conditions + ["NOT " + has_values], parameters + [field]
+            return "({})".format(" OR ".join(conditions)), parameters
+        if not literals:
+            return has_values, [field]
+        # like the server, != matches issues that have values, none of them the given ones
+        return "({} AND NOT {})".format(has_values, matches), [field, field] + literals
+
+    def _compile_text(self, field, operator, values):
+        columns = TEXT_FIELDS[field]
+        if operator in ('is empty', 'is not empty') and field != 'text':
+            return "{} IS {}NULL".format(columns[0], 'NOT ' if operator == 'is not empty' else ''), []
+        if operator not in ('~', '!~') or values[0][0] != 'literal':
+            raise UnsupportedQuery("the {} operator is not supported offline for {}".format(operator, field))
+        terms = get_text_terms(values[0][1])
+        if not terms:
+            raise UnsupportedQuery("the text search {!r} is empty".format(values[0][1]))
+        conditions, parameters = [], []
+        for term in terms:
+            conditions.append("({})".format(" OR ".join("IFNULL({}, '') LIKE ? ESCAPE '\\'".format(column)
+                                                         for column in columns)))
+            parameters.extend([_escape_like(term)] * len(columns))
+        where = "({})".format(" AND ".join(conditions))
+        return ("NOT " + where if operator == '!~' else where), parameters
+
+    def _get_timestamp(self, value):
+        """:returns: a timezone-aware datetime of a date value, an absolute or relative date, or now()"""
+        kind, text = value
+        if kind == 'function' and text == 'now':
+            return self._now
+        if kind == 'function' and text == 'startofday':
+            return self._to_timestamp(self._now.astimezone(self._tzinfo).replace(hour=0, minute=0, second=0,
+                                                                                  tzinfo=None))
+        if kind != 'literal':
+            raise UnsupportedQuery("{}() is not supported offline".format(text))
+        match = DATE_PATTERN.match(text)
+        if match is not None:
+            year, month, day, hour, minute = match.groups()
+            return self._to_timestamp(datetime(int(year), int(month), int(day), int(hour or 0), int(minute or 0)))
+        match = RELATIVE_DATE_PATTERN.match(text)
+        if match is not None:
+            sign, offsets = match.groups()
+            offset = sum((int(count) * RELATIVE_DATE_UNITS[unit]
+                          for count, unit in re.findall(r'(\d+)\s*([wdhm])', offsets)), timedelta())
+            return self._now - offset if sign == '-' else self._now + offset
+        raise UnsupportedQuery("the date {!r} is not supported offline".format(text))
+
+    def _to_timestamp(self, naive_datetime):
+        if self._tzinfo is None:
+            return naive_datetime.astimezone()
+        return naive_datetime.replace(tzinfo=self._tzinfo)
+
+    def _compile_date(self, field, operator, values):
+        column = DATE_FIELDS[field]
+        if operator in ('is empty', 'is not empty'):
+            return "{} IS {}NULL".format(column, 'NOT ' if operator == 'is not empty' else ''), []
+        if operator not in ('=', '!=', '<', '<=', '>', '>='):
+            raise UnsupportedQuery("the {} operator is not supported offline for {}".format(operator, field))
+        # the stored timestamps are UTC strings in ISO 8601, which sort in chronological order
+        bound = self._get_timestamp(values[0]).astimezone(timezone.utc).isoformat()
+        return "{} {} ?".format(column, operator), [bound]
+
+    # order
+
+    def _parse_order_by(self):
+        self._expect_keyword('BY')
+        expressions = []
+        while True:
+            kind, text = self._next()
+            field = FIELD_ALIASES.get(text.lower()) if kind == 'word' else None
+            if field not in ORDER_COLUMNS:
+                raise UnsupportedQuery("ordering by {} is not supported offline".format(text))
+            descending = self._accept_keyword('DESC')
+            if not descending:
+                self._accept_keyword('ASC')
+            if field in REVERSED_ORDER_FIELDS:
+                descending = not descending
+            direction = " DESC" if descending else ""
+            if field in NULLABLE_ORDER_FIELDS:
+                expressions.append("{} IS NULL{}".format(ORDER_COLUMNS[field][0], direction))
+            expressions.extend(expression + direction for expression in ORDER_COLUMNS[field])
+            if not self._accept_operator(','):
+                return ", ".join(expressions)
+
+
+def set_order_by(query, order_by):
+    """:returns: the query with its ORDER BY clause, if any, replaced by the given one (e.g. "created DESC")"""
+    query, position, previous = query.rstrip(), 0, None
+    while position < len(query):
+        match = TOKEN_PATTERN.match(query, position)
+        if match is None:
+            break
+        if previous is not None and previous.lastgroup == match.lastgroup == 'word' and \
+                (previous.group('word').upper(), match.group('word').upper()) == ('ORDER', 'BY'):
+            query = query[:previous.start('word')].rstrip()
+            break
+        previous, position = match, match.end()
+    return "{} ORDER BY {}".format(query, order_by).lstrip()
+
+
+def compile_query(query, username=None, now=None, tzinfo=None):
+    """:returns: a Munch of where, parameters, order_by and projects, see QueryCompiler.compile.
+    raises UnsupportedQuery when the query cannot be answered from the mirror"""
+    return QueryCompiler(query, username, now, tzinfo).compile()
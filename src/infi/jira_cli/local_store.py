@@ -0,0 +1,45 @@
+"""the local sqlite database of a server, holding the data that commands keep between runs (changelogs, mirrored issues).
+each feature keeps its own tables in it"""
+from infi.pyutils.lazy import cached_function
+from datetime import timedelta
+from os import path
+from .config import Configuration
+
+
+# JQL compares dates in the timezone of the user, which can be up to 14 hours away from the offset of a watermark.
+# issues that are fetched twice are replaced in the store, so the margin only costs a few extra issues.
+WATERMARK_MARGIN = timedelta(days=1)
+JQL_DATETIME_FORMAT = "%Y/%m/%d %H:%M"
+
+
+def get_local_store_filepath(fqdn):
+    return path.join(Configuration.get_cache_dirpath(), "{}.sqlite".format(fqdn))
+
+
+def connect(filepath):
+    import sqlite3
+    from os import makedirs
+    dirpath = path.dirname(filepath)
+    if dirpath and not path.exists(dirpath):
+        makedirs(dirpath)
+    connection = sqlite3.connect(filepath)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+
+@cached_function
+def get_local_store():
+    """:returns: the sqlite connection of the configured server"""
+    config = Configuration.from_file()
+    return connect(get_local_store_filepath(config.jira_fqdn))
+
+
+def get_updated_since_query(project, watermark):
+    """:returns: a query for the issues of a project updated since a watermark (an `updated` timestamp), or all of them"""
+    from .timestamps import parse_timestamp
+    query = 'project = {}'.format(project)
+    if watermark is None:
+        return query
+    since = parse_timestamp(watermark) - WATERMARK_MARGIN
+    return '{} AND updated >= "{}"'.format(query, since.strftime(JQL_DATETIME_FORMAT))
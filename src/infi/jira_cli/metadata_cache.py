@@ -0,0 +1,116 @@
+from infi.pyutils.lazy import cached_function
+from logging import getLogger
+from threading import RLock
+from time import time
+from os import path
+from .config import Configuration
+
+
+logger = getLogger(__name__)
+
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+# metadata that rarely changes is kept for long, project details (versions, components) change on release days
+TTL = dict(fields=DAY, project=10 * MINUTE, resolutions=7 * DAY, issue_link_types=7 * DAY, transitions=DAY,
+           createmeta=HOUR)
+DEFAULT_TTL = HOUR
+
+
+class MetadataCache(object):
+    """a json file holding slow-changing JIRA metadata of a single server, with a time-to-live per entry type"""
+
+    def __init__(self, filepath, ttl=TTL):
+        super(MetadataCache, self).__init__()
+        self._filepath = filepath
+        self._ttl = ttl
+        self._data = None
+        self._lock = RLock()
+
+    @property
+    def filepath(self):
+        return self._filepath
+
+    def _get_ttl(self, kind):
+        return self._ttl.get(kind, DEFAULT_TTL)
+
+    def _is_expired(self, kind, entry):
+        return time() - entry['timestamp'] >= self._get_ttl(kind)
+
+    def _load(self):
+        from json import load
+        if self._data is None:
+            try:
+                with open(self._filepath) as fd:
+                    self._data = load(fd)
+            except (IOError, OSError, ValueError):
+                self._data = dict()
+        return self._data
+
+    def _save(self):
+        from json import dump
+        from os import makedirs, replace
+        dirpath = path.dirname(self._filepath)
+        if not path.exists(dirpath):
+            makedirs(dirpath)
+        temp_filepath = self._filepath + '.tmp'
+        try:
+            with open(temp_filepath, 'w') as fd:
+                dump(self._data, fd)
+            replace(temp_filepath, self._filepath)
+        except (IOError, OSError) as error:
+            logger.debug("failed to write metadata cache {!r}: {}".format(self._filepath, error))
+
+    def get(self, kind, key, loader):
+        """:returns: the cached value of (kind, key), calling loader() to fetch it if it is missing or expired"""
+        with self._lock:
+            entry = self._load().get(kind, dict()).get(key)
+            if entry is not None and not self._is_expired(kind, entry):
+                return entry['value']
+        value = loader()
+        with self._lock:
+            self._load().setdefault(kind, dict())[key] = dict(timestamp=time(), value=value)
+            self._save()
+        return value
+
+    def invalidate(self, kind, key=None):
+        with self._lock:
+            entries = self._load().get(kind, dict())
+            if key is None:
+                entries.clear()
+            else:
+                entries.pop(key, None)
+            self._save()
+
+    def clear(self):
+        with self._lock:
+            self._data = dict()
+            self._save()
+
+    def get_expired_kinds(self, since):
+        """:returns: the kinds that have entries which expired after since, for long-running processes that keep
+        the metadata in memory too"""
+        with self._lock:
+            now = time()
+            return [kind for kind, entries in sorted(self._load().items())
+                    if any(since < entry['timestamp'] + self._get_ttl(kind) <= now for entry in entries.values())]
+
+    def stats(self):
+        """:returns: a list of (kind, entries, expired entries, time-to-live in seconds) tuples"""
+        with self._lock:
+            data = self._load()
+            return [(kind, len(entries), len([entry for entry in entries.values() if self._is_expired(kind, entry)]),
+                     self._get_ttl(kind))
+                    for kind, entries in sorted(data.items())]
+
+
+def get_metadata_cache_filepath(fqdn):
+    return path.join(Configuration.get_cache_dirpath(), "{}.json".format(fqdn))
+
+
+@cached_function
+def get_metadata_cache():
+    config = Configuration.from_file()
+    return MetadataCache(get_metadata_cache_filepath(config.jira_fqdn))
@@ -0,0 +1,74 @@
+"""writing rows of issue columns in the formats of `jissue list/search --format`.
+
+tsv, csv and jsonl write every row as soon as it is extracted, so the output streams while the following pages are
+fetched. a table has to see all the rows to size its columns, it is rendered with plain string padding (in the layout
+of a left-aligned PrettyTable) which stays fast with tens of thousands of rows"""
+from __future__ import print_function
+
+
+FORMATS = ('table', 'tsv', 'csv', 'jsonl')
+
+
+def stringify(value):
+    try:
+        return str(value)
+    except:
+        return ''
+
+
+def _to_json_value(value):
+    return value.isoformat() if hasattr(value, 'isoformat') else stringify(value)
+
+
+def _to_cell(value):
+    """:returns: the value as a single line"""
+    return stringify(value).replace('\r\n', ' ').replace('\n', ' ').replace('\t', ' ')
+
+
+def render_table(columns, rows):
+    """:returns: the rows as a left-aligned text table"""
+    cells = [[_to_cell(value) for value in row] for row in rows]
+    widths = [len(column) for column in columns]
+    for row in cells:
+        widths = [max(width, len(cell)) for width, cell in zip(widths, row)]
+    border = '+' + '+'.join('-' * (width + 2) for width in widths) + '+'
+    lines = [border, '| ' + ' | '.join(column.ljust(width) for column, width in zip(columns, widths)) + ' |', border]
+    lines.extend('| ' + ' | '.join(cell.ljust(width) for cell, width in zip(row, widths)) + ' |' for row in cells)
+    lines.append(border)
+    return '\n'.join(lines)
+
+
+def _iter_lines(output_format, columns, rows):
+    if output_format == 'tsv':
+        yield '\t'.join(columns)
+        for row in rows:
+            yield '\t'.join(_to_cell(value) if value is not None else '' for value in row)
+    elif output_format == 'jsonl':
+        import json
+        for row in rows:
+            yield json.dumps(dict(zip(columns, row)), default=_to_json_value)
+    else:
+        yield render_table(columns, rows)
+
+
+def write_rows(output_format, columns, rows, stream=None):
+    """writes rows, an iterable of value lists, to stream (stdout by default). when the reader of a pipe goes away,
+    stops consuming rows, and so fetching pages"""
+    import sys
+    stream = stream or sys.stdout
+    try:
+        if output_format == 'csv':
+            import csv
+            writer = csv.writer(stream, lineterminator='\n')
+            writer.writerow(columns)
+            for row in rows:
+                writer.writerow(['' if value is None else stringify(value) for value in row])
+        else:
+            for line in _iter_lines(output_format, columns, rows):
+                stream.write(line + '\n')
+        stream.flush()
+    except BrokenPipeError:
+        if stream is sys.stdout:
+            # the interpreter flushes stdout again on exit, which would fail the same way
+            from os import devnull, open as open_file, dup2, O_WRONLY
+            dup2(open_file(devnull, O_WRONLY), sys.stdout.fileno())
@@ -10,6 +10,9 @@ class Plugin(object):
         self._name = self._plugin_data['name']
         self._key = self._plugin_data['key']
         self._installed_version = self._plugin_data['version']
+        # filled by get_plugins, which fetches the details of all the plugins concurrently
+        self._license_data = None
+        self._marketplace_info = None
 
     def get_info(self):
         return get("{}".format(self._plugin_data['links']['self']))
@@ -17,12 +20,20 @@ class Plugin(object):
     def get(self, uri):
         return get("{}/{}".format(self._plugin_data['links']['self'], uri))
 
+    def get_license_uri(self):
+        return "{}/license".format(self._plugin_data['links']['self'])
+
+    def get_marketplace_uri(self):
+        return self._plugin_data['links']['self'].replace("plugins/1.0/", "plugins/1.0/available/")
+
     def get_license_data(self):
-        try:
-            return self.get("license")
-        except requests.HTTPError as error:
-            logger.warn(error)
-        return dict()
+        if self._license_data is None:
+            try:
+                self._license_data = self.get("license")
+            except requests.HTTPError as error:
+                logger.warn(error)
+                self._license_data = dict()
+        return self._license_data
 
     def get_summary(self):
         return self.get("summary")
@@ -40,11 +51,17 @@ class Plugin(object):
         return self._name
 
     def get_info_on_marketplace(self):
-        try:
-            return get(self._plugin_data['links']['self'].replace("plugins/1.0/", "plugins/1.0/available/"))
-        except requests.HTTPError as error:
-            logger.warn(error)
-        return dict()
+        if self._marketplace_info is None:
+            try:
+                self._marketplace_info = get(self.get_marketplace_uri())
+            except requests.HTTPError as error:
+                logger.warn(error)
+                self._marketplace_info = dict()
+        return self._marketplace_info
+
+    def set_details(self, license_data, marketplace_info):
+        self._license_data = license_data
+        self._marketplace_info = marketplace_info
 
     @property
     def marketplace_version(self):
@@ -89,15 +106,34 @@ class Plugin(object):
 
 
 def get(uri, *args, **kwargs):
-    from infi.jira_cli.jira_adapter import get_jira
-    jira = get_jira()
-    respnose = requests.get("{}{}".format(jira._options['server'], uri), auth=requests.auth.HTTPBasicAuth(*jira._session.auth))
+    from infi.jira_cli.jira_adapter import get_jira_session
+    from infi.jira_cli.config import Configuration
+    server = "https://{}".format(Configuration.from_file().jira_fqdn)
+    respnose = get_jira_session().get("{}{}".format(server, uri))
     respnose.raise_for_status()
     return respnose.json()
 
 
+def _get_json_or_warn(result):
+    if isinstance(result, Exception):
+        logger.warn(result)
+        return dict()
+    return result
+
+
 def get_plugins():
-    return [Plugin(item) for item in get("/rest/plugins/1.0/")['plugins']]
+    """:returns: the installed plugins, with their license and marketplace details fetched concurrently"""
+    from .async_client import map_concurrently
+    plugins = [Plugin(item) for item in get("/rest/plugins/1.0/")['plugins']]
+
+    async def _get_json(client, uri):
+        return await client.get_json(uri)
+
+    uris = [uri for plugin in plugins for uri in (plugin.get_license_uri(), plugin.get_marketplace_uri())]
+    results = [_get_json_or_warn(result) for result in map_concurrently(_get_json, uris)]
+    for plugin, license_data, marketplace_info in zip(plugins, results[::2], results[1::2]):
+        plugin.set_details(license_data, marketplace_info)
+    return plugins
 
 def get_available_upgrades():
     return get("/rest/plugins/1.0/available/upgrades")
@@ -0,0 +1,68 @@
+"""parsing of the timestamps in JIRA responses, e.g. 2020-01-02T03:04:05.000+0200, and of dates, e.g. 2020-01-02.
+
+the fixed-offset format JIRA uses goes through datetime.fromisoformat, other ISO 8601 variants through a regular
+expression. the results are timezone-aware and memoized, the same timestamps repeat across comments, histories and versions"""
+from datetime import datetime, date, time, timedelta, timezone
+from functools import lru_cache
+import re
+
+
+CACHE_SIZE = 16 * 1024
+TIMESTAMP_PATTERN = re.compile(r'^(\d{4})-(\d{2})-(\d{2})T(\d{2}):(\d{2}):(\d{2})(?:\.(\d{1,6})\d*)?(Z|[+-]\d{2}:?\d{2})?$')
+
+
+@lru_cache(maxsize=None)
+def get_timezone(offset):
+    """:returns: the fixed-offset timezone of an offset string like +0200, -05:30 or Z"""
+    if offset in (None, 'Z'):
+        return timezone.utc
+    sign = -1 if offset[0] == '-' else 1
+    digits = offset[1:].replace(':', '')
+    return timezone(sign * timedelta(hours=int(digits[:2]), minutes=int(digits[2:])))
+
+
+def _parse_timestamp_slowly(formatted_string):
+    match = TIMESTAMP_PATTERN.match(formatted_string)
+    if match is None:
+        raise ValueError("invalid timestamp: {!r}".format(formatted_string))
+    year, month, day, hour, minute, second, fraction, offset = match.groups()
+    return datetime(int(year), int(month), int(day), int(hour), int(minute), int(second),
+                    int((fraction or '0').ljust(6, '0')), get_timezone(offset))
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_timestamp(formatted_string):
+    """:returns: a timezone-aware datetime"""
+    if len(formatted_string) == 28 and formatted_string[10] == 'T' and formatted_string[23] in '+-':
+        # datetime.fromisoformat expects the offset as +02:00 rather than +0200
+        try:
+            return datetime.fromisoformat(formatted_string[:26] + ':' + formatted_string[26:])
+        except ValueError:
+            pass
+    return _parse_timestamp_slowly(formatted_string)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_date(formatted_string):
+    """:returns: a date"""
+    if len(formatted_string) != 10 or formatted_string[4] != '-' or formatted_string[7] != '-':
+        raise ValueError("invalid date: {!r}".format(formatted_string))
+    return date(int(formatted_string[0:4]), int(formatted_string[5:7]), int(formatted_string[8:10]))
+
+
+def to_utc_string(formatted_string):
+    """:returns: the timestamp in UTC and ISO 8601, these strings sort in chronological order"""
+    return parse_timestamp(formatted_string).astimezone(timezone.utc).isoformat()
+
+
+def from_jira_formatted_datetime(formatted_string):
+    return parse_timestamp(formatted_string)
+
+
+def from_jira_formatted_date(formatted_string):
+    """:returns: midnight UTC of the date, as a timezone-aware datetime"""
+    return datetime.combine(parse_date(formatted_string), time(tzinfo=timezone.utc))
+
+
+def to_jira_formatted_date(datetime_object):
+    return datetime_object.strftime("%Y-%m-%d")
@@ -0,0 +1,171 @@
+"""indexes the versions of a project by name, by position and in version order, for jirelease.
+
+version names are ordered by version_key, a light parser in the spirit of PEP 440 that also orders names which are
+not versions at all (like "Backlog", before every number) without importing pkg_resources"""
+from bisect import bisect_left, bisect_right
+from re import compile
+
+
+VERSION_PART_PATTERN = compile(r'\d+|[a-z]+')
+PRE_RELEASE_TAGS = dict(dev=0, a=1, alpha=1, b=2, beta=2, c=3, pre=3, preview=3, rc=3)
+# a key part is a (kind, number, word) tuple. pre-release tags sort before the end of a name, which sorts before any
+# other word, and numbers come last. so 1.0rc1 < 1.0 < 1.0.post1 < 1.0.1
+PRE_RELEASE, END, WORD, NUMBER = range(4)
+
+
+class VersionNotFound(Exception):
+    pass
+
+
+def version_key(name):
+    """:returns: a key that orders version names, 1.2 == 1.2.0 == v1.2"""
+    parts = VERSION_PART_PATTERN.findall(name.lower())
+    if len(parts) > 1 and parts[0] == 'v' and parts[1].isdigit():
+        parts = parts[1:]
+    release_length = 0
+    while release_length < len(parts) and parts[release_length].isdigit():
+        release_length += 1
+    while release_length > 1 and int(parts[release_length - 1]) == 0:
+        release_length -= 1
+        del parts[release_length]
+    key = []
+    for part in parts:
+        if part.isdigit():
+            key.append((NUMBER, int(part), ''))
+        elif part in PRE_RELEASE_TAGS:
+            key.append((PRE_RELEASE, PRE_RELEASE_TAGS[part], part))
+        else:
+            key.append((WORD, 0, part))
+    key.append((END, 0, ''))
+    return tuple(key)
+
+
+def get_minimal_moves(names, target_names):
+    """:returns: (name, after) moves that turn the order of names into the order of target_names, after is None for
+    the first position. the names of a longest subsequence that is already in the target order stay in place, and the
+    moves are in target order, so each one moves a name right after where its predecessor already is"""
+    ranks = {name: rank for rank, name in enumerate(target_names)}
+    # a longest increasing subsequence of the target ranks, by patience sorting
+    tails, tail_indexes, previous = [], [], [None] * len(names)
+    for index, name in enumerate(names):
+        rank = ranks[name]
+        position = bisect_left(tails, rank)
+        if position:
+            previous[index] = tail_indexes[position - 1]
+        if position == len(tails):
+            tails.append(rank)
+            tail_indexes.append(index)
+        else:
+            tails[position] = rank
+            tail_indexes[position] = index
+    staying = set()
+    index = tail_indexes[-1] if tail_indexes else None
+    while index is not None:
+        staying.add(names[index])
+        index = previous[index]
+    return [(name, target_names[rank - 1] if rank else None) for rank, name in enumerate(target_names)
+            if name not in staying]
+
+
+class VersionIndex(object):
+    """the versions of a project in their order in the project, looked up by name and searched in version order.
+    the index is updated in place as versions are added, moved, updated and removed"""
+
+    def __init__(self, versions):
+        super(VersionIndex, self).__init__()
+        self._versions = list(versions)
+        self._versions_by_name = {version.name: version for version in self._versions}
+        self._update_positions()
+        items = sorted(((version_key(version.name), version) for version in self._versions), key=lambda item: item[0])
+        self._sorted_keys = [key for key, version in items]
+        self._sorted_versions = [version for key, version in items]
+
+    def _update_positions(self):
+        self._positions = {version.name: position for position, version in enumerate(self._versions)}
+
+    def _insert_sorted(self, version):
+        key = version_key(version.name)
+        position = bisect_right(self._sorted_keys, key)
+        self._sorted_keys.insert(position, key)
+        self._sorted_versions.insert(position, version)
+
+    def _remove_sorted(self, version, name):
+        key = version_key(name)
+        start, stop = bisect_left(self._sorted_keys, key), bisect_right(self._sorted_keys, key)
+        [position] = [index for index in range(start, stop) if self._sorted_versions[index] is version]
+        del self._sorted_keys[position]
+        del self._sorted_versions[position]
+
+    def __contains__(self, name):
+        return name in self._versions_by_name
+
+    def __iter__(self):
+        return iter(self._versions)
+
+    def __len__(self):
+        return len(self._versions)
+
+    def get(self, name):
+        try:
+            return self._versions_by_name[name]
+        except KeyError:
+            raise VersionNotFound("no such version: {}".format(name))
+
+    def get_position(self, name):
+        """:returns: the position of the version in the project, from 0"""
+        self.get(name)
+        return self._positions[name]
+
+    def get_previous(self, name):
+        """:returns: the version before it in the project, or None for the first one"""
+        position = self.get_position(name)
+        return self._versions[position - 1] if position else None
+
+    def get_preceding_version(self, name):
+        """:returns: the greatest version that is not greater than the name (which need not exist), or the least
+        version if all of them are greater, or None if there are no versions"""
+        if not self._sorted_versions:
+            return None
+        position = bisect_right(self._sorted_keys, version_key(name))
+        return self._sorted_versions[max(position - 1, 0)]
+
+    def add(self, version):
+        """adds a version at the end of the project, where JIRA creates versions"""
+        self._versions.append(version)
+        self._versions_by_name[version.name] = version
+        self._positions[version.name] = len(self._versions) - 1
+        self._insert_sorted(version)
+
+    def remove(self, name):
+        version = self.get(name)
+        del self._versions[self._positions[name]]
+        del self._versions_by_name[name]
+        self._update_positions()
+        self._remove_sorted(version, name)
+
+    def move(self, name, after=None):
+        """moves a version after another one, or to the first position"""
+        version = self.get(name)
+        position = self._positions[name]
+        target = -1 if after is None else self.get_position(after)
+        del self._versions[position]
+        self._versions.insert(target + 1 if target < position else target, version)
+        self._update_positions()
+
+    def rename(self, name, new_name):
+        version = self.get(name)
+        self._remove_sorted(version, name)
+        del self._versions_by_name[name]
+        self._positions[new_name] = self._positions.pop(name)
+        version.name = new_name
+        self._versions_by_name[new_name] = version
+        self._insert_sorted(version)
+
+    def update(self, version, fields):
+        """sets fields of a version of the index, a new name renames it"""
+        name = version.name
+        for field, value in fields.items():
+            if field != 'name':
+                setattr(version, field, value)
+        if fields.get('name', name) != name:
+            self.rename(name, fields['name'])
@@ -0,0 +1,101 @@
+from infi import unittest
+from infi.jira_cli.async_client import AsyncClient, run
+from mock import patch
+from threading import Lock
+import asyncio
+
+
+class Response(object):
+    def __init__(self, status_code, body=None, headers=None):
+        self.status_code = status_code
+        self.headers = headers or dict()
+        self.content = b'{}' if body is not None else b''
+        self._body = body
+
+    def json(self):
+        if self._body is None:
+            raise ValueError()
+        return self._body
+
+
+class FakeSession(object):
+    """answers with the queued responses of every url, the last one repeats"""
+
+    def __init__(self, responses=None, delay=0):
+        self.responses = responses or dict()
+        self.requests = []
+        self.in_flight = self.max_in_flight = 0
+        self._delay = delay
+        self._lock = Lock()
+
+    def request(self, method, url, **kwargs):
+        from time import sleep
+        with self._lock:
+            self.requests.append((method, url))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        sleep(self._delay)
+        with self._lock:
+            self.in_flight -= 1
+            queue = self.responses.get(url, [Response(200, dict(url=url))])
+            return queue.pop(0) if len(queue) > 1 else queue[0]
+
+
+class AsyncClientTestCase(unittest.TestCase):
+    def setUp(self):
+        patcher = patch("infi.jira_cli.async_client.RETRY_BACKOFF", new=0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _run(self, session, coroutine_function, concurrency=4):
+        with AsyncClient(session, "https://jira.example.com", concurrency) as client:
+            return run(coroutine_function(client))
+
+    def test_concurrency_limit(self):
+        session = FakeSession(delay=0.01)
+
+        async def fetch(client):
+            return await asyncio.gather(*[client.get_json("/rest/api/2/issue/PROJ-{}".format(index))
+                                          for index in range(20)])
+        results = self._run(session, fetch)
+        self.assertEqual([result['url'] for result in results],
+                         ["https://jira.example.com/rest/api/2/issue/PROJ-{}".format(index) for index in range(20)])
+        self.assertLessEqual(session.max_in_flight, 4)
+        self.assertGreater(session.max_in_flight, 1)
+
+    def test_retries(self):
+        url = "https://jira.example.com/rest/api/2/project/PROJ"
+        session = FakeSession({url: [Response(503), Response(429, headers={'Retry-After': '0'}), Response(200, dict())]})
+        self.assertEqual(self._run(session, lambda client: client.get_json("/rest/api/2/project/PROJ")), dict())
+        self.assertEqual(len(session.requests), 3)
+
+    def test_post_is_retried_only_when_rejected(self):
+        from jira import JIRAError
+        url = "https://jira.example.com/rest/api/2/issue/PROJ-1/comment"
+        session = FakeSession({url: [Response(429), Response(503, dict(errorMessages=["unavailable"]))]})
+        with self.assertRaises(JIRAError) as context:
+            self._run(session, lambda client: client.post_json("/rest/api/2/issue/PROJ-1/comment", dict(body="x")))
+        self.assertEqual(context.exception.text, "unavailable")
+        self.assertEqual(len(session.requests), 2)
+
+    def test_retries_are_exhausted(self):
+        from jira import JIRAError
+        url = "https://jira.example.com/rest/api/2/project/PROJ"
+        session = FakeSession({url: [Response(502)]})
+        with self.assertRaises(JIRAError):
+            self._run(session, lambda client: client.get_json("/rest/api/2/project/PROJ"))
+        self.assertEqual(len(session.requests), 4)
+
+    def test_iter_completed(self):
+        from infi.jira_cli.async_client import iter_completed
+        from jira import JIRAError
+        session = FakeSession({"https://jira.example.com/rest/api/2/project/B/versions": [Response(404)]})
+
+        async def get_versions(client, key):
+            return await client.get_json("/rest/api/2/project/{}/versions".format(key))
+
+        with AsyncClient(session, "https://jira.example.com", 4) as client:
+            results = dict(iter_completed(get_versions, ["A", "B", "C"], client=client))
+        self.assertEqual(results["A"], dict(url="https://jira.example.com/rest/api/2/project/A/versions"))
+        self.assertIsInstance(results["B"], JIRAError)
+        self.assertEqual(sorted(results), ["A", "B", "C"])
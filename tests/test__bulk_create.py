@@ -0,0 +1,96 @@
+from infi import unittest
+from infi.jira_cli import jira_adapter
+from infi.jira_cli.bulk_create import read_rows, parse_row, encode_rows
+from mock import patch, Mock
+
+
+class BulkCreateTestCase(unittest.TestCase):
+    def _write(self, name, content):
+        from tempfile import mkdtemp
+        from os import path
+        filepath = path.join(mkdtemp(), name)
+        with open(filepath, 'w') as fd:
+            fd.write(content)
+        return filepath
+
+    def test_read_csv(self):
+        filepath = self._write("issues.csv", "issue_type,summary,Team\nBug,first,\nTask,second,Core\n")
+        rows = [parse_row(row) for row, error in read_rows(filepath)]
+        self.assertEqual([row.summary for row in rows], ["first", "second"])
+        self.assertEqual([row.additional_fields for row in rows], [dict(), dict(Team="Core")])
+
+    def test_read_json_lines(self):
+        filepath = self._write("issues.jsonl", '{"issue_type": "Bug", "summary": "first", "Labels": ["a"]}\n\n')
+        [row] = [parse_row(row) for row, error in read_rows(filepath)]
+        self.assertEqual(row.additional_fields, dict(Labels=["a"]))
+
+    def test_errors_are_reported_per_row(self):
+        from jira import JIRAError
+        filepath = self._write("issues.jsonl", '{"issue_type": "Bug", "summary": "first"}\n{"issue_type": \n'
+                                               '["not", "an", "object"]\n{"issue_type": "Nope", "summary": "x"}\n'
+                                               '{"summary": "no type"}\n{"issue_type": "Task", "summary": "last"}\n')
+
+        def encode_issue_fields(project_key, issue_type, *args, **kwargs):
+            if issue_type == "Nope":
+                raise JIRAError(status_code=400, text="no such issue type")
+            return dict(summary=args[2])
+
+        with patch.object(jira_adapter, "encode_issue_fields", new=encode_issue_fields):
+            results = encode_rows("PROJ", read_rows(filepath))
+        self.assertEqual([fields for fields, error in results],
+                         [dict(summary="first"), None, None, None, None, dict(summary="last")])
+        errors = [error for fields, error in results]
+        self.assertTrue(errors[1].startswith("invalid JSON"))
+        self.assertEqual(errors[2:5], ["not a JSON object", "no such issue type", "missing issue_type"])
+
+    def test_missing_columns(self):
+        with self.assertRaises(ValueError):
+            parse_row(dict(summary="no type"))
+
+    def _response(self, status_code, body):
+        return Mock(status_code=status_code, json=Mock(return_value=body))
+
+    def test_create_issues_keeps_row_order(self):
+        session = Mock()
+        session.post.side_effect = [
+            self._response(201, dict(issues=[dict(key="PROJ-1"), dict(key="PROJ-2")],
+                                     errors=[dict(failedElementNumber=1, status=400,
+                                                  elementErrors=dict(errorMessages=[], errors=dict(summary="too long")))])),
+            self._response(400, dict(errorMessages=["no permission"]))]
+        jira = Mock(_options=dict(server="https://jira.example.com"))
+        with patch.object(jira_adapter, "get_jira_session", return_value=session), \
+             patch.object(jira_adapter, "get_jira", return_value=jira):
+            results = jira_adapter.create_issues([dict(summary=str(index)) for index in range(4)], chunk_size=3)
+        self.assertEqual([result.key for result in results], ["PROJ-1", None, "PROJ-2", None])
+        self.assertEqual([result.error for result in results], [None, "summary: too long", None, "no permission"])
+        self.assertEqual(session.post.call_count, 2)
+
+    def test_failed_chunks_do_not_abort_the_batch(self):
+        from requests import ConnectionError
+        unavailable = self._response(503, None)
+        unavailable.json.side_effect = ValueError()
+        session = Mock()
+        session.post.side_effect = [self._response(201, dict(issues=[dict(key="PROJ-1"), dict(key="PROJ-2")])),
+                                    unavailable, ConnectionError("connection reset"),
+                                    self._response(201, dict(issues=[dict(key="PROJ-3")]))]
+        jira = Mock(_options=dict(server="https://jira.example.com"))
+        with patch.object(jira_adapter, "get_jira_session", return_value=session), \
+             patch.object(jira_adapter, "get_jira", return_value=jira):
+            results = jira_adapter.create_issues([dict(summary=str(index)) for index in range(7)], chunk_size=2)
+        self.assertEqual([result.key for result in results], ["PROJ-1", "PROJ-2", None, None, None, None, "PROJ-3"])
+        self.assertEqual([result.error for result in results[2:6]],
+                         ["status 503", "status 503", "connection reset", "connection reset"])
+
+    def test_assign_to_me(self):
+        from infi.jira_cli.actions import create_bulk
+        filepath = self._write("issues.jsonl", '{"issue_type": "Bug", "summary": "first"}\n')
+        encode_issue_fields = Mock(return_value=dict(summary="first"))
+        config = Mock(jira_fqdn="jira.example.com", spec=["jira_fqdn"])
+        with patch("infi.jira_cli.config.Configuration.from_file", return_value=config), \
+             patch.object(jira_adapter, "get_auth", return_value=Mock(username="me")) as get_auth, \
+             patch.object(jira_adapter, "encode_issue_fields", new=encode_issue_fields), \
+             patch.object(jira_adapter, "create_issues", return_value=[Mock(key="PROJ-1", error=None)]):
+            create_bulk({"<project>": "proj", "<file>": filepath, "--fix-version": "1.0", "--assign-to-me": True,
+                         "--chunk-size": "50"})
+        get_auth.assert_called_once_with("jira.example.com")
+        self.assertEqual(encode_issue_fields.call_args[1]['assignee'], "me")
@@ -0,0 +1,71 @@
+from infi import unittest
+from infi.jira_cli.changelog_store import ChangelogStore, update_changelog, SEARCH_PLAN, AUTO_PLAN
+from infi.jira_cli.local_store import connect
+from mock import patch, Mock
+
+
+def make_histories(*histories):
+    return [dict(id=str(index), created=created, items=[dict(field='status', fromString=from_string, toString=to_string)])
+            for index, (created, from_string, to_string) in enumerate(histories)]
+
+
+def make_issue(key, updated, *histories):
+    return dict(key=key, fields=dict(updated=updated), changelog=dict(histories=make_histories(*histories)))
+
+
+class ChangelogStoreTestCase(unittest.TestCase):
+    def setUp(self):
+        self.store = ChangelogStore(connect(":memory:"))
+        self.queries = []
+        self.histories = dict()
+        patchers = [patch("infi.jira_cli.jira_adapter.get_issue_histories", new=lambda key: self.histories[key]),
+                    patch("infi.jira_cli.concurrency.get_jira_request_limit", return_value=None)]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _update(self, *pages, **kwargs):
+        def search_issues(query, **kwargs):
+            self.queries.append((query, kwargs.get('expand')))
+            return Mock(total=sum(len(page) for page in pages),
+                        iter_pages=Mock(return_value=iter([[Mock(raw=issue) for issue in page] for page in pages])))
+        kwargs.setdefault('plan', SEARCH_PLAN)
+        with patch("infi.jira_cli.jira_adapter.search_issues", new=search_issues):
+            return update_changelog("PROJ", store=self.store, workers=2, **kwargs)
+
+    def _get_changes(self):
+        return [tuple(row) for row in self.store.iter_changes("PROJ", "status")]
+
+    def test_incremental_update(self):
+        self._update([make_issue("PROJ-1", "2020-01-05T10:00:00.000+0200", ("2020-01-05T10:00:00.000+0200", "Open", "Closed"))],
+                     [make_issue("PROJ-2", "2020-01-03T10:00:00.000+0000", ("2020-01-03T09:00:00.000+0000", "Open", "In Progress"))])
+        self.assertEqual(self.store.get_watermark("PROJ"), "2020-01-05T10:00:00.000+0200")
+        self._update([make_issue("PROJ-2", "2020-01-06T10:00:00.000+0000", ("2020-01-03T09:00:00.000+0000", "Open", "In Progress"),
+                                 ("2020-01-06T10:00:00.000+0000", "In Progress", "Closed"))])
+        self.assertEqual(self.queries, [('project = PROJ', 'changelog'),
+                                        ('project = PROJ AND updated >= "2020/01/04 10:00"', 'changelog')])
+        self.assertEqual(self._get_changes(),
+                         [("PROJ-2", "2020-01-03T09:00:00.000+0000", "Open", "In Progress"),
+                          ("PROJ-1", "2020-01-05T10:00:00.000+0200", "Open", "Closed"),
+                          ("PROJ-2", "2020-01-06T10:00:00.000+0000", "In Progress", "Closed")])
+
+    def test_full_update(self):
+        self._update([make_issue("PROJ-1", "2020-01-05T10:00:00.000+0200", ("2020-01-05T10:00:00.000+0200", "Open", "Closed"))])
+        self._update([], full=True)
+        self.assertEqual(self.queries[-1], ('project = PROJ', 'changelog'))
+        self.assertEqual(self._get_changes(), [])
+        self.assertEqual(self.store.get_watermark("PROJ"), None)
+
+    def test_truncated_changelogs_are_completed(self):
+        histories = [("2020-01-0{}T10:00:00.000+0000".format(day), "Open", "Closed") for day in range(1, 4)]
+        issue = make_issue("PROJ-1", "2020-01-05T10:00:00.000+0000", *histories[-1:])
+        issue['changelog'].update(total=3, maxResults=1)
+        self.histories["PROJ-1"] = make_histories(*histories)
+        self._update([issue, make_issue("PROJ-2", "2020-01-05T10:00:00.000+0000")])
+        self.assertEqual(len(self._get_changes()), 3)
+
+    def test_two_phase_plan_skips_the_changelog_expansion(self):
+        self.histories["PROJ-1"] = make_histories(("2020-01-01T10:00:00.000+0000", "Open", "Closed"))
+        self._update([dict(key="PROJ-1", fields=dict(updated="2020-01-05T10:00:00.000+0000"))], plan=AUTO_PLAN)
+        self.assertEqual(self.queries, [('project = PROJ', None)])
+        self.assertEqual(len(self._get_changes()), 1)
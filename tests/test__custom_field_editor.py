@@ -0,0 +1,32 @@
+from infi import unittest
+# jira_adapter imports custom_field_editor at module level, so it has to be imported first
+from infi.jira_cli import jira_adapter, custom_field_editor
+from mock import patch, Mock
+
+
+def make_options(*values):
+    return [dict(id=str(index), optionvalue=value) for index, value in enumerate(values)]
+
+
+class CustomFieldEditorTestCase(unittest.TestCase):
+    def setUp(self):
+        self.session = Mock()
+        patchers = [patch.object(custom_field_editor, "get_jira_session", return_value=self.session),
+                    patch.object(custom_field_editor, "get_jira_url", side_effect=lambda uri: uri),
+                    patch("infi.jira_cli.async_client.map_concurrently", return_value=[])]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _update(self, *stored_options):
+        with patch.object(custom_field_editor, "get_options_for_custom_field", side_effect=stored_options):
+            custom_field_editor.update_custom_dropdown_field("customfield_10001", ["c", "d"])
+
+    def test_sorts_the_options_as_stored(self):
+        # the new options were added concurrently and landed out of order
+        self._update(make_options("a", "b"), make_options("a", "b", "d", "c"))
+        self.assertEqual(self.session.post.call_count, 4)
+
+    def test_sorted_options_are_not_moved(self):
+        self._update(make_options("a", "b"), make_options("a", "b", "c", "d"))
+        self.assertEqual(self.session.post.call_count, 0)
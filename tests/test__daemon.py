@@ -0,0 +1,46 @@
+from infi import unittest
+from mock import patch
+
+
+class DaemonTestCase(unittest.TestCase):
+    def setUp(self):
+        from tempfile import mkdtemp
+        from os import path
+        tempdir = mkdtemp()
+        self.config_path = path.join(tempdir, "config.json")
+        self._write_config("jira.example.com")
+        self.environ = dict(INFI_JIRA_CLI_CONFIG_PATH=self.config_path,
+                            INFI_JIRA_CLI_CACHE_PATH=path.join(tempdir, "cache"),
+                            INFI_JIRA_CLI_DAEMON_SOCKET_PATH=path.join(tempdir, "daemon.sock"))
+
+    def _write_config(self, jira_fqdn):
+        import json
+        with open(self.config_path, "w") as fd:
+            json.dump(dict(jira_fqdn=jira_fqdn, confluence_fqdn="confluence.example.com"), fd)
+
+    def _serve(self):
+        from infi.jira_cli import daemon
+        from threading import Thread
+        from time import sleep
+        from os import path
+        thread = Thread(target=daemon.serve, args=(10, ))
+        thread.daemon = True
+        thread.start()
+        while not path.exists(daemon.get_socket_path()):
+            sleep(0.01)
+        return thread
+
+    def test_configuration_key(self):
+        from infi.jira_cli import daemon
+        with patch.dict("os.environ", self.environ):
+            thread = self._serve()
+            try:
+                with patch.object(daemon, "_run", return_value=0) as run:
+                    self.assertEqual(daemon.forward("jissue", ["show", "HOSTDEV-1"], self.environ), 0)
+                    self.assertEqual(run.call_count, 1)
+                    self._write_config("other.example.com")
+                    self.assertIsNone(daemon.forward("jissue", ["show", "HOSTDEV-1"], self.environ))
+                    self.assertEqual(run.call_count, 1)
+            finally:
+                daemon.stop()
+                thread.join()
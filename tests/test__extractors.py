@@ -0,0 +1,26 @@
+from infi import unittest
+from infi.jira_cli.extractors import compile_extractor, get_column_fields
+from munch import Munch
+from mock import Mock
+from datetime import datetime, timezone
+
+
+def make_issue(**fields):
+    return Mock(key="PROJ-1", fields=Mock(return_value=Munch(fields)))
+
+
+class ExtractorTestCase(unittest.TestCase):
+    def test_row(self):
+        issue = make_issue(customfield_10700="7", status=Munch(name="Open"), created="2020-01-02T03:04:05.000+0000",
+                           assignee=Munch(displayName="Someone"), fixVersions=[Munch(name="1.0")])
+        extract = compile_extractor(("Rank", "Key", "Status", "Created", "Assignee", "FixVersions"))
+        self.assertEqual(extract(issue), (7, "PROJ-1", "Open", datetime(2020, 1, 2, 3, 4, 5, tzinfo=timezone.utc), "Someone", ["1.0"]))
+        self.assertEqual(issue.fields.call_count, 1)
+
+    def test_missing_values(self):
+        extract = compile_extractor(("Rank", "Type", "Resolution", "Assignee", "Labels", "Components", "Updated"))
+        self.assertEqual(extract(make_issue(assignee=None, resolution=None)),
+                         (None, None, "Unresolved", "Unassigned", [], [], None))
+
+    def test_column_fields(self):
+        self.assertEqual(get_column_fields(("Key", "Summary", "Comments")), ("summary", "comment"))
@@ -0,0 +1,49 @@
+from infi import unittest
+from infi.pyutils.lazy import clear_cache
+from infi.jira_cli import jira_adapter
+from infi.jira_cli.field_registry import FieldRegistry
+from infi.jira_cli.metadata_cache import MetadataCache
+from mock import patch, Mock
+
+CUSTOM_TYPE = "com.atlassian.jira.plugin.system.customfieldtypes:{}"
+FIELDS = [dict(id="customfield_1", name="Team", custom=True, schema=dict(custom=CUSTOM_TYPE.format("radiobuttons"))),
+          dict(id="customfield_2", name="Platform", custom=True, schema=dict(custom=CUSTOM_TYPE.format("multicheckboxes"))),
+          dict(id="customfield_3", name="Severity", custom=True, schema=dict(custom=CUSTOM_TYPE.format("select")))]
+
+
+def make_createmeta(*options):
+    allowed_values = [dict(id=str(index), value=value, self="...") for index, value in enumerate(options, 10)]
+    fields = dict(customfield_1=dict(allowedValues=allowed_values), customfield_2=dict(allowedValues=allowed_values))
+    return dict(projects=[dict(issuetypes=[dict(fields=fields)])])
+
+
+class FieldEncoderTestCase(unittest.TestCase):
+    def setUp(self):
+        from tempfile import mkdtemp
+        from os import path
+        self.cache = MetadataCache(path.join(mkdtemp(), "jira.example.com.json"))
+        self.jira = Mock()
+        self.jira.createmeta.return_value = make_createmeta("Core", "UI")
+        patchers = [patch("infi.jira_cli.jira_adapter.get_jira", return_value=self.jira),
+                    patch("infi.jira_cli.jira_adapter.get_field_registry", return_value=FieldRegistry(FIELDS)),
+                    patch("infi.jira_cli.metadata_cache.get_metadata_cache", return_value=self.cache)]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        for func in (jira_adapter._get_option_ids, jira_adapter.get_field_encoder):
+            clear_cache(func)
+
+    def test_createmeta_is_fetched_once(self):
+        fields = jira_adapter.encode_additional_fields([("Team", "Core"), ("Platform", ["Core", "UI"]), ("Severity", "High")],
+                                                       "PROJ", "Bug")
+        self.assertEqual(fields, dict(customfield_1=dict(id="10"), customfield_2=[dict(id="10"), dict(id="11")],
+                                      customfield_3=dict(value="High")))
+        self.assertEqual(self.jira.createmeta.call_count, 1)
+
+    def test_new_option_refreshes_createmeta(self):
+        jira_adapter.encode_additional_fields(dict(Team="Core"), "PROJ", "Bug")
+        self.jira.createmeta.return_value = make_createmeta("Core", "UI", "Infra")
+        self.assertEqual(jira_adapter.encode_additional_fields(dict(Team="Infra"), "PROJ", "Bug"),
+                         dict(customfield_1=dict(id="12")))
+        with self.assertRaises(ValueError):
+            jira_adapter.encode_additional_fields(dict(Team="Nope"), "PROJ", "Bug")
@@ -0,0 +1,45 @@
+from infi import unittest
+from infi.jira_cli.field_registry import FieldRegistry
+
+FIELDS = [dict(id="summary", name="Summary", custom=False, schema=dict(type="string", system="summary")),
+          dict(id="customfield_10700", name="Rank", custom=True, schema=dict(custom="com.pyxis.greenhopper.jira:gh-lexo-rank")),
+          dict(id="customfield_10001", name="Release Notes Title", custom=True,
+               schema=dict(custom="com.atlassian.jira.plugin.system.customfieldtypes:textfield")),
+          dict(id="customfield_10002", name="Severity", custom=True,
+               schema=dict(custom="com.atlassian.jira.plugin.system.customfieldtypes:select")),
+          dict(id="customfield_10003", name="severity", custom=True,
+               schema=dict(custom="com.atlassian.jira.plugin.system.customfieldtypes:radiobuttons")),
+          dict(id="issuekey", name="Key", custom=False)]
+
+
+class FieldRegistryTestCase(unittest.TestCase):
+    def setUp(self):
+        self.registry = FieldRegistry(FIELDS)
+
+    def test_custom_fields(self):
+        self.assertEqual(self.registry.custom_fields["Release Notes Title"], "customfield_10001")
+        self.assertNotIn("Summary", self.registry.custom_fields)
+        with self.assertRaises(TypeError):
+            self.registry.custom_fields["Summary"] = "summary"
+        self.assertEqual(self.registry.custom_types["Severity"],
+                         "com.atlassian.jira.plugin.system.customfieldtypes:select")
+        self.assertEqual(self.registry.custom_types["Rank"], "com.pyxis.greenhopper.jira:gh-lexo-rank")
+
+    def test_lookup_by_name(self):
+        self.assertEqual(self.registry.get_field_id("Summary"), "summary")
+        self.assertEqual(self.registry.get_field_id("summary"), "summary")
+        self.assertEqual(self.registry.get_custom_field_id("release notes title"), "customfield_10001")
+        self.assertEqual(self.registry.get_custom_field_id("severity"), "customfield_10003")
+
+    def test_ambiguous_or_missing(self):
+        with self.assertRaises(KeyError):
+            self.registry.get_custom_field_id("SEVERITY")
+        with self.assertRaises(KeyError):
+            self.registry.get_custom_field_id("Summary")
+        with self.assertRaises(KeyError):
+            self.registry.get_field_id("no such field")
+
+    def test_lookup_by_id(self):
+        self.assertEqual(self.registry.get_name("customfield_10700"), "Rank")
+        self.assertEqual(self.registry.get_schema("issuekey"), dict())
+        self.assertIn("select", self.registry.get_custom_type("Severity"))
@@ -0,0 +1,113 @@
+from infi import unittest
+from infi.jira_cli.issue_mirror import IssueMirror, MirrorError, sync_project, iter_assigned_issues, get_mirror_age
+from infi.jira_cli.issue_mirror import iter_matching_issues
+from infi.jira_cli.jql import UnsupportedQuery
+from infi.jira_cli.local_store import connect
+from mock import patch, Mock
+
+
+def make_issue(key, updated, assignee="me", resolution=None, priority_id="3", labels=()):
+    return dict(key=key, id=key.rsplit('-', 1)[1],
+                fields=dict(project=dict(key=key.rsplit('-', 1)[0]), summary="summary of " + key,
+                            issuetype=dict(name="Bug"), status=dict(name="Open"),
+                            priority=dict(name="Major", id=priority_id),
+                            resolution=None if resolution is None else dict(name=resolution),
+                            assignee=dict(name=assignee, displayName=assignee.title()),
+                            created=updated, updated=updated, labels=list(labels)))
+
+
+class IssueMirrorTestCase(unittest.TestCase):
+    def setUp(self):
+        self.mirror = IssueMirror(connect(":memory:"))
+        self.queries = []
+        self.key_queries = []
+        patchers = [patch("infi.jira_cli.config.Configuration.from_file"),
+                    patch("infi.jira_cli.jira_adapter.get_auth", return_value=Mock(username="me"))]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _sync(self, *pages, **kwargs):
+        """keys are the keys in the project on the server, by default the mirrored ones and those of the pages"""
+        keys = kwargs.pop('keys', None)
+        if keys is None:
+            keys = self.mirror.get_keys("PROJ").union(issue['key'] for page in pages for issue in page)
+
+        def search_issues(query, fields=None, **kwargs):
+            if fields == 'key':
+                self.key_queries.append(query)
+                return Mock(iter_pages=Mock(return_value=iter([[Mock(raw=dict(key=key)) for key in sorted(keys)]])))
+            self.queries.append(query)
+            return Mock(iter_pages=Mock(return_value=iter([[Mock(raw=issue) for issue in page] for page in pages])))
+        with patch("infi.jira_cli.jira_adapter.search_issues", new=search_issues):
+            return sync_project("PROJ", mirror=self.mirror, **kwargs)
+
+    def _get_assigned_keys(self, user=None, project=None):
+        projects, issues = iter_assigned_issues(user, project, mirror=self.mirror)
+        return [issue['key'] for issue in issues]
+
+    def test_incremental_sync(self):
+        self._sync([make_issue("PROJ-1", "2020-01-05T10:00:00.000+0200", labels=["a", "b"])],
+                   [make_issue("PROJ-2", "2020-01-03T10:00:00.000+0000")])
+        self.assertEqual(self.mirror.get_watermark("PROJ"), "2020-01-05T10:00:00.000+0200")
+        self._sync([make_issue("PROJ-1", "2020-01-06T10:00:00.000+0000", labels=["c"])])
+        self.assertEqual(self.queries, ['project = PROJ', 'project = PROJ AND updated >= "2020/01/04 10:00"'])
+        self.assertEqual(self.mirror.get_issue("proj-1")['fields']['labels'], ["c"])
+        self.assertEqual(self.mirror.get_watermark("PROJ"), "2020-01-06T10:00:00.000+0000")
+        values = self.mirror._connection.execute("SELECT key, field, value FROM issue_values").fetchall()
+        self.assertEqual(values, [("PROJ-1", "labels", "c")])
+
+    def test_sync_removes_issues_no_longer_in_project(self):
+        self._sync([make_issue("PROJ-1", "2020-01-05T10:00:00.000+0000", labels=["a"]),
+                    make_issue("PROJ-2", "2020-01-05T10:00:00.000+0000", labels=["b"])])
+        self.assertEqual(self.key_queries, [])
+        self._sync([], keys=["proj-2"])
+        self.assertEqual(self.key_queries, ['project = PROJ'])
+        self.assertEqual(self.mirror.get_issue("PROJ-1"), None)
+        self.assertEqual(self.mirror.get_keys("PROJ"), set(["PROJ-2"]))
+        values = self.mirror._connection.execute("SELECT key, field, value FROM issue_values").fetchall()
+        self.assertEqual(values, [("PROJ-2", "labels", "b")])
+
+    def test_full_sync(self):
+        self._sync([make_issue("PROJ-1", "2020-01-05T10:00:00.000+0200")])
+        self._sync([make_issue("PROJ-2", "2020-01-03T10:00:00.000+0000")], full=True)
+        self.assertEqual(self.queries[-1], 'project = PROJ')
+        self.assertEqual(self.mirror.get_issue("PROJ-1"), None)
+        self.assertEqual(self.mirror.get_projects(), ["PROJ"])
+
+    def test_assigned_issues(self):
+        self._sync([make_issue("PROJ-1", "2020-01-05T10:00:00.000+0000", priority_id="4"),
+                    make_issue("PROJ-2", "2020-01-04T10:00:00.000+0000", priority_id="4"),
+                    make_issue("PROJ-3", "2020-01-03T10:00:00.000+0000", priority_id="2"),
+                    make_issue("PROJ-4", "2020-01-02T10:00:00.000+0000", resolution="Fixed"),
+                    make_issue("PROJ-5", "2020-01-01T10:00:00.000+0000", assignee="other")])
+        self.assertEqual(self._get_assigned_keys(), ["PROJ-3", "PROJ-2", "PROJ-1"])
+        self.assertEqual(self._get_assigned_keys("other", "proj"), ["PROJ-5"])
+        with self.assertRaises(UnsupportedQuery):
+            self._get_assigned_keys(project="OTHER")
+
+    def test_matching_issues(self):
+        self._sync([make_issue("PROJ-1", "2020-01-05T10:00:00.000+0000")])
+        projects, issues = iter_matching_issues('project = "proj"', mirror=self.mirror)
+        self.assertEqual((projects, [issue['key'] for issue in issues]), (["PROJ"], ["PROJ-1"]))
+        projects, issues = iter_matching_issues('status = open', mirror=self.mirror)
+        self.assertEqual((projects, [issue['key'] for issue in issues]), (["PROJ"], ["PROJ-1"]))
+        with self.assertRaises(UnsupportedQuery):
+            iter_matching_issues("status was Open", mirror=self.mirror)
+
+    def test_unsynced_projects_are_unsupported(self):
+        with self.assertRaises(UnsupportedQuery):
+            iter_matching_issues('status = open', mirror=self.mirror)
+        self._sync([make_issue("PROJ-1", "2020-01-05T10:00:00.000+0000")])
+        with self.assertRaises(UnsupportedQuery):
+            iter_matching_issues('project in (PROJ, OTHER)', mirror=self.mirror)
+
+    def test_mirror_age(self):
+        with self.assertRaises(MirrorError):
+            get_mirror_age(["PROJ"], mirror=self.mirror)
+        with self.assertRaises(MirrorError):
+            get_mirror_age([], mirror=self.mirror)
+        with patch("time.time", return_value=1000):
+            self._sync([])
+        with patch("time.time", return_value=1000 + 2 * 60 * 60 + 5):
+            self.assertEqual(get_mirror_age(["PROJ"], mirror=self.mirror), "offline: PROJ was synced 2 hours ago")
@@ -0,0 +1,64 @@
+from infi import unittest
+from infi.jira_cli.issue_search import IssueSearch
+
+
+class Page(list):
+    def __init__(self, items, total):
+        super(Page, self).__init__(items)
+        self.total = total
+
+
+class FakeJIRA(object):
+    def __init__(self, total):
+        self.issues = ["ISSUE-{}".format(index) for index in range(total)]
+        self.requests = []
+
+    def search_issues(self, query, startAt, maxResults, **kwargs):
+        self.requests.append((startAt, kwargs))
+        return Page(self.issues[startAt:startAt + maxResults], len(self.issues))
+
+
+class IssueSearchTestCase(unittest.TestCase):
+    def test_pages(self):
+        jira = FakeJIRA(25)
+        search = IssueSearch(jira, "project=HOSTDEV", page_size=10)
+        self.assertEqual(list(search), jira.issues)
+        self.assertEqual([start_at for start_at, kwargs in jira.requests], [0, 10, 20])
+
+    def test_total_reuses_first_page(self):
+        jira = FakeJIRA(25)
+        search = IssueSearch(jira, "project=HOSTDEV", page_size=10)
+        self.assertEqual(search.total, 25)
+        self.assertEqual(len(list(search)), 25)
+        self.assertEqual(len(jira.requests), 3)
+
+    def test_stop_early(self):
+        jira = FakeJIRA(25)
+        for issue in IssueSearch(jira, "project=HOSTDEV", page_size=10):
+            break
+        self.assertEqual(len(jira.requests), 1)
+
+    def test_empty(self):
+        jira = FakeJIRA(0)
+        self.assertEqual(list(IssueSearch(jira, "project=HOSTDEV")), [])
+        self.assertEqual(len(jira.requests), 1)
+
+
+class ConcurrentIssueSearchTestCase(unittest.TestCase):
+    def test_in_order(self):
+        jira = FakeJIRA(95)
+        search = IssueSearch(jira, "project=HOSTDEV", page_size=10, workers=4)
+        self.assertEqual(list(search), jira.issues)
+        self.assertEqual(sorted(start_at for start_at, kwargs in jira.requests), list(range(0, 95, 10)))
+
+    def test_server_page_limit(self):
+        jira = FakeJIRA(95)
+        original_search_issues = jira.search_issues
+        jira.search_issues = lambda query, startAt, maxResults, **kwargs: original_search_issues(query, startAt, 7, **kwargs)
+        self.assertEqual(list(IssueSearch(jira, "project=HOSTDEV", page_size=10, workers=4)), jira.issues)
+
+    def test_request_limit(self):
+        from threading import BoundedSemaphore
+        jira = FakeJIRA(95)
+        search = IssueSearch(jira, "project=HOSTDEV", page_size=10, workers=4, request_limit=BoundedSemaphore(2))
+        self.assertEqual(list(search), jira.issues)
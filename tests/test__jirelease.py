@@ -0,0 +1,160 @@
+from infi import unittest
+from infi.jira_cli.jirelease import select_projects, is_released_between, release_train
+from infi.jira_cli.jirelease import plan_version_updates, set_archive, set_matching_names
+from infi.jira_cli.jirelease import get_target_order, reorder_releases
+from infi.jira_cli.version_index import VersionIndex
+from munch import Munch
+from mock import patch
+from datetime import date
+
+
+def _project(key, category=None):
+    raw = dict(key=key) if category is None else dict(key=key, projectCategory=dict(name=category))
+    return Munch(key=key, name=key.title(), raw=raw)
+
+
+class SummaryTestCase(unittest.TestCase):
+    def setUp(self):
+        self.projects = [_project("CORE", "Storage"), _project("UI", "Frontend"), _project("TOOLS")]
+
+    def test_select_all_projects(self):
+        self.assertEqual(select_projects(self.projects), self.projects)
+
+    def test_select_projects_by_key(self):
+        self.assertEqual([project.key for project in select_projects(self.projects, "ui, core")], ["UI", "CORE"])
+
+    def test_select_unknown_project(self):
+        with self.assertRaises(AssertionError):
+            select_projects(self.projects, "CORE,NOPE")
+
+    def test_select_projects_by_category(self):
+        self.assertEqual([project.key for project in select_projects(self.projects, category="storage")], ["CORE"])
+        self.assertEqual(select_projects(self.projects, "UI", category="Storage"), [])
+
+    def test_is_released_between(self):
+        since, today = date(2020, 3, 1), date(2020, 3, 10)
+        self.assertTrue(is_released_between(Munch(archived=False, releaseDate="2020-03-01"), since, today))
+        self.assertTrue(is_released_between(Munch(archived=False, releaseDate="2020-03-10"), since, today))
+        self.assertFalse(is_released_between(Munch(archived=False, releaseDate="2020-03-11"), since, today))
+        self.assertFalse(is_released_between(Munch(archived=False, releaseDate="2020-02-29"), since, today))
+        self.assertFalse(is_released_between(Munch(archived=True, releaseDate="2020-03-05"), since, today))
+        self.assertFalse(is_released_between(Munch(archived=False), since, today))
+
+
+def _version(name, id, released=False, releaseDate=None):
+    version = Munch(name=name, id=id, released=released, archived=False)
+    if releaseDate:
+        version.releaseDate = releaseDate
+    return version
+
+
+class ReleaseTrainTestCase(unittest.TestCase):
+    def setUp(self):
+        self.projects = dict(CORE=Munch(key="CORE", versions=[_version("1.0", 1), _version("2.0", 2)]),
+                             UI=Munch(key="UI", versions=[_version("2.0", 3, releaseDate="2020-03-01")]),
+                             CLI=Munch(key="CLI", versions=[_version("2.0", 4, released=True)]),
+                             DOCS=Munch(key="DOCS", versions=[_version("1.0", 5)]))
+        self.counts = dict()
+        self.updates = []
+        for name in ("get_project_versions", "get_unresolved_issue_counts", "update_versions"):
+            patcher = patch("infi.jira_cli.jira_adapter.{}".format(name), new=getattr(self, "_" + name))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _get_project_versions(self, keys):
+        return [self.projects[key].versions for key in keys]
+
+    def _get_unresolved_issue_counts(self, versions):
+        return [self.counts.get(version.id, 0) for version in versions]
+
+    def _update_versions(self, updates):
+        self.updates.extend(updates)
+        return [Munch(version=version, error=None) for version, fields in updates]
+
+    def test_release(self):
+        self.assertEqual(release_train("2.0", "core,ui,cli"), 0)
+        self.assertEqual([(version.id, sorted(fields)) for version, fields in self.updates],
+                         [(2, ["releaseDate", "released"]), (3, ["released"])])
+
+    def test_refused_when_a_project_has_unresolved_issues(self):
+        self.counts[3] = 2
+        with self.assertRaises(AssertionError):
+            release_train("2.0", "CORE,UI")
+        self.assertEqual(self.updates, [])
+
+    def test_refused_when_a_project_has_no_such_version(self):
+        with self.assertRaises(AssertionError):
+            release_train("2.0", "CORE,DOCS")
+        self.assertEqual(self.updates, [])
+
+
+class VersionUpdatesTestCase(unittest.TestCase):
+    def setUp(self):
+        self.versions = [Munch(name="1.0", id=1, archived=True), Munch(name="1.1", id=2, archived=False),
+                         Munch(name="2.0", id=3, archived=False, description="next")]
+        self.updates = []
+        index = VersionIndex(self.versions)
+        patchers = [patch("infi.jira_cli.jira_adapter.get_version_index", new=lambda key: index),
+                    patch("infi.jira_cli.jira_adapter.update_versions", new=self._update_versions)]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _update_versions(self, updates):
+        self.updates.extend(updates)
+        return [Munch(version=version, error="name taken" if version.id == 2 else None) for version, fields in updates]
+
+    def test_no_op_updates_are_skipped(self):
+        updates = plan_version_updates(self.versions, r"1\.", lambda version: dict(archived=True))
+        self.assertEqual([(version.id, fields) for version, fields in updates], [(2, dict(archived=True))])
+        updates = plan_version_updates(self.versions, r".*", lambda version: dict(description="next"))
+        self.assertEqual([version.id for version, fields in updates], [1, 2])
+
+    def test_dry_run(self):
+        self.assertEqual(set_archive("PROJ", r".*", True, dry_run=True), 0)
+        self.assertEqual(self.updates, [])
+
+    def test_archive(self):
+        self.assertEqual(set_archive("PROJ", r"2\.", True), 0)
+        self.assertEqual([(version.id, fields) for version, fields in self.updates], [(3, dict(archived=True))])
+
+    def test_rename_reports_failures(self):
+        self.assertEqual(set_matching_names("PROJ", r"1\.", "v1.", dry_run=False), 1)
+        self.assertEqual([fields for version, fields in self.updates], [dict(name="v1.0"), dict(name="v1.1")])
+
+
+class ReorderTestCase(unittest.TestCase):
+    def setUp(self):
+        self.versions = [Munch(name="1.10", releaseDate="2020-03-01"), Munch(name="1.9"),
+                         Munch(name="1.2", releaseDate="2020-01-01"), Munch(name="2.0", releaseDate="2020-02-01")]
+        self.index = VersionIndex(self.versions)
+        self.moves = []
+        patchers = [patch("infi.jira_cli.jira_adapter.get_version_index", new=lambda key: self.index),
+                    patch("infi.jira_cli.jirelease._move_version", new=self._move_version)]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _move_version(self, index, version, target_version):
+        self.moves.append((version.name, None if target_version is None else target_version.name))
+        index.move(version.name, None if target_version is None else target_version.name)
+
+    def _names(self, versions):
+        return [version.name for version in versions]
+
+    def test_target_order(self):
+        self.assertEqual(self._names(get_target_order(self.versions, "semver")), ["1.2", "1.9", "1.10", "2.0"])
+        self.assertEqual(self._names(get_target_order(self.versions, "date")), ["1.2", "2.0", "1.10", "1.9"])
+        self.assertEqual(self._names(get_target_order(self.versions, "file", ["2.0", "1.9"])),
+                         ["2.0", "1.9", "1.10", "1.2"])
+        with self.assertRaises(AssertionError):
+            get_target_order(self.versions, "file", ["3.0"])
+
+    def test_dry_run(self):
+        reorder_releases("PROJ", "semver", dry_run=True)
+        self.assertEqual(self.moves, [])
+
+    def test_reorder(self):
+        reorder_releases("PROJ", "semver")
+        self.assertEqual(self.moves, [("1.9", "1.2"), ("1.10", "1.9")])
+        self.assertEqual(self._names(self.index), ["1.2", "1.9", "1.10", "2.0"])
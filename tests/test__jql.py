@@ -0,0 +1,76 @@
+from infi import unittest
+from infi.jira_cli.jql import compile_query, get_text_terms, set_order_by, UnsupportedQuery
+from infi.jira_cli.issue_mirror import IssueMirror
+from infi.jira_cli.local_store import connect
+from datetime import datetime, timezone
+from os import path
+import json
+
+
+FIXTURE_PATH = path.join(path.dirname(__file__), "fixtures", "jql_conformance.json")
+
+
+class ConformanceTestCase(unittest.TestCase):
+    """compares the issues the mirror matches with the issues the server matches, for the queries in the fixture.
+    cases without ORDER BY are compared regardless of order"""
+
+    @classmethod
+    def setUpClass(cls):
+        with open(FIXTURE_PATH) as fd:
+            cls.fixture = json.load(fd)
+        cls.mirror = IssueMirror(connect(":memory:"))
+        cls.mirror.update_issues(cls.fixture['issues'])
+
+    def _search(self, query):
+        compiled = compile_query(query, self.fixture['username'], tzinfo=timezone.utc)
+        return [issue['key'] for issue in self.mirror.iter_issues(compiled.where, compiled.parameters, compiled.order_by)]
+
+    def test_cases(self):
+        for case in self.fixture['cases']:
+            keys = self._search(case['query'])
+            if 'ORDER BY' in case['query']:
+                self.assertEqual(keys, case['keys'], case['query'])
+            else:
+                self.assertEqual(sorted(keys), sorted(case['keys']), case['query'])
+
+    def test_unsupported(self):
+        for query in self.fixture['unsupported']:
+            with self.assertRaises(UnsupportedQuery, msg=query):
+                self._search(query)
+
+
+class CompileQueryTestCase(unittest.TestCase):
+    def test_projects(self):
+        self.assertEqual(compile_query("project = proj AND status = Open").projects, ["PROJ"])
+        self.assertEqual(compile_query("project in (A, B) AND (project = A OR status = Open)").projects, ["A", "B"])
+        self.assertEqual(compile_query("project in (A, B) AND project = A").projects, ["A"])
+        self.assertEqual(compile_query("project = A OR status = Open").projects, None)
+        self.assertEqual(compile_query("NOT project = A").projects, None)
+
+    def test_relative_dates(self):
+        now = datetime(2020, 1, 10, 12, 0, tzinfo=timezone.utc)
+        compiled = compile_query("updated >= -1w AND created < \"-2d 3h\" AND updated < now()", now=now)
+        self.assertEqual(compiled.parameters, ("2020-01-03T12:00:00+00:00", "2020-01-08T09:00:00+00:00",
+                                               "2020-01-10T12:00:00+00:00"))
+
+    def test_current_user_requires_a_sync(self):
+        with self.assertRaises(UnsupportedQuery):
+            compile_query("assignee = currentUser()")
+
+    def test_default_order(self):
+        self.assertEqual(compile_query("project = PROJ").order_by, None)
+
+    def test_text_terms(self):
+        self.assertEqual(get_text_terms('crash "on startup" win*'), ["crash", "on startup", "win"])
+        with self.assertRaises(UnsupportedQuery):
+            get_text_terms("crash AND startup")
+
+
+class SetOrderByTestCase(unittest.TestCase):
+    def test_set_order_by(self):
+        self.assertEqual(set_order_by("project = PROJ", "rank"), "project = PROJ ORDER BY rank")
+        self.assertEqual(set_order_by("project = PROJ order by priority DESC, created ASC ", "key DESC"),
+                         "project = PROJ ORDER BY key DESC")
+        self.assertEqual(set_order_by('summary ~ "order by" ORDER BY created', "rank"),
+                         'summary ~ "order by" ORDER BY rank')
+        self.assertEqual(set_order_by("ORDER BY created", "rank"), "ORDER BY rank")
@@ -0,0 +1,90 @@
+from infi import unittest
+from infi.jira_cli import jira_adapter
+from infi.jira_cli.concurrency import RateLimit
+from mock import patch, Mock
+from munch import Munch
+
+
+class Response(object):
+    def __init__(self, status_code, body=None):
+        self.status_code = status_code
+        self._body = body
+
+    def json(self):
+        if self._body is None:
+            raise ValueError()
+        return self._body
+
+
+class LabelsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.session = Mock()
+        self.session.put.side_effect = lambda url, json: self.responses.get(url.rsplit('/', 1)[1], Response(204))
+        self.responses = dict()
+        jira = Mock(_options=dict(server="https://jira.example.com"))
+        patchers = [patch("infi.jira_cli.jira_adapter.get_jira", return_value=jira),
+                    patch("infi.jira_cli.jira_adapter.get_jira_session", return_value=self.session),
+                    patch("infi.jira_cli.jira_adapter.Configuration"),
+                    patch("infi.jira_cli.concurrency.get_jira_request_limit", return_value=None),
+                    patch("infi.jira_cli.concurrency.get_jira_rate_limit", return_value=None)]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_update_without_get(self):
+        jira_adapter.update_labels("PROJ-1", add=["a", "b"], remove=["c"])
+        self.session.put.assert_called_once_with("https://jira.example.com/rest/api/2/issue/PROJ-1",
+                                                 json=dict(update=dict(labels=[dict(add="a"), dict(add="b"),
+                                                                               dict(remove="c")])))
+        self.assertEqual(self.session.get.call_count, 0)
+
+    def test_errors_are_reported_per_issue(self):
+        from jira import JIRAError
+        self.responses["PROJ-2"] = Response(400, dict(errorMessages=[], errors=dict(labels="cannot contain spaces")))
+        self.responses["PROJ-3"] = Response(404)
+        keys = ["PROJ-{}".format(index) for index in range(1, 6)]
+        results = list(jira_adapter.update_labels_of_issues(iter(keys), add=["release"], workers=3))
+        self.assertEqual([(result.key, result.error) for result in results],
+                         [("PROJ-1", None), ("PROJ-2", "labels: cannot contain spaces"), ("PROJ-3", "status 404"),
+                          ("PROJ-4", None), ("PROJ-5", None)])
+        with self.assertRaises(JIRAError):
+            jira_adapter.update_labels("PROJ-2", add=["release"])
+
+
+class LabelMatchingIssuesTestCase(unittest.TestCase):
+    def setUp(self):
+        self.labels = {"PROJ-{}".format(index): {"x"} for index in range(1, 11)}
+
+    def _get_matching_keys(self):
+        return sorted((key for key, labels in self.labels.items() if "x" in labels), key=lambda key: int(key[5:]))
+
+    def _search_issues(self, query, page_size, fields):
+        """pages by offset over the issues that match when each page is fetched, like the server does"""
+        start = 0
+        while self._get_matching_keys()[start:start + 3]:
+            for key in self._get_matching_keys()[start:start + 3]:
+                yield Munch(key=key)
+            start += 3
+
+    def _update_labels_of_issues(self, keys, add, remove, workers):
+        for key in keys:
+            self.labels[key] = (self.labels[key] | set(add)) - set(remove)
+            yield Munch(key=key, error=None)
+
+    def test_matches_shrink_while_labeling(self):
+        from infi.jira_cli.actions import _label_matching_issues
+        with patch("infi.jira_cli.jira_adapter.search_issues", new=self._search_issues), \
+             patch("infi.jira_cli.jira_adapter.update_labels_of_issues", new=self._update_labels_of_issues):
+            self.assertEqual(_label_matching_issues({"--jql": "labels = x"}, [], ["x"]), 0)
+        self.assertEqual(self._get_matching_keys(), [])
+
+
+class RateLimitTestCase(unittest.TestCase):
+    def test_spacing(self):
+        from time import monotonic
+        rate_limit = RateLimit(100)
+        before = monotonic()
+        for _ in range(11):
+            with rate_limit:
+                pass
+        self.assertGreaterEqual(monotonic() - before, 0.1)
@@ -0,0 +1,55 @@
+from infi import unittest
+from infi.jira_cli.metadata_cache import MetadataCache
+from mock import patch
+
+
+class MetadataCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        from tempfile import mkdtemp
+        from os import path
+        self.filepath = path.join(mkdtemp(), "cache", "jira.example.com.json")
+        self.calls = []
+
+    def _loader(self, value):
+        def loader():
+            self.calls.append(value)
+            return value
+        return loader
+
+    def test_persistent(self):
+        self.assertEqual(MetadataCache(self.filepath).get("fields", "", self._loader([1, 2])), [1, 2])
+        self.assertEqual(MetadataCache(self.filepath).get("fields", "", self._loader([3])), [1, 2])
+        self.assertEqual(self.calls, [[1, 2]])
+
+    def test_expired(self):
+        cache = MetadataCache(self.filepath, ttl=dict(fields=10))
+        with patch("infi.jira_cli.metadata_cache.time", return_value=100):
+            cache.get("fields", "", self._loader("old"))
+        with patch("infi.jira_cli.metadata_cache.time", return_value=105):
+            self.assertEqual(cache.get("fields", "", self._loader("new")), "old")
+            self.assertEqual(cache.stats(), [("fields", 1, 0, 10)])
+        with patch("infi.jira_cli.metadata_cache.time", return_value=110):
+            self.assertEqual(cache.stats(), [("fields", 1, 1, 10)])
+            self.assertEqual(cache.get("fields", "", self._loader("new")), "new")
+
+    def test_expired_kinds(self):
+        cache = MetadataCache(self.filepath, ttl=dict(fields=10, project=20))
+        with patch("infi.jira_cli.metadata_cache.time", return_value=100):
+            cache.get("fields", "", self._loader("fields"))
+            cache.get("project", "A", self._loader("a"))
+        with patch("infi.jira_cli.metadata_cache.time", return_value=105):
+            self.assertEqual(cache.get_expired_kinds(100), [])
+        with patch("infi.jira_cli.metadata_cache.time", return_value=115):
+            self.assertEqual(cache.get_expired_kinds(105), ["fields"])
+        with patch("infi.jira_cli.metadata_cache.time", return_value=125):
+            self.assertEqual(cache.get_expired_kinds(115), ["project"])
+
+    def test_invalidate(self):
+        cache = MetadataCache(self.filepath)
+        cache.get("project", "A", self._loader("a"))
+        cache.get("project", "B", self._loader("b"))
+        cache.invalidate("project", "A")
+        self.assertEqual(MetadataCache(self.filepath).get("project", "A", self._loader("a2")), "a2")
+        self.assertEqual(MetadataCache(self.filepath).get("project", "B", self._loader("b2")), "b")
+        cache.clear()
+        self.assertEqual(MetadataCache(self.filepath).stats(), [])
@@ -0,0 +1,52 @@
+from infi import unittest
+from infi.jira_cli.output import render_table, write_rows
+from datetime import datetime, timezone
+from io import StringIO
+
+
+COLUMNS = ["Key", "Summary", "Created"]
+ROWS = [["PROJ-1", "Crash on startup", datetime(2020, 1, 2, 3, 4, tzinfo=timezone.utc)],
+        ["PROJ-10", "a summary, with a comma\tand a tab", None]]
+
+
+class OutputTestCase(unittest.TestCase):
+    def _write(self, output_format, rows=ROWS):
+        stream = StringIO()
+        write_rows(output_format, COLUMNS, iter(rows), stream)
+        return stream.getvalue()
+
+    def test_table_looks_like_prettytable(self):
+        from prettytable import PrettyTable
+        for rows in (ROWS[:1], []):
+            table = PrettyTable(COLUMNS)
+            table.align = 'l'
+            for row in rows:
+                table.add_row([str(value) for value in row])
+            self.assertEqual(render_table(COLUMNS, rows), table.get_string())
+
+    def test_tsv(self):
+        self.assertEqual(self._write('tsv').splitlines(),
+                         ["Key\tSummary\tCreated", "PROJ-1\tCrash on startup\t2020-01-02 03:04:00+00:00",
+                          "PROJ-10\ta summary, with a comma and a tab\t"])
+
+    def test_csv(self):
+        self.assertEqual(self._write('csv').splitlines(),
+                         ["Key,Summary,Created", "PROJ-1,Crash on startup,2020-01-02 03:04:00+00:00",
+                          'PROJ-10,"a summary, with a comma\tand a tab",'])
+
+    def test_jsonl(self):
+        import json
+        self.assertEqual([json.loads(line) for line in self._write('jsonl').splitlines()],
+                         [dict(Key="PROJ-1", Summary="Crash on startup", Created="2020-01-02T03:04:00+00:00"),
+                          dict(Key="PROJ-10", Summary="a summary, with a comma\tand a tab", Created=None)])
+
+    def test_rows_stream(self):
+        written = []
+
+        def iter_rows():
+            for row in ROWS:
+                yield row
+                written.append(stream.getvalue().count('\n'))
+        stream = StringIO()
+        write_rows('tsv', COLUMNS, iter_rows(), stream)
+        self.assertEqual(written, [2, 3])
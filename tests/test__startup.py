@@ -0,0 +1,46 @@
+from infi import unittest
+
+HEAVY_MODULES = ('jira', 'requests', 'prettytable', 'jinja2', 'infi.execute')
+
+
+class StartupTestCase(unittest.TestCase):
+    """commands that don't talk to JIRA should not pay for importing its client"""
+
+    def setUp(self):
+        from tempfile import mkdtemp
+        from os import path, environ
+        import json
+        tempdir = mkdtemp()
+        config_path = path.join(tempdir, "config.json")
+        with open(config_path, "w") as fd:
+            json.dump(dict(jira_fqdn="jira.example.com", confluence_fqdn="confluence.example.com"), fd)
+        self.environ = dict(environ,
+                            INFI_JIRA_CLI_CONFIG_PATH=config_path,
+                            INFI_JIRA_CLI_CACHE_PATH=path.join(tempdir, "cache"),
+                            INFI_JIRA_CLI_DAEMON_SOCKET_PATH=path.join(tempdir, "daemon.sock"))
+
+    def _get_imported_modules(self, code):
+        from subprocess import check_output
+        from sys import executable
+        code += "; import sys; print('--- modules ---'); print(' '.join(sys.modules))"
+        output = check_output([executable, "-c", code], env=self.environ, universal_newlines=True)
+        return set(output.split('--- modules ---')[-1].split())
+
+    def assert_light(self, code):
+        imported = self._get_imported_modules(code)
+        self.assertEqual([module for module in HEAVY_MODULES if module in imported], [])
+
+    def test_jish_deactivate(self):
+        self.assert_light("from infi.jira_cli.jish import _jish; _jish(['deactivate'])")
+
+    def test_jissue_help(self):
+        self.assert_light("from infi.jira_cli.jissue import _jissue; _jissue(['--help'])")
+
+    def test_jissue_config_show(self):
+        self.assert_light("from infi.jira_cli.jissue import _jissue; _jissue(['config', 'show'])")
+
+    def test_jirelease_help(self):
+        self.assert_light("from infi.jira_cli.jirelease import _jiject; _jiject(['--help'], {})")
+
+    def test_jirelnotes_help(self):
+        self.assert_light("from infi.jira_cli.jirelnotes import _jiject; _jiject(['--help'], {})")
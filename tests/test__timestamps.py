@@ -0,0 +1,29 @@
+from infi import unittest
+from infi.jira_cli.timestamps import parse_timestamp, parse_date, from_jira_formatted_date
+from datetime import datetime, date, timedelta, timezone
+
+
+class TimestampTestCase(unittest.TestCase):
+    def test_jira_format(self):
+        value = parse_timestamp("2020-01-02T03:04:05.120+0200")
+        self.assertEqual(value, datetime(2020, 1, 2, 3, 4, 5, 120000, timezone(timedelta(hours=2))))
+        self.assertEqual(value.utcoffset(), timedelta(hours=2))
+
+    def test_negative_offset(self):
+        self.assertEqual(parse_timestamp("2020-01-02T03:04:05.000-0530").utcoffset(), -timedelta(hours=5, minutes=30))
+
+    def test_other_formats(self):
+        self.assertEqual(parse_timestamp("2020-01-02T03:04:05Z"), datetime(2020, 1, 2, 3, 4, 5, tzinfo=timezone.utc))
+        self.assertEqual(parse_timestamp("2020-01-02T03:04:05.5+02:00"),
+                         datetime(2020, 1, 2, 3, 4, 5, 500000, timezone(timedelta(hours=2))))
+
+    def test_invalid(self):
+        for value in ("2020-01-02", "2020-13-02T03:04:05.000+0200", "yesterday"):
+            with self.assertRaises(ValueError):
+                parse_timestamp(value)
+
+    def test_dates(self):
+        self.assertEqual(parse_date("2020-01-02") + timedelta(weeks=1), date(2020, 1, 9))
+        self.assertEqual(from_jira_formatted_date("2020-01-02"), datetime(2020, 1, 2, tzinfo=timezone.utc))
+        with self.assertRaises(ValueError):
+            parse_date("2020-1-2")
@@ -0,0 +1,54 @@
+from infi import unittest
+from infi.pyutils.lazy import clear_cache
+from infi.jira_cli import jira_adapter
+from infi.jira_cli.metadata_cache import MetadataCache
+from munch import Munch
+from mock import patch, Mock
+
+
+def make_issue(status):
+    fields = Munch(project=Munch(key="PROJ"), issuetype=Munch(name="Bug"), status=Munch(name=status))
+    return Mock(fields=Mock(return_value=fields))
+
+
+class TransitionTestCase(unittest.TestCase):
+    def setUp(self):
+        from tempfile import mkdtemp
+        from os import path
+        self.cache = MetadataCache(path.join(mkdtemp(), "jira.example.com.json"))
+        self.jira = Mock()
+        self.jira.issue.return_value = make_issue("Open")
+        self.jira.transitions.return_value = [dict(id="4", name="Start Progress", to=dict()),
+                                              dict(id="5", name="Resolve Issue", to=dict())]
+        patchers = [patch("infi.jira_cli.jira_adapter.get_jira", return_value=self.jira),
+                    patch("infi.jira_cli.metadata_cache.get_metadata_cache", return_value=self.cache)]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        clear_cache(jira_adapter.get_issue_state)
+
+    def test_transitions_are_cached_per_state(self):
+        jira_adapter.start_progress("PROJ-1")
+        jira_adapter.start_progress("PROJ-2")
+        self.assertEqual(self.jira.transitions.call_count, 1)
+        self.assertEqual(self.jira.issue.call_count, 2)
+        self.jira.transition_issue.assert_called_with(issue="PROJ-2", transition="4", fields=dict())
+
+    def test_known_state_skips_the_issue_request(self):
+        jira_adapter.transition_issue("PROJ-1", "Start Progress", dict(), state=("PROJ", "Bug", "Open"))
+        self.assertEqual(self.jira.issue.call_count, 0)
+
+    def test_stale_transitions_are_refreshed(self):
+        from jira import JIRAError
+        self.cache.get("transitions", "PROJ/Bug/Open", lambda: [dict(id="1", name="Start Progress")])
+        self.jira.transition_issue.side_effect = [JIRAError(status_code=400), None]
+        jira_adapter.start_progress("PROJ-1")
+        self.jira.transition_issue.assert_called_with(issue="PROJ-1", transition="4", fields=dict())
+
+    def test_resolve_without_fix_version_skips_the_project(self):
+        with patch("infi.jira_cli.jira_adapter.get_resolutions", return_value=[Munch(id="1", name="Fixed")]), \
+             patch("infi.jira_cli.jira_adapter.get_project") as get_project:
+            jira_adapter.resolve_issue("PROJ-1", "fixed", [''], state=("PROJ", "Bug", "Open"))
+        self.assertEqual(get_project.call_count, 0)
+        self.jira.transition_issue.assert_called_with(issue="PROJ-1", transition="5",
+                                                      fields=dict(resolution=dict(id="1"), fixVersions=[]))
@@ -0,0 +1,100 @@
+from infi import unittest
+from infi.jira_cli.version_index import VersionIndex, VersionNotFound, version_key, get_minimal_moves
+from munch import Munch
+
+
+class VersionKeyTestCase(unittest.TestCase):
+    def test_order(self):
+        names = ["2.0", "1.10", "1.0.post1", "Backlog", "1.0", "2.0a1", "1.0.1", "1.9", "1.0rc1", "2.0.dev3"]
+        self.assertEqual(sorted(names, key=version_key),
+                         ["Backlog", "1.0rc1", "1.0", "1.0.post1", "1.0.1", "1.9", "1.10", "2.0.dev3", "2.0a1", "2.0"])
+
+    def test_equal_versions(self):
+        self.assertEqual(version_key("1.2"), version_key("1.2.0"))
+        self.assertEqual(version_key("1.2"), version_key("v1.2"))
+        self.assertNotEqual(version_key("1.2"), version_key("1.20"))
+
+
+class VersionIndexTestCase(unittest.TestCase):
+    def setUp(self):
+        self.index = VersionIndex([Munch(name=name) for name in ("1.0", "2.0", "1.1", "3.0")])
+
+    def _names(self):
+        return [version.name for version in self.index]
+
+    def test_lookup(self):
+        self.assertIn("1.1", self.index)
+        self.assertEqual(self.index.get_position("1.1"), 2)
+        self.assertEqual(self.index.get_previous("1.1").name, "2.0")
+        self.assertIsNone(self.index.get_previous("1.0"))
+        with self.assertRaises(VersionNotFound):
+            self.index.get("4.0")
+
+    def test_preceding_version(self):
+        self.assertEqual(self.index.get_preceding_version("1.5").name, "1.1")
+        self.assertEqual(self.index.get_preceding_version("2.0").name, "2.0")
+        self.assertEqual(self.index.get_preceding_version("9").name, "3.0")
+        self.assertEqual(self.index.get_preceding_version("0.1").name, "1.0")
+        self.assertIsNone(VersionIndex([]).get_preceding_version("1.0"))
+
+    def test_add_and_move(self):
+        self.index.add(Munch(name="1.2"))
+        self.assertEqual(self.index.get_preceding_version("1.3").name, "1.2")
+        self.index.move("1.2", after="1.1")
+        self.assertEqual(self._names(), ["1.0", "2.0", "1.1", "1.2", "3.0"])
+        self.index.move("1.1", after="1.0")
+        self.assertEqual(self._names(), ["1.0", "1.1", "2.0", "1.2", "3.0"])
+        self.index.move("3.0")
+        self.assertEqual(self._names(), ["3.0", "1.0", "1.1", "2.0", "1.2"])
+        self.assertEqual(self.index.get_position("1.2"), 4)
+
+    def test_rename_and_remove(self):
+        self.index.update(self.index.get("1.1"), dict(name="2.5", description="renamed"))
+        self.assertEqual(self._names(), ["1.0", "2.0", "2.5", "3.0"])
+        self.assertEqual(self.index.get("2.5").description, "renamed")
+        self.assertNotIn("1.1", self.index)
+        self.assertEqual(self.index.get_preceding_version("2.9").name, "2.5")
+        self.index.remove("2.0")
+        self.assertEqual(self._names(), ["1.0", "2.5", "3.0"])
+        self.assertEqual(self.index.get_position("3.0"), 2)
+        self.assertEqual(self.index.get_preceding_version("2.1").name, "1.0")
+
+
+class MinimalMovesTestCase(unittest.TestCase):
+    def _apply(self, names, moves):
+        index = VersionIndex([Munch(name=name) for name in names])
+        for name, after in moves:
+            index.move(name, after)
+        return [version.name for version in index]
+
+    def test_sorted(self):
+        self.assertEqual(get_minimal_moves(["1", "2", "3"], ["1", "2", "3"]), [])
+
+    def test_single_move(self):
+        moves = get_minimal_moves(["2", "3", "4", "1", "5"], ["1", "2", "3", "4", "5"])
+        self.assertEqual(moves, [("1", None)])
+        moves = get_minimal_moves(["1", "5", "2", "3", "4"], ["1", "2", "3", "4", "5"])
+        self.assertEqual(moves, [("5", "4")])
+
+    def test_reversed(self):
+        names = [str(number) for number in range(10)]
+        moves = get_minimal_moves(names[::-1], names)
+        self.assertEqual(len(moves), 9)
+        self.assertEqual(self._apply(names[::-1], moves), names)
+
+    def test_random_orders(self):
+        from random import Random
+        random = Random(0)
+        for _ in range(50):
+            target = [str(number) for number in range(random.randint(0, 30))]
+            names = list(target)
+            random.shuffle(names)
+            moves = get_minimal_moves(names, target)
+            self.assertEqual(self._apply(names, moves), target)
+            self.assertEqual(len(moves), len(names) - self._longest_increasing_length([int(name) for name in names]))
+
+    def _longest_increasing_length(self, numbers):
+        lengths = []
+        for index, number in enumerate(numbers):
+            lengths.append(1 + max([lengths[other] for other in range(index) if numbers[other] < number] or [0]))
+        return max(lengths or [0])